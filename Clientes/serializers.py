@@ -3,7 +3,7 @@ from rest_framework import serializers
 from .models import Cliente
 from django.contrib.auth.hashers import make_password
 from django.utils.crypto import get_random_string # Para generar contraseñas aleatorias
-from django.core.mail import send_mail # Para enviar correos
+from Notificaciones.correo import encolar_correo # Para enviar correos
 from django.conf import settings # Para el remitente del correo
 
 class ClienteSerializer(serializers.ModelSerializer):
@@ -47,13 +47,7 @@ class ClienteSerializer(serializers.ModelSerializer):
                     f"Puede iniciar sesión en: {settings.FRONTEND_URL}/login\n\n"
                     f"Saludos cordiales,\nEl equipo de ConstruSys"
                 )
-                send_mail(
-                    subject,
-                    message_body,
-                    settings.DEFAULT_FROM_EMAIL,
-                    [cliente.correo],
-                    fail_silently=False,
-                )
+                encolar_correo(subject, message_body, [cliente.correo])
             except Exception as e:
                 print(f"ERROR: No se pudo enviar el correo de bienvenida a {cliente.correo}. Causa: {str(e)}")
         return cliente
@@ -4,11 +4,12 @@ from django.db import models, transaction
 from django.utils import timezone
 from decimal import Decimal
 import logging
+from backend_api.mixins import RastreoEstadoMixin
 
 
 logger = logging.getLogger(__name__)
 
-class Compra(models.Model):
+class Compra(RastreoEstadoMixin, models.Model):
     ESTADO_CHOICES = [
         ('pendiente', 'Pendiente'),
         ('confirmada', 'Confirmada'),
@@ -43,15 +44,15 @@ class Compra(models.Model):
     def _procesar_confirmacion(self):
         logger.info(f"COMPRA ID {self.id}: Procesando confirmación...")
         # Es necesario importar aquí para la lógica de negocio
-        from Productos.models import Producto
+        from Stock.models import MovimientoStock
+        from Stock.servicios import reponer_stock
         try:
             with transaction.atomic():
-                for item in self.items.all():
-                    producto = Producto.objects.select_for_update().get(id=item.producto.id)
-                    producto.ultimo_costo_compra = item.costo_unitario
-                    producto.stock_actual += item.cantidad
-                    producto.save(update_fields=['stock_actual', 'ultimo_costo_compra'])
-                    logger.info(f"  PRODUCTO '{producto.nombre}': stock +{item.cantidad}. Nuevo stock: {producto.stock_actual}. Nuevo costo: {producto.ultimo_costo_compra:.2f}")
+                items = list(self.items.values_list('producto_id', 'cantidad', 'costo_unitario'))
+                # Si un producto viene en varias líneas queda el costo de la última, como antes.
+                costos = {producto_id: costo for producto_id, _, costo in items}
+                reponer_stock([(producto_id, cantidad) for producto_id, cantidad, _ in items], MovimientoStock.Tipo.COMPRA, self, costos=costos)
+                logger.info(f"  STOCK: Sumadas {len(items)} líneas y actualizados los costos de {len(costos)} productos.")
         except Exception as e:
             logger.error(f"Error en transacción al procesar confirmación para Compra ID {self.id}: {str(e)}")
             raise e
@@ -59,19 +60,16 @@ class Compra(models.Model):
     def _revertir_confirmacion(self):
         logger.info(f"COMPRA ID {self.id}: Revirtiendo stock...")
         # Es necesario importar aquí para la lógica de negocio
-        from Productos.models import Producto
+        from Stock.models import MovimientoStock
+        from Stock.servicios import retirar_stock_hasta_cero
         with transaction.atomic():
-            for item in self.items.all():
-                producto = Producto.objects.select_for_update().get(id=item.producto.id)
-                producto.stock_actual = max(0, producto.stock_actual - item.cantidad)
-                producto.save(update_fields=['stock_actual'])
-                logger.info(f"  PRODUCTO '{producto.nombre}': stock -{item.cantidad}. Nuevo stock: {producto.stock_actual}.")
+            retirar_stock_hasta_cero(self.items.values_list('producto_id', 'cantidad'), MovimientoStock.Tipo.COMPRA_REVERSION, self)
+            logger.info(f"  STOCK: Descontadas las líneas de la compra (sin bajar de 0).")
 
     def save(self, *args, **kwargs):
-        estado_original = None
-        if self.pk:
-            estado_original = Compra.objects.get(pk=self.pk).estado
+        estado_original = self.estado_original
         super().save(*args, **kwargs)
+        self.sincronizar_valores_originales(kwargs.get('update_fields'))
         if self.estado == 'confirmada' and estado_original != 'confirmada':
             self._procesar_confirmacion()
         elif estado_original == 'confirmada' and self.estado != 'confirmada':
@@ -0,0 +1,67 @@
+# Compras/pdf.py
+"""Comprobante de compra en PDF."""
+
+from reportlab.lib import colors
+from reportlab.lib.units import inch
+from reportlab.platypus import Spacer
+
+from backend_api.pdf import DocumentoPDF, TABLA_DATOS, TABLA_ITEMS, TABLA_TOTALES, moneda, p, tabla
+from .models import Compra
+
+
+TITULOS = {
+    'pendiente': "ORDEN DE COMPRA",
+    'confirmada': "COMPROBANTE DE COMPRA RECIBIDA",
+    'anulada': "COMPRA ANULADA",
+}
+
+
+class DocumentoCompra(DocumentoPDF):
+    tipo = 'compra'
+    modelo = Compra
+    disposicion = 'attachment'
+
+    def nombre_archivo(self, compra):
+        return f'Compra_{compra.id}_{compra.fecha_compra.strftime("%Y%m%d")}.pdf'
+
+    def lineas_encabezado(self, compra):
+        return (f"Comprobante Compra #{compra.id}", f"Fecha Compra: {compra.fecha_compra.strftime('%d/%m/%Y')}")
+
+    def obtener(self, pk):
+        return Compra.objects.select_related('proveedor').prefetch_related('items').get(pk=pk)
+
+    def filas_version(self, compra):
+        return [compra, compra.proveedor, *compra.items.all()]
+
+    def contenido(self, compra):
+        proveedor = compra.proveedor
+        story = [
+            p(TITULOS.get(compra.estado, "ORDEN DE COMPRA"), 'titulo_documento'),
+            p("Proveedor", 'titulo_seccion'),
+            tabla([
+                [p(f"<b>Nombre:</b> {proveedor.nombre if proveedor else 'N/A'}", 'normal'),
+                 p(f"<b>Factura N°:</b> {compra.numero_factura}", 'normal_derecha')],
+                [p(f"<b>{proveedor.get_tipo_documento_display() if proveedor else 'Documento'}:</b> {proveedor.documento if proveedor else 'N/A'}", 'normal'),
+                 p(f"<b>Estado:</b> {compra.get_estado_display()}", 'normal_derecha')],
+                [p(f"<b>Teléfono:</b> {proveedor.telefono if proveedor else 'N/A'}", 'normal'),
+                 p(f"<b>Registrada:</b> {compra.fecha_registro.strftime('%d/%m/%Y')}", 'normal_derecha')],
+            ], [3.75 * inch, 3.25 * inch], TABLA_DATOS),
+            p("Productos", 'titulo_seccion'),
+        ]
+
+        items = [[p("<b>Cant.</b>", 'normal_centro'), p("<b>Producto</b>", 'normal'), p("<b>Costo Unit.</b>", 'normal_derecha'), p("<b>Subtotal</b>", 'normal_derecha')]]
+        for item in compra.items.all():
+            items.append([
+                p(item.cantidad, 'normal_centro'), p(item.nombre_producto_historico, 'normal'),
+                p(moneda(item.costo_unitario), 'normal_derecha'), p(moneda(item.subtotal), 'normal_derecha'),
+            ])
+        story += [
+            tabla(items, [0.7 * inch, 3.9 * inch, 1.2 * inch, 1.2 * inch], TABLA_ITEMS),
+            Spacer(1, 0.15 * inch),
+            tabla([
+                ["Subtotal:", moneda(compra.subtotal)],
+                ["IVA (19%):", moneda(compra.iva)],
+                [p("<b>Total Compra:</b>", 'normal_derecha'), p(f"<b>{moneda(compra.total)}</b>", 'normal_derecha')],
+            ], [1.5 * inch, 1.3 * inch], TABLA_TOTALES, [('LINEBELOW', (0, 1), (1, 1), 1, colors.black)], hAlign='RIGHT'),
+        ]
+        return story
@@ -0,0 +1,38 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from Productos.models import CategoriaProducto, Marca, Producto
+from Proveedores.models import Proveedor
+
+from .models import Compra, ItemCompra
+
+
+# Más filas que presupuesto: un N+1 lo excede seguro.
+FILAS = 9
+
+
+@override_settings(PRESUPUESTO_CONSULTAS_ESTRICTO=True)
+class PresupuestoConsultasTests(TestCase):
+
+    def setUp(self):
+        categoria = CategoriaProducto.objects.create(nombre='Obra gris', descripcion='')
+        marca = Marca.objects.create(nombre='Argos')
+        productos = [
+            Producto.objects.create(nombre=f'Producto {i}', categoria=categoria, marca=marca, descripcion='', precio_venta=Decimal('10.00'))
+            for i in range(3)
+        ]
+        for i in range(FILAS):
+            proveedor = Proveedor.objects.create(nombre=f'Proveedor {i}', documento=f'900{i}', telefono='3000000', direccion='Calle 1')
+            compra = Compra.objects.create(numero_factura=f'F-{i}', proveedor=proveedor)
+            for producto in productos:
+                ItemCompra.objects.create(compra=compra, producto=producto, cantidad=4, costo_unitario=Decimal('8.00'))
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create_superuser('admin@example.com', 'clave-segura'))
+
+    def test_listado(self):
+        response = self.client.get('/api/compras/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), FILAS)
@@ -1,8 +1,6 @@
 # Cotizaciones/emails.py
 
-from django.core.mail import send_mail
-from django.conf import settings
-from django.template.loader import render_to_string
+from Notificaciones.correo import encolar_correo
 
 def enviar_correo_cotizacion_invitado(cotizacion):
     """
@@ -36,15 +34,5 @@ Saludos cordiales,
 El equipo de ConstruSys
 """
 
-    try:
-        send_mail(
-            subject,
-            message_body,
-            settings.DEFAULT_FROM_EMAIL,
-            [cotizacion.email_invitado],
-            fail_silently=False,
-        )
-        print(f"Correo de cotización enviado exitosamente a {cotizacion.email_invitado}")
-    except Exception as e:
-        # Es importante registrar el error si el correo no se puede enviar
-        print(f"ERROR: No se pudo enviar el correo de cotización a {cotizacion.email_invitado}. Causa: {str(e)}")
\ No newline at end of file
+    # Queda en la bandeja de salida; lo envía el comando procesar_correos.
+    encolar_correo(subject, message_body, [cotizacion.email_invitado])
\ No newline at end of file
@@ -14,15 +14,19 @@ from .serializers import CotizacionCreateSerializer, CotizacionReadSerializer
 from Productos.models import Producto
 from Pedidos.models import Pedido, DetallePedido
 from Pedidos.emails import enviar_correo_confirmacion_pedido
+from Stock.reservas import disponible, reservar_stock_pedido
+from Stock.servicios import StockInsuficienteError
 from Roles_Permisos.permissions import HasPrivilege
 
 from .serializers import AdminCotizacionCreateSerializer
 from Clientes.models import Cliente
-from .pdf_generator import generate_cotizacion_pdf
+from .pdf_generator import DocumentoCotizacion
+from backend_api.cache_pdf import respuesta_pdf
 from django.http import HttpResponse
 
 
 from .emails import enviar_correo_cotizacion_invitado
+from backend_api.replicas import LecturaReplicaMixin
 
 
 # --- VISTAS PARA EL CLIENTE Y EL PÚBLICO ---
@@ -140,8 +144,10 @@ class ConvertirCotizacionAPedidoView(views.APIView):
         if cotizacion.estado != 'vigente' or cotizacion.is_expired:
             raise ValidationError("Esta cotización no es válida o ha expirado y no puede ser convertida en un pedido.")
         
-        for detalle in cotizacion.detalles.all():
-            if not detalle.producto or detalle.producto.stock_actual < detalle.cantidad:
+        detalles = list(cotizacion.detalles.select_related('producto'))
+        stock_disponible = disponible([d.producto_id for d in detalles if d.producto_id])
+        for detalle in detalles:
+            if not detalle.producto or stock_disponible.get(detalle.producto_id, 0) < detalle.cantidad:
                 raise ValidationError(f"No hay stock suficiente para '{detalle.producto_nombre_historico}'.")
 
         pedido = Pedido.objects.create(
@@ -163,10 +169,15 @@ class ConvertirCotizacionAPedidoView(views.APIView):
                 cantidad=detalle.cantidad,
                 precio_unitario=detalle.precio_unitario_cotizado
             )
-            for detalle in cotizacion.detalles.all()
+            for detalle in detalles
         ]
         DetallePedido.objects.bulk_create(detalles_pedido_a_crear)
 
+        try:
+            reservar_stock_pedido(pedido)
+        except StockInsuficienteError as e:
+            raise ValidationError(e.messages)
+
         cotizacion.estado = 'convertida'
         cotizacion.save(update_fields=['estado'])
         
@@ -203,7 +214,7 @@ class AdminCotizacionDetailView(generics.RetrieveAPIView):
 
 
 
-class AdminCotizacionPDFView(views.APIView):
+class AdminCotizacionPDFView(LecturaReplicaMixin, views.APIView):
     """
     Endpoint para generar y descargar un PDF de una cotización específica.
     """
@@ -211,10 +222,5 @@ class AdminCotizacionPDFView(views.APIView):
     required_privilege = 'cotizaciones_ver' 
 
     def get(self, request, pk, *args, **kwargs):
-        cotizacion = get_object_or_404(Cotizacion, pk=pk)
-        pdf_buffer = generate_cotizacion_pdf(cotizacion)
-        
-        response = HttpResponse(pdf_buffer, content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="cotizacion_{cotizacion.id}.pdf"'
-        
-        return response
+        cotizacion = get_object_or_404(Cotizacion.objects.select_related('cliente').prefetch_related('detalles'), pk=pk)
+        return respuesta_pdf(request, DocumentoCotizacion(), cotizacion)
@@ -0,0 +1,45 @@
+# backend_api/Creditos/intereses.py
+
+from django.db import transaction
+from django.utils import timezone
+import logging
+
+from .models import Credito
+
+logger = logging.getLogger(__name__)
+
+CAMPOS_INTERES = ['intereses_acumulados', 'fecha_ultimo_calculo_interes']
+
+
+def acumular_intereses(hoy=None, tamano_lote=500):
+    """
+    Lleva los intereses de todos los créditos activos hasta `hoy`, por lotes:
+    cada lote se bloquea (saltando los que otra transacción tenga tomados, que
+    quedan para la siguiente corrida), se calcula en memoria y se guarda con un
+    solo bulk_update. Es idempotente: los créditos ya calculados hoy no se tocan.
+    Devuelve cuántos créditos se actualizaron.
+    """
+    hoy = hoy or timezone.localdate()
+    pendientes = Credito.objects.filter(
+        estado='Activo',
+        fecha_ultimo_calculo_interes__lt=hoy,
+    ).only('id', 'estado', 'deuda_del_cupo', 'tasa_interes_mensual', *CAMPOS_INTERES)
+
+    actualizados = 0
+    ultimo_id = 0
+    while True:
+        with transaction.atomic():
+            lote = list(
+                pendientes.filter(id__gt=ultimo_id)
+                .order_by('id')
+                .select_for_update(skip_locked=True)[:tamano_lote]
+            )
+            if not lote:
+                break
+            ultimo_id = lote[-1].id
+            cambiados = [credito for credito in lote if credito.calcular_intereses(hoy) is not None]
+            Credito.objects.bulk_update(cambiados, CAMPOS_INTERES)
+            actualizados += len(cambiados)
+
+    logger.info(f"Intereses acumulados hasta {hoy}: {actualizados} créditos actualizados.")
+    return actualizados
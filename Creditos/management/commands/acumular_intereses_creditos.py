@@ -0,0 +1,27 @@
+# Creditos/management/commands/acumular_intereses_creditos.py
+
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from Creditos.intereses import acumular_intereses
+
+
+class Command(BaseCommand):
+    help = 'Acumula los intereses de todos los créditos activos hasta hoy. Se puede correr varias veces al día sin duplicar intereses.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fecha', help='Fecha hasta la que se calcula (YYYY-MM-DD). Por defecto, hoy.')
+        parser.add_argument('--lote', type=int, default=500, help='Cantidad de créditos por transacción.')
+
+    def handle(self, *args, **options):
+        hoy = timezone.localdate()
+        if options['fecha']:
+            try:
+                hoy = datetime.strptime(options['fecha'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError('La fecha debe tener el formato YYYY-MM-DD.')
+
+        actualizados = acumular_intereses(hoy=hoy, tamano_lote=options['lote'])
+        self.stdout.write(self.style.SUCCESS(f'Intereses al {hoy}: {actualizados} créditos actualizados.'))
@@ -5,12 +5,13 @@ from django.utils import timezone
 from datetime import timedelta
 from decimal import Decimal
 import logging
+from backend_api.mixins import RastreoEstadoMixin
 
 
 
 logger = logging.getLogger(__name__)
 
-class Credito(models.Model):
+class Credito(RastreoEstadoMixin, models.Model):
     ESTADO_CHOICES = [
         ('Activo', 'Activo'),
         ('Pagado', 'Pagado'),
@@ -66,32 +67,45 @@ class Credito(models.Model):
     def __str__(self):
         return f"Crédito #{self.id} - {self.cliente} - Cupo: ${self.cupo_aprobado:,.0f}"
 
-    def actualizar_intereses(self, guardar=False):
-        hoy = timezone.localdate()
+    def calcular_intereses(self, hoy=None):
+        """
+        Lleva en memoria intereses_acumulados y fecha_ultimo_calculo_interes hasta `hoy`,
+        sin guardar nada. Devuelve el interés generado (Decimal('0') si la deuda ya estaba
+        en cero y solo se movió la fecha) o None si no había nada que actualizar.
+        El interés es simple sobre deuda_del_cupo, así que calcular día a día o de una
+        sola vez da el mismo resultado.
+        """
+        hoy = hoy or timezone.localdate()
         if self.estado != 'Activo' or self.fecha_ultimo_calculo_interes >= hoy:
-            return False
+            return None
         if self.deuda_del_cupo <= 0:
             self.fecha_ultimo_calculo_interes = hoy
-            if guardar:
-                self.save(update_fields=['fecha_ultimo_calculo_interes'])
-            return False
+            return Decimal('0')
         tasa_diaria = (self.tasa_interes_mensual / Decimal('100')) / Decimal('30')
         dias_a_calcular = (hoy - self.fecha_ultimo_calculo_interes).days
-        if dias_a_calcular <= 0:
-            return False
         interes_generado = self.deuda_del_cupo * tasa_diaria * Decimal(dias_a_calcular)
         if interes_generado > 0:
             self.intereses_acumulados += interes_generado
             self.fecha_ultimo_calculo_interes = hoy
-            logger.info(f"Crédito #{self.id}: Intereses actualizados. Generado: ${interes_generado:,.2f}. Total ahora: ${self.intereses_acumulados:,.2f}")
+            return interes_generado
+        return None
+
+    def actualizar_intereses(self, guardar=False):
+        interes_generado = self.calcular_intereses()
+        if interes_generado is None:
+            return False
+        if interes_generado == 0:
             if guardar:
-                with transaction.atomic():
-                    Credito.objects.filter(pk=self.pk).update(
-                        intereses_acumulados=self.intereses_acumulados,
-                        fecha_ultimo_calculo_interes=self.fecha_ultimo_calculo_interes
-                    )
-            return True
-        return False
+                self.save(update_fields=['fecha_ultimo_calculo_interes'])
+            return False
+        logger.info(f"Crédito #{self.id}: Intereses actualizados. Generado: ${interes_generado:,.2f}. Total ahora: ${self.intereses_acumulados:,.2f}")
+        if guardar:
+            with transaction.atomic():
+                Credito.objects.filter(pk=self.pk).update(
+                    intereses_acumulados=self.intereses_acumulados,
+                    fecha_ultimo_calculo_interes=self.fecha_ultimo_calculo_interes
+                )
+        return True
 
     def save(self, *args, **kwargs):
         # Se importa aquí para la lógica de negocio, no afecta a las migraciones
@@ -107,7 +121,13 @@ class Credito(models.Model):
                 if self.deuda_del_cupo <= Decimal('0.00') and self.intereses_acumulados <= Decimal('0.00'):
                     self.estado = 'Pagado'
                     logger.info(f"Crédito #{self.id} ha sido completamente pagado. Cambiando estado a 'Pagado'.")
+            # Si el estado cambió aquí o antes, debe guardarse aunque el llamador solo
+            # haya pedido guardar algunos campos (p. ej. update_fields=['capital_utilizado']).
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None and 'estado' not in update_fields and self.campo_modificado('estado'):
+                kwargs['update_fields'] = list(update_fields) + ['estado']
         super().save(*args, **kwargs)
+        self.sincronizar_valores_originales(kwargs.get('update_fields'))
 
     class Meta:
         verbose_name = "Cuenta de Crédito"
@@ -0,0 +1,64 @@
+# Creditos/pdf.py
+"""Estado de cuenta de un crédito en PDF."""
+
+from django.utils import timezone
+from reportlab.lib import colors
+from reportlab.lib.units import inch
+from reportlab.platypus import Spacer
+
+from backend_api.pdf import DocumentoPDF, FUENTE_NEGRITA, datos_cliente, TABLA_ENCABEZADO_OSCURO, moneda, p, tabla
+from .models import Credito
+
+
+class DocumentoCredito(DocumentoPDF):
+    tipo = 'credito'
+    modelo = Credito
+    margenes = (inch, inch, inch, inch)
+
+    def nombre_archivo(self, credito):
+        return f'Estado_Credito_{credito.id}.pdf'
+
+    def obtener(self, pk):
+        return Credito.objects.select_related('cliente').prefetch_related('abonos').get(pk=pk)
+
+    def filas_version(self, credito):
+        return [credito, datos_cliente(credito.cliente), *credito.abonos.all()]
+
+    def partes_version(self, credito):
+        # El estado de cuenta lleva la fecha de emisión: cambia cada día aunque no cambien las filas.
+        return (timezone.localdate(),)
+
+    def contenido(self, credito):
+        deuda_total = moneda(credito.deuda_total_con_intereses, 2)
+        story = [
+            p("Estado de Cuenta de Crédito", 'titulo'),
+            Spacer(1, 12),
+            p(f"<b>Cliente:</b> {credito.get_cliente_info_display}<br/><b>Fecha Emisión:</b> {timezone.localdate().strftime('%d/%m/%Y')}", 'normal'),
+            Spacer(1, 24),
+            p("Resumen de la Cuenta", 'subtitulo'),
+            tabla([
+                ['ID del Crédito:', credito.id, 'Estado:', credito.get_estado_display()],
+                ['Cupo Aprobado:', moneda(credito.cupo_aprobado, 2), 'Fecha Otorgamiento:', credito.fecha_otorgamiento.strftime('%d/%m/%Y')],
+                ['Disponible para Compras:', moneda(credito.saldo_disponible_para_ventas, 2), 'Fecha Vencimiento:', credito.fecha_vencimiento.strftime('%d/%m/%Y')],
+                ['Deuda del Cupo:', moneda(credito.deuda_del_cupo, 2), 'Intereses Acumulados:', moneda(credito.intereses_acumulados, 2)],
+                ['', '', p('<b>Deuda Total:</b>', 'destacado'), p(f"<b>{deuda_total}</b>", 'destacado')],
+            ], [1.8 * inch, 1.4 * inch, 1.8 * inch, 1.5 * inch], [
+                ('ALIGN', (0, 0), (-1, -1), 'LEFT'), ('ALIGN', (1, 0), (1, -1), 'RIGHT'), ('ALIGN', (3, 0), (3, -1), 'RIGHT'),
+                ('GRID', (0, 0), (-1, -2), 1, colors.lightgrey), ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+                ('FONTNAME', (2, 4), (-1, -1), FUENTE_NEGRITA), ('TOPPADDING', (0, 4), (-1, -1), 12),
+            ]),
+            Spacer(1, 24),
+        ]
+
+        # Se filtra en Python para aprovechar el prefetch de abonos.
+        abonos = [abono for abono in credito.abonos.all() if abono.estado == 'Verificado']
+        if abonos:
+            filas = [['Fecha', 'Monto', 'Método de Pago']]
+            filas += [[abono.fecha_abono.strftime('%d/%m/%Y'), moneda(abono.monto, 2), abono.metodo_pago or 'N/A'] for abono in abonos]
+            story += [
+                p("Historial de Abonos Aplicados", 'subtitulo'),
+                tabla(filas, [1.5 * inch, 2 * inch, 3 * inch], TABLA_ENCABEZADO_OSCURO, [
+                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'), ('ALIGN', (1, 1), (1, -1), 'RIGHT'),
+                ]),
+            ]
+        return story
@@ -16,15 +16,9 @@ from datetime import datetime
 from django.db import models
 from django.contrib.auth import get_user_model
 from Clientes.models import Cliente
-import io
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib.enums import TA_RIGHT, TA_CENTER
 
 from Roles_Permisos.permissions import HasPrivilege
+from authentication.jwt_auth import ClaimsJWTAuthentication
 from .models import Credito, AbonoCredito, SolicitudCredito
 from .serializers import (
     CreditoSerializer,
@@ -34,14 +28,18 @@ from .serializers import (
     SolicitudDecisionSerializer
 )
 from .renderers import BinaryPDFRenderer
+from .pdf import DocumentoCredito
+from backend_api.cache_pdf import respuesta_pdf
 from rest_framework.renderers import JSONRenderer
 from rest_framework.parsers import MultiPartParser, FormParser
 from django_filters.rest_framework import DjangoFilterBackend
+from backend_api.replicas import LecturaReplicaMixin
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
 
-class CreditosResumenDashboardView(APIView):
+class CreditosResumenDashboardView(LecturaReplicaMixin, APIView):
+    authentication_classes = [ClaimsJWTAuthentication]
     permission_classes = [permissions.IsAuthenticated, HasPrivilege]
     required_privilege = "dashboard_ver"
 
@@ -95,9 +93,10 @@ class CreditoListCreateView(generics.ListAPIView):
         
         queryset = self.filter_queryset(self.get_queryset())
         creditos_a_serializar = list(queryset)
+        # Los intereses se guardan con el comando acumular_intereses_creditos; aquí solo se
+        # calculan en memoria los días que falten para mostrar el valor al día de hoy.
         for credito in creditos_a_serializar:
-            if credito.estado == 'Activo':
-                credito.actualizar_intereses(guardar=True)
+            credito.calcular_intereses()
         serializer = self.get_serializer(creditos_a_serializar, many=True)
         return Response(serializer.data)
 
@@ -115,8 +114,7 @@ class CreditoRetrieveUpdateDestroyView(generics.RetrieveUpdateAPIView):
 
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
-        instance.actualizar_intereses(guardar=True)
-        instance.refresh_from_db()
+        instance.calcular_intereses()
         serializer = self.get_serializer(instance)
         return Response(serializer.data)
 
@@ -267,70 +265,15 @@ class VerificarAbonoView(APIView):
         return Response({"error": "La acción debe ser 'aprobar' o 'rechazar'."}, status=status.HTTP_400_BAD_REQUEST)
 
 
-class GenerarCreditoPDFView(APIView):
+class GenerarCreditoPDFView(LecturaReplicaMixin, APIView):
     permission_classes = [permissions.IsAuthenticated, HasPrivilege]
     renderer_classes = [BinaryPDFRenderer, JSONRenderer]
     required_privilege = "creditos_ver"
 
     def get(self, request, credito_id, *args, **kwargs):
         credito = get_object_or_404(Credito.objects.select_related('cliente').prefetch_related('abonos'), pk=credito_id)
-        credito.actualizar_intereses(guardar=True)
-        credito.refresh_from_db()
-        
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=letter, rightMargin=inch, leftMargin=inch, topMargin=inch, bottomMargin=inch)
-        styles = getSampleStyleSheet()
-        story = []
-
-        story.append(Paragraph("Estado de Cuenta de Crédito", styles['h1']))
-        story.append(Spacer(1, 12))
-        
-        cliente_info_str = credito.get_cliente_info_display
-        info_para_pdf = f"<b>Cliente:</b> {cliente_info_str}<br/><b>Fecha Emisión:</b> {timezone.localdate().strftime('%d/%m/%Y')}"
-        story.append(Paragraph(info_para_pdf, styles['Normal']))
-        
-        story.append(Spacer(1, 24))
-        story.append(Paragraph("Resumen de la Cuenta", styles['h2']))
-        
-        deuda_total_str = f"${credito.deuda_total_con_intereses:,.2f}"
-        resumen_data = [
-            ['ID del Crédito:', credito.id, 'Estado:', credito.get_estado_display()],
-            ['Cupo Aprobado:', f"${credito.cupo_aprobado:,.2f}", 'Fecha Otorgamiento:', credito.fecha_otorgamiento.strftime('%d/%m/%Y')],
-            ['Disponible para Compras:', f"${credito.saldo_disponible_para_ventas:,.2f}", 'Fecha Vencimiento:', credito.fecha_vencimiento.strftime('%d/%m/%Y')],
-            ['Deuda del Cupo:', f"${credito.deuda_del_cupo:,.2f}", 'Intereses Acumulados:', f"${credito.intereses_acumulados:,.2f}"],
-            ['', '', Paragraph('<b>Deuda Total:</b>', styles['h3']), Paragraph(f"<b>{deuda_total_str}</b>", styles['h3'])]
-        ]
-        resumen_table = Table(resumen_data, colWidths=[1.8*inch, 1.4*inch, 1.8*inch, 1.5*inch])
-        resumen_table.setStyle(TableStyle([
-            ('ALIGN', (0,0), (-1,-1), 'LEFT'), ('ALIGN', (1,0), (1,-1), 'RIGHT'), ('ALIGN', (3,0), (3,-1), 'RIGHT'),
-            ('GRID', (0,0), (-1,-2), 1, colors.lightgrey), ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
-            ('FONTNAME', (2,4), (-1,-1), 'Helvetica-Bold'), ('TOPPADDING', (0,4), (-1,-1), 12),
-        ]))
-        story.append(resumen_table)
-        story.append(Spacer(1, 24))
-
-        # --- Incluir estado del abono en el PDF ---
-        abonos_verificados = credito.abonos.filter(estado='Verificado')
-        if abonos_verificados.exists():
-            story.append(Paragraph("Historial de Abonos Aplicados", styles['h2']))
-            abonos_data = [['Fecha', 'Monto', 'Método de Pago']]
-            for abono in abonos_verificados:
-                abonos_data.append([ abono.fecha_abono.strftime('%d/%m/%Y'), f"${abono.monto:,.2f}", abono.metodo_pago or 'N/A' ])
-            abonos_table = Table(abonos_data, colWidths=[1.5*inch, 2*inch, 3*inch])
-            abonos_table.setStyle(TableStyle([
-                ('BACKGROUND', (0,0), (-1,0), colors.grey), ('TEXTCOLOR', (0,0), (-1,0), colors.whitesmoke),
-                ('ALIGN', (0,0), (-1,-1), 'CENTER'), ('ALIGN', (1,1), (1,-1), 'RIGHT'),
-                ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'), ('GRID', (0,0), (-1,-1), 1, colors.black)
-            ]))
-            story.append(abonos_table)
-        
-        doc.build(story)
-        pdf_bytes = buffer.getvalue()
-        buffer.close()
-        
-        response = Response(pdf_bytes, content_type='application/pdf')
-        response['Content-Disposition'] = f'inline; filename="Estado_Credito_{credito.id}.pdf"'
-        return response
+        credito.calcular_intereses()
+        return respuesta_pdf(request, DocumentoCredito(), credito)
 
 # --- VISTAS PARA CLIENTES ---
 
@@ -342,13 +285,12 @@ class ClienteCreditoDetailView(generics.RetrieveAPIView):
         cliente = self.request.user
         credito = Credito.objects.filter(cliente=cliente, estado='Activo').first()
         if credito:
-            credito.actualizar_intereses(guardar=True)
-            credito.refresh_from_db()
+            credito.calcular_intereses()
             return credito
         else:
             raise Http404
 
-class ClienteGenerarCreditoPDFView(APIView):
+class ClienteGenerarCreditoPDFView(LecturaReplicaMixin, APIView):
     permission_classes = [permissions.IsAuthenticated]
     renderer_classes = [BinaryPDFRenderer, JSONRenderer]
 
@@ -360,8 +302,8 @@ class ClienteGenerarCreditoPDFView(APIView):
             cliente=cliente, 
             estado='Activo'
         )
-     
-        return Response(...) # Respuesta con el PDF
+        credito.calcular_intereses()
+        return respuesta_pdf(request, DocumentoCredito(), credito)
 
 class ClienteHistorialCreditosView(generics.ListAPIView):
     serializer_class = CreditoSerializer
@@ -10,6 +10,8 @@ from Creditos.models import Credito
 from rest_framework.exceptions import ValidationError
 from Clientes.models import Cliente
 from Stock.serializers import GestionProveedorReadSerializer
+from Stock.models import MovimientoStock
+from Stock.servicios import descontar_stock, reponer_stock, StockInsuficienteError
 
 
 class MiniClienteSerializer(serializers.ModelSerializer):
@@ -189,6 +191,7 @@ class DevolucionCreateSerializer(serializers.ModelSerializer):
             estado_del_cambio=validated_data.get('estado_del_cambio')
         )
 
+        reingresos, salidas = [], []
         for item_data in items_devueltos_data:
             item_original = DetalleVenta.objects.get(pk=item_data['item_venta_original_id'])
             producto_devuelto = item_original.producto
@@ -206,8 +209,7 @@ class DevolucionCreateSerializer(serializers.ModelSerializer):
             # Los productos defectuosos NO reabastecen el stock aquí. Quedan pendientes
             # para ser gestionados en el módulo de devoluciones a proveedor.
             if ItemDevuelto.puede_reabastecer(motivo):
-                producto_devuelto.stock_actual += cantidad_devuelta
-                producto_devuelto.save(update_fields=['stock_actual'])
+                reingresos.append((producto_devuelto.id, cantidad_devuelta))
            
 
         for item_data in items_cambio_data:
@@ -220,8 +222,16 @@ class DevolucionCreateSerializer(serializers.ModelSerializer):
                 devolucion=devolucion, producto=producto_nuevo, cantidad=cantidad_nueva,
                 precio_unitario_actual=item_data['precio_unitario_actual']
             )
-            producto_nuevo.stock_actual -= cantidad_nueva
-            producto_nuevo.save(update_fields=['stock_actual'])
+            salidas.append((producto_nuevo.id, cantidad_nueva))
+
+        # Primero entra lo devuelto (puede ser lo mismo que se entrega en cambio) y luego sale el cambio.
+        if reingresos:
+            reponer_stock(reingresos, MovimientoStock.Tipo.DEVOLUCION_CLIENTE, devolucion)
+        if salidas:
+            try:
+                descontar_stock(salidas, MovimientoStock.Tipo.CAMBIO, devolucion)
+            except StockInsuficienteError as e:
+                raise serializers.ValidationError(e.messages)
 
         if devolucion.balance_final < 0: # La empresa debe al cliente
             monto_a_favor_cliente = abs(devolucion.balance_final)
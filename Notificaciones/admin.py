@@ -0,0 +1,22 @@
+# Notificaciones/admin.py
+from django.contrib import admin
+from django.utils import timezone
+from .models import CorreoPendiente
+
+@admin.register(CorreoPendiente)
+class CorreoPendienteAdmin(admin.ModelAdmin):
+    list_display = ('asunto', 'estado', 'intentos', 'proximo_intento', 'fecha_creacion', 'fecha_envio')
+    search_fields = ('asunto', 'destinatarios')
+    list_filter = ('estado', 'fecha_creacion')
+    readonly_fields = ('fecha_creacion', 'fecha_envio', 'vence_en', 'ultimo_error')
+    # El cuerpo puede llevar contraseñas temporales o enlaces de recuperación.
+    exclude = ('cuerpo', 'cuerpo_html')
+    actions = ['reintentar']
+
+    @admin.action(description="Volver a encolar los correos seleccionados")
+    def reintentar(self, request, queryset):
+        # Los vencidos ya no tienen cuerpo ni sirve enviarlos.
+        cantidad = queryset.exclude(estado=CorreoPendiente.Estado.ENVIADO).exclude(vence_en__lte=timezone.now()).update(
+            estado=CorreoPendiente.Estado.PENDIENTE, intentos=0, proximo_intento=timezone.now(),
+        )
+        self.message_user(request, f"{cantidad} correos vueltos a encolar.")
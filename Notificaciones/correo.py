@@ -0,0 +1,217 @@
+# backend/Notificaciones/correo.py
+"""
+Bandeja de salida de correos.
+
+Las vistas y serializers no hablan con el servidor SMTP: llaman a encolar_correo(),
+que solo inserta una fila en CorreoPendiente dentro de la transacción en curso (si el
+cambio de negocio se deshace, el correo también).
+
+Quién los envía:
+
+- Al confirmarse la transacción se intenta enviar enseguida lo recién encolado
+  (CORREO_ENVIO_INMEDIATO, activo por defecto). Si el SMTP falla, el correo queda
+  en la bandeja con su reintento programado.
+- Los reintentos los toma procesar_correos(): el comando del mismo nombre en un
+  servidor con procesos largos, o en Vercel el cron de vercel.json, que llama a
+  /api/notificaciones/procesar/ (ver Notificaciones/views.py) y envía un lote por
+  llamada. Tras MAX_INTENTOS quedan como 'fallido' para revisarlos desde el admin.
+
+Los cuerpos pueden llevar contraseñas temporales o enlaces de recuperación: se
+borran al enviar el correo, y purgar_correos() elimina las filas enviadas o
+fallidas con más de CORREO_RETENCION_DIAS días. Un correo con `vigencia` (el de
+recuperar contraseña) que no salió a tiempo se descarta en lugar de enviarse tarde.
+
+Funciona con cualquier EMAIL_BACKEND (smtp, locmem, file, console).
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import CorreoPendiente
+
+logger = logging.getLogger(__name__)
+
+MAX_INTENTOS = 8
+RETRASO_BASE = timedelta(minutes=1)
+RETRASO_MAXIMO = timedelta(hours=6)
+# Mientras un worker envía un lote, sus correos quedan "apartados" este tiempo para
+# que otro worker no los tome. Si el proceso muere a mitad, se reintentan al vencer.
+PLAZO_RECLAMO = timedelta(minutes=10)
+
+
+def _armar(asunto, cuerpo, destinatarios, remitente=None, cuerpo_html='', vigencia=None):
+    destinatarios = [d for d in destinatarios if d]
+    if not destinatarios:
+        return None
+    return CorreoPendiente(
+        asunto=asunto[:255],
+        cuerpo=cuerpo,
+        cuerpo_html=cuerpo_html or '',
+        remitente=remitente or settings.DEFAULT_FROM_EMAIL,
+        destinatarios=destinatarios,
+        vence_en=timezone.now() + vigencia if vigencia else None,
+    )
+
+
+def _programar_envio(ids):
+    """Al confirmar la transacción intenta enviar esos correos sin esperar al cron."""
+    if ids and getattr(settings, 'CORREO_ENVIO_INMEDIATO', True):
+        # robust: si el envío revienta, la petición que encoló no se ve afectada.
+        transaction.on_commit(lambda: enviar_correos(ids), robust=True)
+
+
+def encolar_correo(asunto, cuerpo, destinatarios, remitente=None, cuerpo_html='', vigencia=None):
+    """
+    Guarda un correo para enviarlo después. Devuelve el CorreoPendiente (o None si no hay destinatarios).
+    Con `vigencia` (timedelta) el correo se descarta si no se pudo enviar dentro de ese plazo.
+    """
+    correo = _armar(asunto, cuerpo, destinatarios, remitente, cuerpo_html, vigencia)
+    if correo is None:
+        logger.warning(f"Correo '{asunto}' descartado: no tiene destinatarios.")
+        return None
+    correo.save()
+    _programar_envio([correo.pk])
+    return correo
+
+
+def encolar_correos(correos):
+    """
+    Versión en bloque de encolar_correo: recibe una lista de dicts con sus mismos
+    argumentos y los inserta con un solo INSERT. Devuelve cuántos se encolaron.
+    """
+    filas = [fila for fila in (_armar(**datos) for datos in correos) if fila is not None]
+    CorreoPendiente.objects.bulk_create(filas)
+    _programar_envio([fila.pk for fila in filas if fila.pk])
+    return len(filas)
+
+
+def _mensaje(correo, conexion):
+    mensaje = EmailMultiAlternatives(correo.asunto, correo.cuerpo, correo.remitente, correo.destinatarios, connection=conexion)
+    if correo.cuerpo_html:
+        mensaje.attach_alternative(correo.cuerpo_html, 'text/html')
+    return mensaje
+
+
+def _retraso(intentos):
+    return min(RETRASO_BASE * (2 ** (intentos - 1)), RETRASO_MAXIMO)
+
+
+def _reclamar_lote(ahora, tamano_lote, ids=None):
+    """
+    Aparta el siguiente lote de correos cuyo intento ya llegó (o, con `ids`, esos
+    correos si siguen pendientes) y lo devuelve. SKIP LOCKED: varios workers no se pisan.
+    """
+    pendientes = CorreoPendiente.objects.filter(estado=CorreoPendiente.Estado.PENDIENTE, proximo_intento__lte=ahora)
+    if ids is not None:
+        pendientes = pendientes.filter(id__in=ids)
+    with transaction.atomic():
+        ids = list(
+            pendientes.select_for_update(skip_locked=True)
+            .order_by('proximo_intento', 'id').values_list('id', flat=True)[:tamano_lote]
+        )
+        if ids:
+            CorreoPendiente.objects.filter(id__in=ids).update(proximo_intento=timezone.now() + PLAZO_RECLAMO)
+    return list(CorreoPendiente.objects.filter(id__in=ids).order_by('id')) if ids else []
+
+
+def _enviar_lote(correos, max_intentos, ahora=None):
+    """Envía el lote por una sola conexión y anota el resultado de cada correo (sin transacción abierta)."""
+    corte = max(ahora, timezone.now()) if ahora else timezone.now()
+    vencidos = {correo.id for correo in correos if correo.vence_en and correo.vence_en <= corte}
+    a_enviar = [correo for correo in correos if correo.id not in vencidos]
+    conexion = get_connection(fail_silently=False)
+    errores = {}
+    try:
+        if a_enviar:
+            conexion.open()
+    except Exception as e:
+        errores = {correo.id: f"No se pudo abrir la conexión: {e}" for correo in a_enviar}
+    else:
+        try:
+            for correo in a_enviar:
+                try:
+                    if not conexion.send_messages([_mensaje(correo, conexion)]):
+                        errores[correo.id] = "El backend de correo no aceptó el mensaje."
+                except Exception as e:
+                    errores[correo.id] = str(e)
+        finally:
+            conexion.close()
+
+    ahora = timezone.now()
+    enviados = fallidos = 0
+    for correo in correos:
+        if correo.id in vencidos:
+            # Enviarlo ahora no sirve (el enlace que lleva ya caducó) y su cuerpo no se guarda.
+            correo.estado = CorreoPendiente.Estado.FALLIDO
+            correo.ultimo_error = f"Venció a las {correo.vence_en} sin poder enviarse."
+            correo.cuerpo = correo.cuerpo_html = ''
+            fallidos += 1
+            logger.error(f"Correo #{correo.id} ('{correo.asunto}') descartado: {correo.ultimo_error}")
+            continue
+        correo.intentos += 1
+        if correo.id not in errores:
+            correo.estado = CorreoPendiente.Estado.ENVIADO
+            correo.fecha_envio = ahora
+            correo.ultimo_error = ''
+            # Puede llevar una contraseña temporal o un enlace de recuperación.
+            correo.cuerpo = correo.cuerpo_html = ''
+            enviados += 1
+            continue
+        correo.ultimo_error = errores[correo.id]
+        if correo.intentos >= max_intentos:
+            correo.estado = CorreoPendiente.Estado.FALLIDO
+            fallidos += 1
+            logger.error(f"Correo #{correo.id} ('{correo.asunto}') descartado tras {correo.intentos} intentos: {correo.ultimo_error}")
+        else:
+            correo.proximo_intento = ahora + _retraso(correo.intentos)
+            logger.warning(f"Correo #{correo.id} falló (intento {correo.intentos}), se reintenta a las {correo.proximo_intento}: {correo.ultimo_error}")
+    CorreoPendiente.objects.bulk_update(
+        correos, ['estado', 'intentos', 'proximo_intento', 'ultimo_error', 'fecha_envio', 'cuerpo', 'cuerpo_html'],
+    )
+    return enviados, len(errores) - (fallidos - len(vencidos)), fallidos
+
+
+def procesar_correos(tamano_lote=50, max_intentos=MAX_INTENTOS, ahora=None, max_lotes=None):
+    """
+    Envía los correos pendientes cuyo próximo intento ya llegó: todos, o como mucho
+    `max_lotes` lotes (el cron de Vercel manda uno por llamada para no pasarse del
+    tiempo máximo de la función). Devuelve (enviados, reintentos_programados, fallidos).
+    """
+    ahora = ahora or timezone.now()
+    totales = [0, 0, 0]
+    lotes = 0
+    while max_lotes is None or lotes < max_lotes:
+        correos = _reclamar_lote(ahora, tamano_lote)
+        if not correos:
+            break
+        lotes += 1
+        for i, cantidad in enumerate(_enviar_lote(correos, max_intentos, ahora)):
+            totales[i] += cantidad
+    return tuple(totales)
+
+
+def enviar_correos(ids, max_intentos=MAX_INTENTOS):
+    """Intenta enviar ya esos correos (los que sigan pendientes). Mismo resultado que procesar_correos."""
+    correos = _reclamar_lote(timezone.now(), len(ids), ids=ids)
+    if not correos:
+        return (0, 0, 0)
+    return _enviar_lote(correos, max_intentos)
+
+
+def purgar_correos(dias=None, ahora=None):
+    """
+    Borra los correos enviados o fallidos con más de `dias` días (por defecto
+    CORREO_RETENCION_DIAS). Los pendientes nunca se borran. Devuelve cuántos borró.
+    """
+    dias = getattr(settings, 'CORREO_RETENCION_DIAS', 7) if dias is None else dias
+    limite = (ahora or timezone.now()) - timedelta(days=dias)
+    borrados, _ = CorreoPendiente.objects.filter(
+        estado__in=[CorreoPendiente.Estado.ENVIADO, CorreoPendiente.Estado.FALLIDO],
+        fecha_creacion__lt=limite,
+    ).delete()
+    return borrados
@@ -0,0 +1,52 @@
+# Notificaciones/management/commands/procesar_correos.py
+
+import time
+import logging
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from Notificaciones.correo import MAX_INTENTOS, procesar_correos, purgar_correos
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        'Envía los correos pendientes de la bandeja de salida (reintenta los fallidos con espera exponencial) '
+        'y borra los enviados o fallidos con más de CORREO_RETENCION_DIAS días.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=50, help='Correos que se envían por cada conexión al servidor de correo.')
+        parser.add_argument('--max-intentos', type=int, default=MAX_INTENTOS, help='Intentos antes de marcar un correo como fallido.')
+        parser.add_argument('--loop', action='store_true', help='Queda corriendo y revisa la bandeja cada --intervalo segundos.')
+        parser.add_argument('--intervalo', type=int, default=5, help='Segundos entre pasadas en modo --loop.')
+
+    def _ejecutar(self, options):
+        enviados, reintentos, fallidos = procesar_correos(tamano_lote=options['lote'], max_intentos=options['max_intentos'])
+        if enviados or reintentos or fallidos:
+            self.stdout.write(self.style.SUCCESS(
+                f'Correos enviados: {enviados}. Para reintentar: {reintentos}. Fallidos definitivamente: {fallidos}.'
+            ))
+        elif not options['loop']:
+            self.stdout.write(self.style.SUCCESS('No hay correos pendientes.'))
+        purgados = purgar_correos()
+        if purgados:
+            self.stdout.write(self.style.SUCCESS(f'Correos antiguos borrados: {purgados}.'))
+
+    def handle(self, *args, **options):
+        if not options['loop']:
+            self._ejecutar(options)
+            return
+
+        self.stdout.write(f"Procesando la bandeja de salida cada {options['intervalo']} segundos (Ctrl+C para salir).")
+        try:
+            while True:
+                close_old_connections()
+                try:
+                    self._ejecutar(options)
+                except Exception as e:
+                    logger.error(f'Error procesando la bandeja de correos: {e}')
+                time.sleep(options['intervalo'])
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.SUCCESS('Detenido.'))
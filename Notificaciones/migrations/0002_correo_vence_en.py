@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-17 21:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Notificaciones', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='correopendiente',
+            name='vence_en',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# backend/Notificaciones/models.py
+
+from django.db import models
+from django.utils import timezone
+
+
+class CorreoPendiente(models.Model):
+    """
+    Bandeja de salida: cada correo se guarda aquí en la misma transacción que el
+    cambio que lo origina y se envía al confirmarse o, si falla, en un reintento
+    (ver Notificaciones/correo.py). El cuerpo se borra una vez enviado.
+    """
+    class Estado(models.TextChoices):
+        PENDIENTE = 'pendiente', 'Pendiente'
+        ENVIADO = 'enviado', 'Enviado'
+        FALLIDO = 'fallido', 'Fallido (sin más reintentos)'
+
+    asunto = models.CharField(max_length=255)
+    cuerpo = models.TextField()
+    cuerpo_html = models.TextField(blank=True, default='')
+    remitente = models.CharField(max_length=255)
+    destinatarios = models.JSONField(default=list)
+    estado = models.CharField(max_length=10, choices=Estado.choices, default=Estado.PENDIENTE)
+    intentos = models.PositiveSmallIntegerField(default=0)
+    proximo_intento = models.DateTimeField(default=timezone.now)
+    ultimo_error = models.TextField(blank=True, default='')
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_envio = models.DateTimeField(null=True, blank=True)
+    # Si no salió antes de esta hora se descarta (p. ej. un enlace de recuperación ya caducado).
+    vence_en = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.asunto} -> {', '.join(self.destinatarios)} ({self.get_estado_display()})"
+
+    class Meta:
+        verbose_name = "Correo Pendiente"
+        verbose_name_plural = "Correos Pendientes"
+        ordering = ['-fecha_creacion']
+        indexes = [
+            # El worker solo busca pendientes cuyo próximo intento ya llegó.
+            models.Index(fields=['proximo_intento', 'id'], name='correo_pendiente_cola_idx', condition=models.Q(estado='pendiente')),
+        ]
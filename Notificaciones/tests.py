@@ -0,0 +1,226 @@
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .correo import RETRASO_BASE, encolar_correo, encolar_correos, procesar_correos, purgar_correos
+from .models import CorreoPendiente
+
+
+class BackendQueFalla(BaseEmailBackend):
+    """Backend de correo que rechaza todos los envíos (simula un SMTP caído)."""
+
+    def send_messages(self, email_messages):
+        raise ConnectionError('SMTP no disponible')
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend', CORREO_ENVIO_INMEDIATO=False)
+class BandejaSalidaTests(TestCase):
+
+    def test_encolar_no_envia_hasta_procesar(self):
+        encolar_correo('Pedido recibido', 'Gracias por tu compra.', ['cliente@example.com'])
+
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(procesar_correos(), (1, 0, 0))
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['cliente@example.com'])
+        correo = CorreoPendiente.objects.get()
+        self.assertEqual(correo.estado, CorreoPendiente.Estado.ENVIADO)
+        self.assertEqual(correo.intentos, 1)
+        self.assertIsNotNone(correo.fecha_envio)
+        # Enviado, el cuerpo ya no se guarda.
+        self.assertEqual(correo.cuerpo, '')
+
+    def test_correo_html_va_como_alternativa(self):
+        encolar_correo('Cotización', 'Texto plano', ['cliente@example.com'], cuerpo_html='<p>HTML</p>')
+        procesar_correos()
+        self.assertEqual(mail.outbox[0].alternatives[0][0], '<p>HTML</p>')
+
+    def test_transaccion_deshecha_no_deja_correo(self):
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                encolar_correo('Pedido recibido', 'Gracias por tu compra.', ['cliente@example.com'])
+                encolar_correos([{'asunto': 'Aviso', 'cuerpo': 'x', 'destinatarios': ['otro@example.com']}])
+                raise RuntimeError('falla el cambio de negocio')
+
+        self.assertFalse(CorreoPendiente.objects.exists())
+        self.assertEqual(procesar_correos(), (0, 0, 0))
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_sin_destinatarios_no_se_encola(self):
+        self.assertIsNone(encolar_correo('Sin destino', 'x', ['', None]))
+        self.assertEqual(encolar_correos([{'asunto': 'Sin destino', 'cuerpo': 'x', 'destinatarios': []}]), 0)
+        self.assertFalse(CorreoPendiente.objects.exists())
+
+    @override_settings(EMAIL_BACKEND='Notificaciones.tests.BackendQueFalla')
+    def test_fallo_reintenta_con_espera_exponencial(self):
+        encolar_correo('Pedido recibido', 'Gracias por tu compra.', ['cliente@example.com'])
+
+        antes = timezone.now()
+        self.assertEqual(procesar_correos(), (0, 1, 0))
+        correo = CorreoPendiente.objects.get()
+        self.assertEqual(correo.estado, CorreoPendiente.Estado.PENDIENTE)
+        self.assertEqual(correo.intentos, 1)
+        self.assertIn('SMTP no disponible', correo.ultimo_error)
+        self.assertGreaterEqual(correo.proximo_intento, antes + RETRASO_BASE)
+
+        # Antes de su próximo intento no se vuelve a tomar.
+        self.assertEqual(procesar_correos(), (0, 0, 0))
+
+        # El segundo fallo espera el doble.
+        antes = timezone.now()
+        self.assertEqual(procesar_correos(ahora=correo.proximo_intento), (0, 1, 0))
+        correo.refresh_from_db()
+        self.assertEqual(correo.intentos, 2)
+        self.assertGreaterEqual(correo.proximo_intento, antes + 2 * RETRASO_BASE)
+        self.assertLess(correo.proximo_intento, antes + 3 * RETRASO_BASE)
+
+    @override_settings(EMAIL_BACKEND='Notificaciones.tests.BackendQueFalla')
+    def test_tras_max_intentos_queda_fallido(self):
+        encolar_correo('Pedido recibido', 'Gracias por tu compra.', ['cliente@example.com'])
+
+        self.assertEqual(procesar_correos(max_intentos=2), (0, 1, 0))
+        correo = CorreoPendiente.objects.get()
+        self.assertEqual(procesar_correos(max_intentos=2, ahora=correo.proximo_intento), (0, 0, 1))
+
+        correo.refresh_from_db()
+        self.assertEqual(correo.estado, CorreoPendiente.Estado.FALLIDO)
+        self.assertEqual(correo.intentos, 2)
+        # Un correo fallido ya no se vuelve a tomar.
+        self.assertEqual(procesar_correos(ahora=timezone.now() + timedelta(days=1)), (0, 0, 0))
+
+    def test_se_recupera_tras_un_fallo(self):
+        encolar_correo('Pedido recibido', 'Gracias por tu compra.', ['cliente@example.com'])
+        with override_settings(EMAIL_BACKEND='Notificaciones.tests.BackendQueFalla'):
+            procesar_correos()
+        correo = CorreoPendiente.objects.get()
+
+        self.assertEqual(procesar_correos(ahora=correo.proximo_intento), (1, 0, 0))
+        correo.refresh_from_db()
+        self.assertEqual(correo.estado, CorreoPendiente.Estado.ENVIADO)
+        self.assertEqual(correo.ultimo_error, '')
+        self.assertEqual(len(mail.outbox), 1)
+
+
+    def test_vencido_se_descarta_sin_enviar(self):
+        encolar_correo('Restablecer contraseña', 'https://example.com/reset/abc', ['cliente@example.com'], vigencia=timedelta(minutes=30))
+        correo = CorreoPendiente.objects.get()
+
+        self.assertEqual(procesar_correos(ahora=correo.vence_en), (0, 0, 1))
+        correo.refresh_from_db()
+        self.assertEqual(correo.estado, CorreoPendiente.Estado.FALLIDO)
+        self.assertEqual(correo.cuerpo, '')
+        self.assertIn('Venció', correo.ultimo_error)
+        self.assertEqual(len(mail.outbox), 0)
+
+    @override_settings(EMAIL_BACKEND='Notificaciones.tests.BackendQueFalla')
+    def test_no_reintenta_despues_de_vencer(self):
+        encolar_correo('Restablecer contraseña', 'https://example.com/reset/abc', ['cliente@example.com'], vigencia=timedelta(minutes=2))
+        self.assertEqual(procesar_correos(), (0, 1, 0))
+        correo = CorreoPendiente.objects.get()
+        self.assertEqual(procesar_correos(ahora=correo.proximo_intento), (0, 1, 0))
+        correo.refresh_from_db()
+
+        # El tercer intento ya cae después de vence_en.
+        self.assertGreater(correo.proximo_intento, correo.vence_en)
+        self.assertEqual(procesar_correos(ahora=correo.proximo_intento), (0, 0, 1))
+        correo.refresh_from_db()
+        self.assertEqual(correo.intentos, 2)
+        self.assertEqual(correo.cuerpo, '')
+
+    def test_purgar_borra_solo_los_antiguos_terminados(self):
+        encolar_correos([
+            {'asunto': 'Enviado', 'cuerpo': 'x', 'destinatarios': ['a@example.com']},
+            {'asunto': 'Fallido', 'cuerpo': 'x', 'destinatarios': ['b@example.com']},
+            {'asunto': 'Pendiente', 'cuerpo': 'x', 'destinatarios': ['c@example.com']},
+            {'asunto': 'Reciente', 'cuerpo': 'x', 'destinatarios': ['d@example.com']},
+        ])
+        hace_un_mes = timezone.now() - timedelta(days=30)
+        CorreoPendiente.objects.exclude(asunto='Reciente').update(fecha_creacion=hace_un_mes)
+        CorreoPendiente.objects.filter(asunto__in=['Enviado', 'Reciente']).update(estado=CorreoPendiente.Estado.ENVIADO)
+        CorreoPendiente.objects.filter(asunto='Fallido').update(estado=CorreoPendiente.Estado.FALLIDO)
+
+        self.assertEqual(purgar_correos(dias=7), 2)
+        self.assertEqual(set(CorreoPendiente.objects.values_list('asunto', flat=True)), {'Pendiente', 'Reciente'})
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend', CORREO_ENVIO_INMEDIATO=True)
+class EnvioInmediatoTests(TestCase):
+
+    def test_se_envia_al_confirmar_la_transaccion(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            encolar_correo('Pedido recibido', 'Gracias por tu compra.', ['cliente@example.com'])
+            encolar_correos([{'asunto': 'Aviso', 'cuerpo': 'x', 'destinatarios': ['otro@example.com']}])
+            self.assertEqual(len(mail.outbox), 0)
+
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertFalse(CorreoPendiente.objects.exclude(estado=CorreoPendiente.Estado.ENVIADO).exists())
+        self.assertEqual(procesar_correos(), (0, 0, 0))
+
+    @override_settings(EMAIL_BACKEND='Notificaciones.tests.BackendQueFalla')
+    def test_si_falla_queda_para_reintentar(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            encolar_correo('Pedido recibido', 'Gracias por tu compra.', ['cliente@example.com'])
+
+        correo = CorreoPendiente.objects.get()
+        self.assertEqual(correo.estado, CorreoPendiente.Estado.PENDIENTE)
+        self.assertEqual(correo.intentos, 1)
+        self.assertEqual(correo.cuerpo, 'Gracias por tu compra.')
+        with override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend'):
+            self.assertEqual(procesar_correos(ahora=correo.proximo_intento), (1, 0, 0))
+
+
+@override_settings(
+    EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+    CORREO_ENVIO_INMEDIATO=False,
+    CRON_SECRET='secreto-del-cron',
+)
+class ProcesarCorreosViewTests(TestCase):
+    url = '/api/notificaciones/procesar/'
+
+    def test_requiere_el_secreto_del_cron(self):
+        encolar_correo('Pedido recibido', 'x', ['cliente@example.com'])
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+        self.assertEqual(self.client.get(self.url, HTTP_AUTHORIZATION='Bearer otro').status_code, 401)
+        with override_settings(CRON_SECRET=''):
+            self.assertEqual(self.client.get(self.url, HTTP_AUTHORIZATION='Bearer ').status_code, 401)
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_envia_un_lote(self):
+        encolar_correos([
+            {'asunto': f'Aviso {i}', 'cuerpo': 'x', 'destinatarios': ['cliente@example.com']}
+            for i in range(3)
+        ])
+        response = self.client.get(self.url, HTTP_AUTHORIZATION='Bearer secreto-del-cron')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'enviados': 3, 'reintentos': 0, 'fallidos': 0, 'purgados': 0})
+        self.assertEqual(len(mail.outbox), 3)
+
+
+class BandejaSalidaArchivoTests(TestCase):
+
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directorio, ignore_errors=True)
+
+    def test_envio_con_backend_de_archivos(self):
+        with override_settings(EMAIL_BACKEND='django.core.mail.backends.filebased.EmailBackend', EMAIL_FILE_PATH=self.directorio):
+            encolar_correos([
+                {'asunto': 'Primero', 'cuerpo': 'uno', 'destinatarios': ['a@example.com']},
+                {'asunto': 'Segundo', 'cuerpo': 'dos', 'destinatarios': ['b@example.com']},
+            ])
+            self.assertEqual(procesar_correos(), (2, 0, 0))
+
+        # Los dos van por la misma conexión: un solo archivo con ambos mensajes.
+        archivos = list(os.scandir(self.directorio))
+        self.assertEqual(len(archivos), 1)
+        with open(archivos[0].path, encoding='utf-8') as archivo:
+            contenido = archivo.read()
+        self.assertIn('Subject: Primero', contenido)
+        self.assertIn('Subject: Segundo', contenido)
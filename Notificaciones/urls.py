@@ -0,0 +1,8 @@
+# backend/Notificaciones/urls.py
+
+from django.urls import path
+from .views import ProcesarCorreosView
+
+urlpatterns = [
+    path('procesar/', ProcesarCorreosView.as_view(), name='notificaciones-procesar'),
+]
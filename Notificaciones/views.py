@@ -0,0 +1,40 @@
+# backend/Notificaciones/views.py
+
+import hmac
+
+from django.conf import settings
+from rest_framework import status
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .correo import procesar_correos, purgar_correos
+
+
+class ProcesarCorreosView(APIView):
+    """
+    Punto que llama el cron de Vercel (ver "crons" en vercel.json): envía un lote de
+    la bandeja de salida y borra los correos viejos. En Vercel no hay un proceso
+    que quede corriendo con `manage.py procesar_correos --loop`, así que los
+    reintentos dependen de esta llamada.
+
+    Vercel manda `Authorization: Bearer <CRON_SECRET>`; sin CRON_SECRET configurado
+    el punto queda deshabilitado.
+    """
+    # El token del cron no es un JWT: no pasa por la autenticación de la API.
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def get(self, request, *args, **kwargs):
+        secreto = getattr(settings, 'CRON_SECRET', '')
+        recibido = request.headers.get('Authorization', '')
+        if not secreto or not hmac.compare_digest(recibido.encode(), f'Bearer {secreto}'.encode()):
+            return Response({'detail': 'No autorizado.'}, status=status.HTTP_401_UNAUTHORIZED)
+
+        enviados, reintentos, fallidos = procesar_correos(max_lotes=1)
+        return Response({
+            'enviados': enviados,
+            'reintentos': reintentos,
+            'fallidos': fallidos,
+            'purgados': purgar_correos(),
+        })
@@ -1,10 +1,14 @@
 # Pedidos/emails.py
 
-from django.core.mail import send_mail
 from django.template.loader import render_to_string
 from django.utils.html import strip_tags
 from django.conf import settings
 
+from Notificaciones.correo import encolar_correo, encolar_correos
+
+# Los correos no se envían aquí: quedan en la bandeja de salida dentro de la misma
+# transacción que el cambio del pedido y los envía el comando procesar_correos.
+
 def enviar_correo_confirmacion_pedido(pedido):
     asunto = f"Confirmación de tu pedido #{pedido.id} en Depósito y Ferretería del Sur"
     
@@ -17,32 +21,36 @@ def enviar_correo_confirmacion_pedido(pedido):
     html_mensaje = render_to_string('emails/pedido_confirmacion.html', contexto)
     texto_plano = strip_tags(html_mensaje)
 
-    send_mail(
+    encolar_correo(
         asunto,
         texto_plano,
-        'noreply@ferreteriadelsur.com',
         [destinatario],
-        html_message=html_mensaje
+        remitente='noreply@ferreteriadelsur.com',
+        cuerpo_html=html_mensaje
     )
 
-def enviar_correo_actualizacion_estado(pedido):
+def _datos_actualizacion_estado(pedido):
     estado_amigable = pedido.get_estado_display()
-    asunto = f"Actualización de tu pedido #{pedido.id}: ¡Ahora está {estado_amigable}!"
-    
-    destinatario = pedido.cliente.correo if pedido.cliente else pedido.email_invitado
-    
     contexto = {
         'pedido': pedido,
         'estado_amigable': estado_amigable,
         'frontend_url': settings.FRONTEND_URL
     }
     html_mensaje = render_to_string('emails/pedido_actualizacion.html', contexto)
-    texto_plano = strip_tags(html_mensaje)
+    return {
+        'asunto': f"Actualización de tu pedido #{pedido.id}: ¡Ahora está {estado_amigable}!",
+        'cuerpo': strip_tags(html_mensaje),
+        'destinatarios': [pedido.cliente.correo if pedido.cliente else pedido.email_invitado],
+        'remitente': 'noreply@ferreteriadelsur.com',
+        'cuerpo_html': html_mensaje,
+    }
 
-    send_mail(
-        asunto,
-        texto_plano,
-        'noreply@ferreteriadelsur.com',
-        [destinatario],
-        html_message=html_mensaje
-    )
+def enviar_correo_actualizacion_estado(pedido):
+    encolar_correo(**_datos_actualizacion_estado(pedido))
+
+def enviar_correos_actualizacion_estado(pedidos):
+    """
+    Igual que enviar_correo_actualizacion_estado pero para muchos pedidos a la vez:
+    se encolan todos con un solo INSERT. Devuelve cuántos se encolaron.
+    """
+    return encolar_correos([_datos_actualizacion_estado(pedido) for pedido in pedidos])
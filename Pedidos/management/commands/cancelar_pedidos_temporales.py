@@ -1,8 +1,10 @@
 # Pedidos/management/commands/cancelar_pedidos_temporales.py
 
+import time
+
 from django.core.management.base import BaseCommand
-from django.utils import timezone
-from Pedidos.models import Pedido
+from django.db import close_old_connections
+from Pedidos.vencimiento import cancelar_pedidos_vencidos
 import logging
 
 logger = logging.getLogger(__name__)
@@ -10,25 +12,32 @@ logger = logging.getLogger(__name__)
 class Command(BaseCommand):
     help = 'Cancela los pedidos temporales que han excedido su tiempo límite de pago de 60 minutos.'
 
-    def handle(self, *args, **options):
-        ahora = timezone.now()
-
-        # Buscamos pedidos que están en estado temporal y cuya fecha límite ya pasó
-        pedidos_a_cancelar = Pedido.objects.filter(
-            estado='pendiente_pago_temporal',
-            fecha_limite_pago__lte=ahora
-        )
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=500, help='Cantidad de pedidos por transacción.')
+        parser.add_argument('--loop', action='store_true', help='Queda corriendo y repite la limpieza cada --intervalo segundos (sin cron).')
+        parser.add_argument('--intervalo', type=int, default=60, help='Segundos entre pasadas en modo --loop.')
 
-        if not pedidos_a_cancelar.exists():
+    def _ejecutar(self, lote):
+        count = cancelar_pedidos_vencidos(tamano_lote=lote)
+        if count:
+            self.stdout.write(self.style.SUCCESS(f'Se cancelaron exitosamente {count} pedidos.'))
+        else:
             self.stdout.write(self.style.SUCCESS('No hay pedidos temporales para cancelar.'))
-            return
 
-        count = 0
-        for pedido in pedidos_a_cancelar:
-            pedido.estado = 'cancelado_por_inactividad'
-            pedido.motivo_cancelacion = 'El pago no fue confirmado dentro de la hora límite.'
-            pedido.save()
-            count += 1
-            logger.info(f'Pedido #{pedido.id} cancelado por inactividad.')
+    def handle(self, *args, **options):
+        if not options['loop']:
+            self._ejecutar(options['lote'])
+            return
 
-        self.stdout.write(self.style.SUCCESS(f'Se cancelaron exitosamente {count} pedidos.'))
\ No newline at end of file
+        self.stdout.write(f"Cancelando pedidos vencidos cada {options['intervalo']} segundos (Ctrl+C para salir).")
+        try:
+            while True:
+                # Descarta conexiones caídas o vencidas entre pasadas, como entre peticiones.
+                close_old_connections()
+                try:
+                    self._ejecutar(options['lote'])
+                except Exception as e:
+                    logger.error(f'Error cancelando pedidos temporales: {e}')
+                time.sleep(options['intervalo'])
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.SUCCESS('Detenido.'))
@@ -8,6 +8,7 @@ import logging
 from django.db.models import Q
 from django.core.exceptions import ValidationError
 from datetime import timedelta
+from backend_api.mixins import RastreoEstadoMixin
 
 
 logger = logging.getLogger(__name__)
@@ -27,7 +28,7 @@ class ComprobantePago(models.Model):
         verbose_name_plural = "Comprobantes de Pago"
         ordering = ['-fecha_subida']
 
-class Pedido(models.Model):
+class Pedido(RastreoEstadoMixin, models.Model):
     ESTADO_CHOICES = [('pendiente_pago', 'Pendiente de Pago'), ('pendiente_pago_temporal', 'Pendiente de Pago (1h)'), ('en_verificacion', 'En Verificación de Pago'), ('pago_incompleto', 'Pago Incompleto'), ('confirmado', 'Confirmado y en Preparación'), ('en_camino', 'En Camino'), ('entregado', 'Entregado'), ('cancelado', 'Cancelado'), ('cancelado_por_inactividad', 'Cancelado por Inactividad')]
     METODO_ENTREGA_CHOICES = [('domicilio', 'Domicilio'), ('tienda', 'Reclamar en Tienda')]
 
@@ -64,27 +65,27 @@ class Pedido(models.Model):
     
     @transaction.atomic
     def descontar_stock(self):
+        from Stock.models import MovimientoStock
+        from Stock.reservas import liberar_reservas
+        from Stock.servicios import descontar_stock
         logger.info(f"Iniciando descuento de stock para el Pedido #{self.id}.")
-        for detalle in self.detalles.all():
-            producto = detalle.producto
-            if producto.stock_actual < detalle.cantidad:
-                logger.error(f"Stock insuficiente para {producto.nombre} (ID: {producto.id}) en Pedido #{self.id}.")
-                raise ValidationError(f"No hay stock suficiente para '{producto.nombre}'. Disponible: {producto.stock_actual}, Requerido: {detalle.cantidad}.")
-            
-            producto.stock_actual -= detalle.cantidad
-            producto.save(update_fields=['stock_actual'])
-            logger.info(f"Stock de '{producto.nombre}' actualizado a {producto.stock_actual}.")
-        logger.info(f"Descuento de stock completado para el Pedido #{self.id}.")
+        # La reserva del propio pedido se convierte en descuento real; las de otros
+        # pedidos pendientes se respetan.
+        liberar_reservas([self.pk])
+        try:
+            saldos = descontar_stock(self.detalles.values_list('producto_id', 'cantidad'), MovimientoStock.Tipo.PEDIDO, self, respetar_reservas=True)
+        except ValidationError as e:
+            logger.error(f"Stock insuficiente en Pedido #{self.id}: {e.messages}")
+            raise
+        logger.info(f"Descuento de stock completado para el Pedido #{self.id} ({len(saldos)} productos).")
 
     @transaction.atomic
     def restaurar_stock(self):
+        from Stock.models import MovimientoStock
+        from Stock.servicios import reponer_stock
         logger.info(f"Restaurando stock para el Pedido cancelado #{self.id}.")
-        for detalle in self.detalles.all():
-            if detalle.producto:
-                producto = detalle.producto
-                producto.stock_actual += detalle.cantidad
-                producto.save(update_fields=['stock_actual'])
-                logger.info(f"Stock de '{producto.nombre}' restaurado a {producto.stock_actual}.")
+        saldos = reponer_stock(self.detalles.values_list('producto_id', 'cantidad'), MovimientoStock.Tipo.PEDIDO_CANCELACION, self)
+        logger.info(f"Stock restaurado para el Pedido #{self.id} ({len(saldos)} productos).")
 
     @transaction.atomic
     def _process_confirmation(self):
@@ -117,24 +118,33 @@ class Pedido(models.Model):
             except ValidationError as e:
                 self.estado = 'pago_incompleto'
                 Pedido.objects.filter(pk=self.pk).update(estado='pago_incompleto')
+                self.sincronizar_valores_originales(['estado'])
                 raise e
             except Exception as e:
                 logger.error(f"Error al crear la venta para el pedido {self.id}: {e}")
                 self.estado = 'pago_incompleto'
                 Pedido.objects.filter(pk=self.pk).update(estado='pago_incompleto')
+                self.sincronizar_valores_originales(['estado'])
                 raise ValidationError(f"Hubo un error al procesar el pedido. Contacta al administrador. Detalle: {e}")
 
     def save(self, *args, **kwargs):
-        is_new = not self.pk
-        estado_anterior = None
-        if not is_new:
-            try:
-                original = Pedido.objects.get(pk=self.pk)
-                estado_anterior = original.estado
-            except Pedido.DoesNotExist:
-                pass
-        
+        estado_anterior = self.estado_original
         super().save(*args, **kwargs)
+        self.sincronizar_valores_originales(kwargs.get('update_fields'))
+
+        from Ventas.resumen import ESTADOS_PEDIDO_CONTADOS, programar_recalculo
+        if (self.estado in ESTADOS_PEDIDO_CONTADOS) != (estado_anterior in ESTADOS_PEDIDO_CONTADOS):
+            programar_recalculo(timezone.localdate(self.fecha_creacion))
+
+        # La reserva se mantiene mientras el pago está en verificación; al confirmar la
+        # libera descontar_stock justo antes de descontar, y aquí solo al cancelar.
+        if self.estado != estado_anterior:
+            if self.estado in ['cancelado', 'cancelado_por_inactividad']:
+                from Stock.reservas import liberar_reservas
+                liberar_reservas([self.pk])
+            elif self.estado in ['en_verificacion', 'pago_incompleto']:
+                from Stock.reservas import extender_reservas
+                extender_reservas([self.pk])
         
         if self.estado in ['cancelado', 'cancelado_por_inactividad'] and estado_anterior == 'confirmado':
             self.restaurar_stock()
@@ -14,6 +14,8 @@ from Productos.models import Producto
 from Creditos.models import Credito
 from Clientes.models import Cliente as ModeloCliente
 from .emails import enviar_correo_confirmacion_pedido
+from Stock.reservas import disponible, reservar_stock_pedido
+from Stock.servicios import StockInsuficienteError
 
 class ComprobantePagoSerializer(serializers.ModelSerializer):
     class Meta:
@@ -128,6 +130,8 @@ class PedidoSerializer(serializers.ModelSerializer):
         subtotal_pedido = Decimal('0.00')
         ids_productos = [item['id'] for item in productos_data]
         productos_db = {p.id: p for p in Producto.objects.filter(id__in=ids_productos)}
+        # Lo reservado por otros pedidos pendientes de pago no está disponible.
+        stock_disponible = disponible(list(productos_db))
 
         for item in productos_data:
             producto = productos_db.get(item['id'])
@@ -136,7 +140,7 @@ class PedidoSerializer(serializers.ModelSerializer):
             if producto.precio_venta <= 0:
                 raise serializers.ValidationError(f"El producto '{producto.nombre}' no tiene un precio válido y no se puede comprar.")
             cantidad = int(item['quantity'])
-            if producto.stock_actual < cantidad:
+            if stock_disponible.get(producto.id, 0) < cantidad:
                 raise serializers.ValidationError(f"Stock insuficiente para {producto.nombre}.")
             subtotal_pedido += Decimal(producto.precio_venta) * cantidad
         
@@ -192,6 +196,10 @@ class PedidoSerializer(serializers.ModelSerializer):
             pedido.estado = 'pendiente_pago_temporal'
             pedido.fecha_limite_pago = timezone.now() + timedelta(minutes=60)
             pedido.save(update_fields=['estado', 'fecha_limite_pago'])
+            try:
+                reservar_stock_pedido(pedido)
+            except StockInsuficienteError as e:
+                raise serializers.ValidationError({"productos": e.messages})
         
         if pedido.estado == 'confirmado':
             pedido._process_confirmation()
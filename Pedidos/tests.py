@@ -1,3 +1,96 @@
-from django.test import TestCase
+from decimal import Decimal
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from Clientes.models import Cliente
+from Notificaciones.models import CorreoPendiente
+from Productos.models import CategoriaProducto, Marca, Producto
+from Ventas.models import Venta
+
+from .models import ComprobantePago, DetallePedido, Pedido
+
+
+class ConfirmarPedidoTests(TestCase):
+
+    def setUp(self):
+        categoria = CategoriaProducto.objects.create(nombre='Obra gris', descripcion='')
+        marca = Marca.objects.create(nombre='Argos')
+        self.producto = Producto.objects.create(
+            nombre='Cemento', categoria=categoria, marca=marca, descripcion='',
+            precio_venta=Decimal('10.00'), stock_actual=5,
+        )
+        self.pedido = Pedido.objects.create(
+            estado='en_verificacion', total=Decimal('30.00'), subtotal=Decimal('30.00'),
+            nombre_receptor='Ana', telefono_receptor='3000000',
+            email_invitado='ana@example.com', documento_invitado='1010', tipo_documento_invitado='CC',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create_superuser('admin@example.com', 'clave-segura'))
+        self.url = f'/api/admin/pedidos/{self.pedido.pk}/'
+
+    def agregar_linea(self, cantidad):
+        DetallePedido.objects.create(pedido=self.pedido, producto=self.producto, cantidad=cantidad, precio_unitario=Decimal('10.00'))
+
+    def test_confirmar_crea_venta_descuenta_y_encola_correo(self):
+        self.agregar_linea(3)
+
+        response = self.client.patch(self.url, {'estado': 'confirmado'}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.pedido.refresh_from_db()
+        self.producto.refresh_from_db()
+        self.assertEqual(self.pedido.estado, 'confirmado')
+        self.assertIsNotNone(self.pedido.venta_asociada)
+        self.assertEqual(self.producto.stock_actual, 2)
+        self.assertTrue(CorreoPendiente.objects.filter(destinatarios=['ana@example.com']).exists())
+
+    def test_sin_stock_no_deja_cambios_a_medias(self):
+        self.agregar_linea(8)
+
+        response = self.client.patch(self.url, {'estado': 'confirmado'}, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.pedido.refresh_from_db()
+        self.producto.refresh_from_db()
+        self.assertEqual(self.pedido.estado, 'en_verificacion')
+        self.assertIsNone(self.pedido.venta_asociada)
+        self.assertFalse(Venta.objects.exists())
+        self.assertEqual(self.producto.stock_actual, 5)
+        self.assertFalse(CorreoPendiente.objects.exists())
+
+
+# Más filas que presupuesto: un N+1 lo excede seguro.
+FILAS = 11
+
+
+@override_settings(PRESUPUESTO_CONSULTAS_ESTRICTO=True)
+class PresupuestoConsultasTests(TestCase):
+
+    def setUp(self):
+        categoria = CategoriaProducto.objects.create(nombre='Obra gris', descripcion='')
+        marca = Marca.objects.create(nombre='Argos')
+        productos = [
+            Producto.objects.create(nombre=f'Producto {i}', categoria=categoria, marca=marca, descripcion='', precio_venta=Decimal('10.00'))
+            for i in range(2)
+        ]
+        for i in range(FILAS):
+            cliente = Cliente.objects.create(
+                nombre='Ana', apellido='Pérez', correo=f'ana{i}@example.com', telefono='3000000',
+                tipo_documento='CC', documento=f'10{i}', direccion='Calle 2', password='x',
+            )
+            pedido = Pedido.objects.create(
+                cliente=cliente, estado='en_verificacion', total=Decimal('20.00'),
+                nombre_receptor='Ana', telefono_receptor='3000000',
+            )
+            for producto in productos:
+                DetallePedido.objects.create(pedido=pedido, producto=producto, cantidad=1, precio_unitario=Decimal('10.00'))
+            ComprobantePago.objects.create(pedido=pedido, imagen='comprobantes/pago.png')
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create_superuser('admin@example.com', 'clave-segura'))
+
+    def test_listado_administrativo(self):
+        response = self.client.get('/api/admin/pedidos/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), FILAS)
@@ -0,0 +1,52 @@
+# Pedidos/vencimiento.py
+"""
+Cancelación en bloque de los pedidos temporales cuyo plazo de pago ya venció.
+
+Se procesan lotes de ids tomados con SELECT ... FOR UPDATE SKIP LOCKED (dos
+instancias del comando no se pisan y no se espera a pedidos que alguien está
+editando). Cada lote se cancela con un solo UPDATE, libera sus reservas con un solo
+DELETE y deja los avisos a los clientes en la bandeja de salida con un solo INSERT.
+Los pedidos temporales nunca descontaron stock, así que no hay stock que restaurar.
+"""
+
+import logging
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Pedido
+
+logger = logging.getLogger(__name__)
+
+MOTIVO_VENCIMIENTO = 'El pago no fue confirmado dentro de la hora límite.'
+
+
+def cancelar_pedidos_vencidos(ahora=None, tamano_lote=500):
+    """Cancela todos los pedidos temporales vencidos y devuelve cuántos fueron."""
+    from Stock.reservas import liberar_reservas, liberar_reservas_vencidas
+    from .emails import enviar_correos_actualizacion_estado
+
+    ahora = ahora or timezone.now()
+    vencidos = Pedido.objects.filter(estado='pendiente_pago_temporal', fecha_limite_pago__lte=ahora)
+
+    total = 0
+    while True:
+        with transaction.atomic():
+            ids = list(
+                vencidos.select_for_update(skip_locked=True)
+                .order_by('id').values_list('id', flat=True)[:tamano_lote]
+            )
+            if not ids:
+                break
+            Pedido.objects.filter(id__in=ids).update(
+                estado='cancelado_por_inactividad',
+                motivo_cancelacion=MOTIVO_VENCIMIENTO,
+            )
+            liberar_reservas(ids)
+            enviar_correos_actualizacion_estado(Pedido.objects.filter(id__in=ids).select_related('cliente'))
+        total += len(ids)
+        logger.info(f'Cancelados por inactividad {len(ids)} pedidos (de #{ids[0]} a #{ids[-1]}).')
+
+    # Reservas vencidas que hayan quedado de otros pedidos (ya no descontaban del disponible).
+    liberar_reservas_vencidas(ahora)
+    return total
@@ -101,10 +101,11 @@ class ClientePedidoListView(generics.ListAPIView):
         ).prefetch_related('detalles__producto', 'comprobantes').order_by('-id')
 
 class AdminPedidoListView(generics.ListAPIView):
- queryset = Pedido.objects.filter(es_carrito_activo=False).select_related('cliente').prefetch_related('comprobantes').order_by('-id')
+ queryset = Pedido.objects.filter(es_carrito_activo=False).select_related('cliente').prefetch_related('detalles__producto', 'comprobantes').order_by('-id')
  serializer_class = PedidoSerializer
  permission_classes = [permissions.IsAuthenticated, HasPrivilege]
  required_privilege = "pedidos_ver"
+ presupuesto_consultas = 10
 
 
  filter_backends = [DjangoFilterBackend, SearchFilter]
@@ -174,14 +175,17 @@ class AdminPedidoDetailView(generics.RetrieveUpdateAPIView):
             pedido.monto_pagado_verificado = Decimal('0.00')
 
         try:
-            pedido.estado = nuevo_estado
-            pedido.save()
+            # Cambio de estado, venta y stock, y correo en una sola transacción: si
+            # falla la confirmación (p. ej. por stock) el pedido queda como estaba.
+            with transaction.atomic():
+                pedido.estado = nuevo_estado
+                pedido.save()
 
-            if nuevo_estado == 'confirmado':
-                 pedido._process_confirmation()
+                if nuevo_estado == 'confirmado':
+                    pedido._process_confirmation()
 
-            if nuevo_estado in ['confirmado', 'en_camino', 'entregado', 'pago_incompleto', 'cancelado', 'cancelado_por_inactividad']:
-                enviar_correo_actualizacion_estado(pedido)
+                if nuevo_estado in ['confirmado', 'en_camino', 'entregado', 'pago_incompleto', 'cancelado', 'cancelado_por_inactividad']:
+                    enviar_correo_actualizacion_estado(pedido)
         except ValidationError as e:
             return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
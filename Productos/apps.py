@@ -3,4 +3,8 @@ from django.apps import AppConfig
 
 class ProductosConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'Productos'
\ No newline at end of file
+    name = 'Productos'
+
+    def ready(self):
+        # Registra los receptores que invalidan la caché del catálogo.
+        from . import signals  # noqa: F401
@@ -0,0 +1,189 @@
+# backend_api/Productos/busqueda.py
+"""
+Búsqueda de productos por texto para el catálogo.
+
+En Postgres cada producto guarda un `search_vector` ponderado
+(nombre > marca > categoría > descripción) con la configuración `es_unaccent`
+(stemming en español y sin tildes) y un índice GIN. En otros motores (SQLite en
+pruebas) se usa un índice invertido en memoria con las mismas reglas, que se
+reconstruye cuando cambia la versión del catálogo.
+"""
+
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.db.models import Case, F, IntegerField, OuterRef, Subquery, Value, When
+
+from .cache import obtener_version_catalogo
+from .models import CategoriaProducto, Marca, Producto
+
+
+CONFIG_BUSQUEDA = 'es_unaccent'
+
+# Campos de texto de Producto que alimentan el vector; si un save(update_fields=...)
+# no toca ninguno, no hace falta recalcularlo.
+CAMPOS_BUSQUEDA = {'nombre', 'descripcion', 'marca', 'marca_id', 'categoria', 'categoria_id'}
+
+# Mismos pesos que usa Postgres por defecto para A, B, C y D.
+PESOS = {'A': 1.0, 'B': 0.4, 'C': 0.2, 'D': 0.1}
+
+_SUFIJOS = (
+    'amientos', 'imientos', 'amiento', 'imiento', 'aciones', 'iciones', 'uciones',
+    'acion', 'icion', 'ucion', 'idades', 'idad', 'mente', 'erias', 'eria',
+    'ables', 'ibles', 'able', 'ible', 'istas', 'ista', 'adoras', 'adores', 'adora', 'ador',
+    'ados', 'idos', 'adas', 'idas', 'ado', 'ido', 'ada', 'ida',
+    'osos', 'osas', 'oso', 'osa', 'es', 'os', 'as', 's', 'o', 'a', 'e',
+)
+
+_PALABRAS_VACIAS = {
+    'de', 'la', 'el', 'los', 'las', 'y', 'en', 'con', 'para', 'por', 'un', 'una',
+    'del', 'al', 'o', 'a', 'x', 'sin',
+}
+
+
+def usa_postgres():
+    return connection.vendor == 'postgresql'
+
+
+# --- Normalización compartida ---
+
+def normalizar(texto):
+    """Minúsculas y sin tildes ('Tubería' -> 'tuberia')."""
+    texto = unicodedata.normalize('NFKD', texto or '')
+    return ''.join(c for c in texto if not unicodedata.combining(c)).lower()
+
+
+def raiz(palabra):
+    """Stemming ligero en español: quita el primer sufijo conocido que deje al menos 3 letras."""
+    for sufijo in _SUFIJOS:
+        if palabra.endswith(sufijo) and len(palabra) - len(sufijo) >= 3:
+            return palabra[:-len(sufijo)]
+    return palabra
+
+
+def terminos(texto):
+    palabras = re.findall(r'[a-z0-9ñ]+', normalizar(texto))
+    return [raiz(p) for p in palabras if p not in _PALABRAS_VACIAS]
+
+
+# --- Postgres ---
+
+def _vector_busqueda():
+    marca = Marca.objects.filter(pk=OuterRef('marca_id')).values('nombre')[:1]
+    categoria = CategoriaProducto.objects.filter(pk=OuterRef('categoria_id')).values('nombre')[:1]
+    return (
+        SearchVector('nombre', weight='A', config=CONFIG_BUSQUEDA)
+        + SearchVector(Subquery(marca), weight='B', config=CONFIG_BUSQUEDA)
+        + SearchVector(Subquery(categoria), weight='C', config=CONFIG_BUSQUEDA)
+        + SearchVector('descripcion', weight='D', config=CONFIG_BUSQUEDA)
+    )
+
+
+def actualizar_vectores(queryset):
+    """Recalcula el vector de los productos del queryset en un solo UPDATE (solo Postgres)."""
+    if usa_postgres():
+        queryset.update(search_vector=_vector_busqueda())
+
+
+def _consulta_postgres(texto):
+    # Cada palabra se busca como prefijo ("cem" encuentra "cemento") y todas deben aparecer.
+    palabras = re.findall(r'[^\W_]+', texto)
+    if not palabras:
+        return None
+    return SearchQuery(' & '.join(f'{p}:*' for p in palabras), config=CONFIG_BUSQUEDA, search_type='raw')
+
+
+# --- Respaldo en memoria ---
+
+class IndiceBusqueda:
+    """Índice invertido término -> {producto_id: peso} con las reglas de arriba."""
+
+    def __init__(self, filas):
+        self.terminos = defaultdict(dict)
+        for fila in filas:
+            campos = (
+                (fila['nombre'], 'A'),
+                (fila['marca__nombre'], 'B'),
+                (fila['categoria__nombre'], 'C'),
+                (fila['descripcion'], 'D'),
+            )
+            for texto, peso in campos:
+                for termino in terminos(texto):
+                    actual = self.terminos[termino].get(fila['id'], 0)
+                    self.terminos[termino][fila['id']] = max(actual, PESOS[peso])
+
+    def buscar(self, texto):
+        """Devuelve {producto_id: puntaje} de los productos que contienen todas las palabras."""
+        resultado = None
+        for consulta in terminos(texto):
+            coincidencias = {}
+            for termino, productos in self.terminos.items():
+                if termino.startswith(consulta):
+                    for producto_id, peso in productos.items():
+                        coincidencias[producto_id] = max(coincidencias.get(producto_id, 0), peso)
+            if resultado is None:
+                resultado = coincidencias
+            else:
+                resultado = {pid: resultado[pid] + peso for pid, peso in coincidencias.items() if pid in resultado}
+            if not resultado:
+                return {}
+        return resultado or {}
+
+
+_indice = None
+_version_indice = None
+_lock = threading.Lock()
+
+
+def obtener_indice():
+    global _indice, _version_indice
+    version = obtener_version_catalogo()
+    if _indice is None or _version_indice != version:
+        with _lock:
+            if _indice is None or _version_indice != version:
+                filas = Producto.objects.values(
+                    'id', 'nombre', 'descripcion', 'marca__nombre', 'categoria__nombre'
+                )
+                _indice = IndiceBusqueda(filas)
+                _version_indice = version
+    return _indice
+
+
+# --- Punto de entrada ---
+
+def buscar_productos(queryset, texto, prefijo=''):
+    """
+    Filtra el queryset por el texto buscado y lo ordena por relevancia
+    (a igual relevancia, por nombre). Con prefijo='producto__' sirve para
+    querysets de ProductoCatalogo, que buscan en el vector de su producto.
+    """
+    if not terminos(texto):
+        # Solo palabras vacías o signos: no hay nada que buscar.
+        return queryset
+
+    if usa_postgres():
+        consulta = _consulta_postgres(texto)
+        if consulta is None:
+            return queryset
+        return queryset.filter(**{f'{prefijo}search_vector': consulta}).annotate(
+            relevancia=SearchRank(F(f'{prefijo}search_vector'), consulta)
+        ).order_by('-relevancia', 'nombre')
+
+    puntajes = obtener_indice().buscar(texto)
+    if not puntajes:
+        return queryset.none()
+    # Se agrupan los productos por puntaje para que los empates queden por nombre.
+    niveles = defaultdict(list)
+    for producto_id, puntaje in puntajes.items():
+        niveles[puntaje].append(producto_id)
+    return queryset.filter(**{f'{prefijo}id__in': list(puntajes)}).annotate(
+        relevancia=Case(
+            *[When(**{f'{prefijo}id__in': ids}, then=Value(posicion))
+              for posicion, (_, ids) in enumerate(sorted(niveles.items(), reverse=True))],
+            output_field=IntegerField(),
+        )
+    ).order_by('relevancia', 'nombre')
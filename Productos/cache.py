@@ -0,0 +1,93 @@
+# backend_api/Productos/cache.py
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from backend_api.cache_compartida import cache_compartida, timeout_local, timeout_segun_cache
+
+
+CLAVE_VERSION_CATALOGO = 'catalogo:version'
+CLAVE_MODIFICADO_EN = 'catalogo:modificado_en'
+
+# Tiempo máximo que vive una respuesta en caché. La invalidación real la hace
+# la versión del catálogo, esto solo evita que la caché crezca sin control.
+# Con la caché local del proceso se usa CACHE_TIMEOUT_LOCAL (ver backend_api/cache_compartida.py).
+CATALOGO_CACHE_TIMEOUT = getattr(settings, 'CATALOGO_CACHE_TIMEOUT', 60 * 60)
+
+
+def obtener_version_catalogo():
+    """
+    Devuelve la versión actual del catálogo. Si la caché no la tiene (primer
+    arranque o la clave fue desalojada) se crea una nueva a partir de la hora
+    actual, así nunca coincide con una versión usada antes.
+
+    Si la caché es local del proceso, el incremento que hace otro worker al editar
+    el catálogo no llega aquí: la versión cambia además cada CACHE_TIMEOUT_LOCAL
+    segundos, y con ella las respuestas cacheadas y los índices de búsqueda.
+    """
+    version = cache.get(CLAVE_VERSION_CATALOGO)
+    if version is None:
+        version = time.time_ns()
+        if not cache.add(CLAVE_VERSION_CATALOGO, version, timeout=None):
+            version = cache.get(CLAVE_VERSION_CATALOGO, version)
+    if not cache_compartida():
+        return f'{version}.{int(time.time() // timeout_local())}'
+    return version
+
+
+def incrementar_version_catalogo():
+    cache.set(CLAVE_MODIFICADO_EN, time.time(), timeout=None)
+    try:
+        return cache.incr(CLAVE_VERSION_CATALOGO)
+    except ValueError:
+        # La clave no existía: crear una versión nueva ya invalida todo.
+        return obtener_version_catalogo()
+
+
+def marcar_catalogo_modificado():
+    """
+    Invalida las respuestas cacheadas del catálogo. El incremento se hace al
+    confirmar la transacción para que ninguna petición concurrente guarde
+    datos viejos bajo la versión nueva.
+    """
+    transaction.on_commit(incrementar_version_catalogo)
+
+
+def clave_respuesta_catalogo(nombre_vista, request):
+    """
+    Construye la clave de caché de una respuesta del catálogo a partir de los
+    parámetros que la determinan: búsqueda, categoría, página, tamaño y 'all'.
+    El host se incluye porque la paginación devuelve URLs absolutas.
+    """
+    params = request.query_params
+    partes = (
+        request.build_absolute_uri(request.path),
+        params.get('q', '').strip().lower(),
+        params.get('category', '').strip(),
+        params.get('page', '').strip(),
+        params.get('page_size', '').strip(),
+        params.get('all', '').strip().lower(),
+    )
+    huella = hashlib.sha1('|'.join(partes).encode('utf-8')).hexdigest()
+    return f"catalogo:respuesta:{nombre_vista}:{obtener_version_catalogo()}:{huella}"
+
+
+def obtener_respuesta_cacheada(clave):
+    return cache.get(clave)
+
+
+def guardar_respuesta_cacheada(clave, datos):
+    from backend_api.replicas import leyendo_de_replica
+
+    timeout = timeout_segun_cache(CATALOGO_CACHE_TIMEOUT)
+    if leyendo_de_replica():
+        # Justo después de un cambio la réplica puede no tenerlo todavía: lo leído se
+        # guarda solo por la ventana de replicación para no fijar datos viejos bajo la versión nueva.
+        ventana = getattr(settings, 'REPLICA_VENTANA_LECTURA', 5)
+        if time.time() - cache.get(CLAVE_MODIFICADO_EN, 0) < ventana:
+            timeout = min(timeout, ventana)
+    cache.set(clave, datos, timeout=timeout)
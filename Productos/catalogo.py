@@ -0,0 +1,199 @@
+# backend_api/Productos/catalogo.py
+"""
+Catálogo de la tienda.
+
+La tienda lista ProductoCatalogo: una fila por producto con la visibilidad ya
+resuelta, los datos de su categoría y marca y sus imágenes (ver models.py). Listar
+y filtrar es leer una sola tabla con índices parciales sobre visible=True.
+
+Este módulo tiene las dos mitades:
+
+- Sincronización: sincronizar_catalogo(ids) recalcula las filas de esos productos
+  leyendo Producto por proyección (solo las columnas necesarias, con categoría y
+  marca por JOIN) y con las imágenes de cada producto agrupadas por la base de
+  datos: en Postgres van en la misma consulta como arreglo JSON
+  (ARRAY(SELECT json_build_object(...))); en otros motores se traen con una sola
+  consulta adicional y se agrupan en Python. Se llama desde Productos/signals.py y
+  desde el servicio de stock, dentro de la misma transacción que el cambio.
+
+- Lectura: serializar_catalogo() arma desde las filas exactamente el mismo JSON que
+  ProductoSerializer (mismos campos y formato), sin instanciar modelos.
+"""
+
+import logging
+from collections import defaultdict
+from decimal import Decimal
+
+from django.contrib.postgres.expressions import ArraySubquery
+from django.db import connections, transaction
+from django.db.models import F, OuterRef
+from django.db.models.functions import JSONObject
+
+from .models import ImagenProducto, Producto, ProductoCatalogo
+
+logger = logging.getLogger(__name__)
+
+
+CAMPOS_PRODUCTO = (
+    'nombre', 'descripcion', 'imagen_url',
+    'peso', 'dimensiones', 'material', 'otros_detalles',
+    'precio_venta', 'ultimo_margen_aplicado', 'ultimo_costo_compra',
+    'stock_actual', 'stock_minimo', 'stock_maximo', 'activo',
+)
+CAMPOS_FILA = CAMPOS_PRODUCTO + (
+    'visible', 'categoria_id', 'categoria_nombre', 'categoria_descripcion', 'categoria_activo',
+    'marca_id', 'marca_nombre', 'marca_activo', 'imagenes', 'updated_at',
+)
+_DOS_DECIMALES = Decimal('0.01')
+
+
+# --- Sincronización ---
+
+def proyectar_catalogo(queryset):
+    """
+    Convierte un queryset de Producto en uno de dicts con las columnas que necesita
+    la fila del catálogo (y, en Postgres, sus imágenes ya agrupadas).
+    """
+    filas = queryset.values(
+        'id', *CAMPOS_PRODUCTO, 'updated_at', 'categoria_id', 'marca_id',
+        categoria_nombre=F('categoria__nombre'),
+        categoria_descripcion=F('categoria__descripcion'),
+        categoria_activo=F('categoria__activo'),
+        categoria_updated_at=F('categoria__updated_at'),
+        marca_nombre=F('marca__nombre'),
+        marca_activo=F('marca__activo'),
+        marca_updated_at=F('marca__updated_at'),
+    )
+    if connections[queryset.db].vendor == 'postgresql':
+        filas = filas.annotate(imagenes_agrupadas=ArraySubquery(
+            ImagenProducto.objects.filter(producto=OuterRef('pk')).order_by('id')
+            .values(json=JSONObject(id='id', imagen_url='imagen_url'))
+        ))
+    return filas
+
+
+def _con_imagenes(filas):
+    filas = list(filas)
+    if filas and 'imagenes_agrupadas' not in filas[0]:
+        # Fuera de Postgres: una sola consulta para las imágenes de todas las filas.
+        imagenes = defaultdict(list)
+        for producto_id, imagen_id, imagen_url in (
+            ImagenProducto.objects.filter(producto_id__in=[fila['id'] for fila in filas])
+            .order_by('producto_id', 'id').values_list('producto_id', 'id', 'imagen_url')
+        ):
+            imagenes[producto_id].append({'id': imagen_id, 'imagen_url': imagen_url})
+        for fila in filas:
+            fila['imagenes_agrupadas'] = imagenes.get(fila['id'], [])
+    return filas
+
+
+def _fila_catalogo(fila):
+    visible = (
+        fila['activo'] and fila['precio_venta'] > 0
+        and (fila['categoria_id'] is None or fila['categoria_activo'])
+        and (fila['marca_id'] is None or fila['marca_activo'])
+    )
+    return ProductoCatalogo(
+        producto_id=fila['id'],
+        visible=bool(visible),
+        **{campo: fila[campo] for campo in CAMPOS_PRODUCTO},
+        categoria_id=fila['categoria_id'],
+        categoria_nombre=fila['categoria_nombre'] or '',
+        categoria_descripcion=fila['categoria_descripcion'] or '',
+        categoria_activo=fila['categoria_activo'],
+        marca_id=fila['marca_id'],
+        marca_nombre=fila['marca_nombre'] or '',
+        marca_activo=fila['marca_activo'],
+        imagenes=fila['imagenes_agrupadas'],
+        updated_at=max(f for f in (fila['updated_at'], fila['categoria_updated_at'], fila['marca_updated_at']) if f),
+    )
+
+
+@transaction.atomic
+def sincronizar_catalogo(producto_ids, tamano_lote=500):
+    """
+    Recalcula las filas del catálogo de esos productos (un SELECT y un upsert por
+    lote). Los ids que ya no existen se borran del catálogo. Devuelve cuántas filas escribió.
+    """
+    ids = sorted(set(producto_ids))
+    escritas = 0
+    for inicio in range(0, len(ids), tamano_lote):
+        lote = ids[inicio:inicio + tamano_lote]
+        filas = [_fila_catalogo(fila) for fila in _con_imagenes(proyectar_catalogo(Producto.objects.filter(id__in=lote)))]
+        ProductoCatalogo.objects.bulk_create(
+            filas, update_conflicts=True, unique_fields=['producto'], update_fields=list(CAMPOS_FILA),
+        )
+        escritas += len(filas)
+        faltantes = set(lote) - {fila.producto_id for fila in filas}
+        if faltantes:
+            ProductoCatalogo.objects.filter(producto_id__in=faltantes).delete()
+    return escritas
+
+
+def sincronizar_productos_de(**filtro):
+    """Resincroniza los productos de una categoría o marca: sincronizar_productos_de(categoria_id=3)."""
+    return sincronizar_catalogo(Producto.objects.filter(**filtro).values_list('id', flat=True))
+
+
+def reconstruir_catalogo(tamano_lote=500):
+    """Reescribe el catálogo completo, en lotes por id. Devuelve cuántas filas quedaron."""
+    total = 0
+    ultimo_id = 0
+    while True:
+        ids = list(Producto.objects.filter(id__gt=ultimo_id).order_by('id').values_list('id', flat=True)[:tamano_lote])
+        if not ids:
+            break
+        total += sincronizar_catalogo(ids, tamano_lote)
+        ultimo_id = ids[-1]
+    # Filas de productos que ya no existen (no debería haber: la relación es CASCADE).
+    ProductoCatalogo.objects.exclude(producto_id__in=Producto.objects.values('id')).delete()
+    logger.info(f"Catálogo reconstruido: {total} productos.")
+    return total
+
+
+# --- Lectura ---
+
+def _decimal(valor):
+    # Mismo formato que DecimalField de DRF con decimal_places=2: '1500.00'.
+    return None if valor is None else format(Decimal(valor).quantize(_DOS_DECIMALES), 'f')
+
+
+def filas_catalogo(queryset):
+    """Queryset de ProductoCatalogo -> dicts con lo que usa serializar_catalogo (se puede paginar)."""
+    return queryset.values('producto_id', *CAMPOS_FILA)
+
+
+def serializar_catalogo(filas):
+    """Recibe las filas de filas_catalogo() y devuelve la lista para la respuesta, con el formato de ProductoSerializer."""
+    return [
+        {
+            'id': fila['producto_id'],
+            'nombre': fila['nombre'],
+            'descripcion': fila['descripcion'],
+            'imagen_url': fila['imagen_url'],
+            'peso': fila['peso'],
+            'dimensiones': fila['dimensiones'],
+            'material': fila['material'],
+            'otros_detalles': fila['otros_detalles'],
+            'imagenes': fila['imagenes'],
+            'precio_venta': _decimal(fila['precio_venta']),
+            'ultimo_margen_aplicado': _decimal(fila['ultimo_margen_aplicado']),
+            'ultimo_costo_compra': _decimal(fila['ultimo_costo_compra']),
+            'stock_actual': fila['stock_actual'],
+            'stock_minimo': fila['stock_minimo'],
+            'stock_maximo': fila['stock_maximo'],
+            'activo': fila['activo'],
+            'categoria': {
+                'id': fila['categoria_id'],
+                'nombre': fila['categoria_nombre'],
+                'descripcion': fila['categoria_descripcion'],
+                'activo': fila['categoria_activo'],
+            } if fila['categoria_id'] is not None else None,
+            'marca': {
+                'id': fila['marca_id'],
+                'nombre': fila['marca_nombre'],
+                'activo': fila['marca_activo'],
+            } if fila['marca_id'] is not None else None,
+        }
+        for fila in filas
+    ]
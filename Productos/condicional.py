@@ -0,0 +1,94 @@
+# backend_api/Productos/condicional.py
+
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from .models import CategoriaProducto, Producto
+
+
+# Se sube cuando cambia la forma de las respuestas (serializers), para que los
+# clientes no reutilicen cuerpos con el formato anterior.
+VERSION_FORMATO = '1'
+
+
+def construir_etag(*partes):
+    contenido = '|'.join(str(parte) for parte in (VERSION_FORMATO,) + partes)
+    return quote_etag(hashlib.sha1(contenido.encode('utf-8')).hexdigest())
+
+
+def _mas_reciente(*fechas):
+    fechas = [fecha for fecha in fechas if fecha is not None]
+    return max(fechas) if fechas else None
+
+
+def respuesta_no_modificada(request, etag, ultima_modificacion):
+    """
+    Devuelve un 304 si el cliente ya tiene esta versión (If-None-Match o
+    If-Modified-Since), o None si hay que construir la respuesta completa.
+    """
+    timestamp = int(ultima_modificacion.timestamp()) if ultima_modificacion else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is not None:
+        aplicar_cabeceras_condicionales(response, etag, ultima_modificacion)
+    return response
+
+
+def aplicar_cabeceras_condicionales(response, etag, ultima_modificacion, privada=False):
+    response['ETag'] = etag
+    if ultima_modificacion:
+        response['Last-Modified'] = http_date(ultima_modificacion.timestamp())
+    # no-cache: el cliente puede guardar el cuerpo pero debe revalidar siempre.
+    if privada:
+        patch_cache_control(response, private=True, no_cache=True)
+    else:
+        patch_cache_control(response, no_cache=True)
+    return response
+
+
+def huella_catalogo(queryset_catalogo, request):
+    """
+    Huella barata del catálogo: cantidad de filas y última modificación de las filas
+    filtradas de ProductoCatalogo (su updated_at ya incluye la categoría y la marca)
+    y de las categorías activas, que también van en la respuesta. Son dos agregados,
+    sin serializar nada.
+
+    Solo devuelve ETag (la fecha va en None): al borrar u ocultar un producto el
+    Max(updated_at) de lo que queda no avanza, y un If-Modified-Since daría un 304
+    falso. El ETag sí cambia porque incluye la cantidad de filas.
+    """
+    productos = queryset_catalogo.order_by().aggregate(
+        total=Count('pk'),
+        ultima=Max('updated_at'),
+    )
+    categorias = CategoriaProducto.objects.filter(activo=True).aggregate(
+        total=Count('id'),
+        ultima=Max('updated_at'),
+    )
+    etag = construir_etag(
+        request.get_full_path(),
+        productos['total'], productos['ultima'],
+        categorias['total'], categorias['ultima'],
+    )
+    return etag, None
+
+
+def huella_producto(pk):
+    """Huella del detalle de un producto, o None si no existe."""
+    fila = Producto.objects.filter(pk=pk).values(
+        'updated_at', 'categoria__updated_at', 'marca__updated_at'
+    ).first()
+    if fila is None:
+        return None
+    ultima = _mas_reciente(fila['updated_at'], fila['categoria__updated_at'], fila['marca__updated_at'])
+    etag = construir_etag('producto', pk, fila['updated_at'], fila['categoria__updated_at'], fila['marca__updated_at'])
+    return etag, ultima
+
+
+def huella_categorias(queryset_categorias, request):
+    """Como huella_catalogo: solo ETag, porque el Max(updated_at) no avanza al borrar."""
+    datos = queryset_categorias.order_by().aggregate(total=Count('id'), ultima=Max('updated_at'))
+    etag = construir_etag(request.get_full_path(), datos['total'], datos['ultima'])
+    return etag, None
@@ -3,6 +3,8 @@
 from django.core.management.base import BaseCommand
 from django.db import transaction
 from Productos.models import Producto, CategoriaProducto, Marca
+from Stock.models import MovimientoStock
+from Stock.servicios import aplicar_movimientos
 import csv
 
 class Command(BaseCommand):
@@ -22,42 +24,9 @@ class Command(BaseCommand):
 
                 for row in reader:
                     try:
-                        # --- Marca ---
-                        marca_nombre = row.get('marca_nombre', 'Generico').strip()
-                        marca, _ = Marca.objects.get_or_create(
-                            nombre__iexact=marca_nombre,
-                            defaults={'nombre': marca_nombre}
-                        )
-
-                        # --- Categoría ---
-                        categoria_nombre = row.get('categoria_nombre', 'Sin Categoría').strip()
-                        categoria, _ = CategoriaProducto.objects.get_or_create(
-                            nombre__iexact=categoria_nombre,
-                            defaults={'nombre': categoria_nombre, 'descripcion': 'Categoría creada automáticamente.'}
-                        )
-
-                        # --- Crear/Actualizar Producto ---
-                        producto, creado = Producto.objects.update_or_create(
-                            nombre=row['nombre'],
-                            defaults={
-                                'marca': marca,
-                                'categoria': categoria,
-                                'descripcion': row.get('descripcion', ''),
-                                'imagen_url': row.get('imagen_url', ''),
-                                'peso': row.get('peso', ''),
-                                'dimensiones': row.get('dimensiones', ''),
-                                'material': row.get('material', ''),
-                                'otros_detalles': row.get('otros_detalles', ''),
-                                'ultimo_costo_compra': float(row.get('ultimo_costo_compra', 0.00) or 0.00),
-                                'stock_actual': int(row.get('stock_actual', 0) or 0),
-                                'stock_minimo': int(row.get('stock_minimo', 0) or 0),
-                                'stock_maximo': int(row.get('stock_maximo', 0) or 0),
-                                'stock_defectuoso': int(row.get('stock_defectuoso', 0) or 0),
-                                'activo': row.get('activo', 'True').lower() in ['true', '1', 'yes', 'si'],
-                                'precio_venta': float(row.get('precio_venta', 0.00) or 0.00),
-                                'ultimo_margen_aplicado': float(row.get('ultimo_margen_aplicado', 0.00) or 0.00),
-                            }
-                        )
+                        # Cada fila va en su propio savepoint: si falla, no arrastra a las demás.
+                        with transaction.atomic():
+                            producto, creado = self.importar_fila(row)
 
                         if creado:
                             self.stdout.write(self.style.SUCCESS(f"✔ Producto '{producto.nombre}' CREADO exitosamente."))
@@ -71,3 +40,52 @@ class Command(BaseCommand):
             self.stdout.write(self.style.ERROR(f"El archivo en la ruta '{csv_file_path}' no fue encontrado."))
 
         self.stdout.write(self.style.SUCCESS('¡Proceso de importación finalizado!'))
+
+    def importar_fila(self, row):
+        # --- Marca ---
+        marca_nombre = row.get('marca_nombre', 'Generico').strip()
+        marca, _ = Marca.objects.get_or_create(
+            nombre__iexact=marca_nombre,
+            defaults={'nombre': marca_nombre}
+        )
+
+        # --- Categoría ---
+        categoria_nombre = row.get('categoria_nombre', 'Sin Categoría').strip()
+        categoria, _ = CategoriaProducto.objects.get_or_create(
+            nombre__iexact=categoria_nombre,
+            defaults={'nombre': categoria_nombre, 'descripcion': 'Categoría creada automáticamente.'}
+        )
+
+        stock_objetivo = int(row.get('stock_actual', 0) or 0)
+        if stock_objetivo < 0:
+            raise ValueError(f"stock_actual no puede ser negativo ({stock_objetivo}).")
+
+        # --- Crear/Actualizar Producto ---
+        # El stock vendible no se escribe aquí: entra por el servicio de stock para
+        # que quede en el kardex y en la tabla del catálogo.
+        producto, creado = Producto.objects.update_or_create(
+            nombre=row['nombre'],
+            defaults={
+                'marca': marca,
+                'categoria': categoria,
+                'descripcion': row.get('descripcion', ''),
+                'imagen_url': row.get('imagen_url', ''),
+                'peso': row.get('peso', ''),
+                'dimensiones': row.get('dimensiones', ''),
+                'material': row.get('material', ''),
+                'otros_detalles': row.get('otros_detalles', ''),
+                'ultimo_costo_compra': float(row.get('ultimo_costo_compra', 0.00) or 0.00),
+                'stock_minimo': int(row.get('stock_minimo', 0) or 0),
+                'stock_maximo': int(row.get('stock_maximo', 0) or 0),
+                'stock_defectuoso': int(row.get('stock_defectuoso', 0) or 0),
+                'activo': row.get('activo', 'True').lower() in ['true', '1', 'yes', 'si'],
+                'precio_venta': float(row.get('precio_venta', 0.00) or 0.00),
+                'ultimo_margen_aplicado': float(row.get('ultimo_margen_aplicado', 0.00) or 0.00),
+            }
+        )
+
+        # Producto nuevo: carga inicial. Producto existente: ajuste hasta el stock del archivo.
+        tipo = MovimientoStock.Tipo.SALDO_INICIAL if creado else MovimientoStock.Tipo.AJUSTE
+        aplicar_movimientos({producto.pk: stock_objetivo - producto.stock_actual}, tipo)
+        producto.stock_actual = stock_objetivo
+        return producto, creado
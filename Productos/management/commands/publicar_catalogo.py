@@ -0,0 +1,50 @@
+# Productos/management/commands/publicar_catalogo.py
+
+import time
+import logging
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from Productos.snapshot import ESPERA, ESPERA_MAXIMA, Publicador, huella_actual, leer_manifiesto, publicar_snapshot
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Publica la copia estática y comprimida del catálogo (products + categories) en el almacenamiento.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--forzar', action='store_true', help='Publica aunque el catálogo no haya cambiado.')
+        parser.add_argument('--loop', action='store_true', help='Queda corriendo y publica cuando el catálogo cambia (con antirrebote).')
+        parser.add_argument('--intervalo', type=int, default=5, help='Segundos entre revisiones en modo --loop.')
+        parser.add_argument('--espera', type=int, default=ESPERA, help='Segundos sin cambios antes de publicar.')
+        parser.add_argument('--espera-maxima', type=int, default=ESPERA_MAXIMA, help='Segundos máximos que un cambio espera publicación.')
+
+    def _informar(self, manifiesto):
+        self.stdout.write(self.style.SUCCESS(
+            f"Catálogo publicado: {manifiesto['url']} ({manifiesto['productos']} productos, {manifiesto['tamano']} bytes)."
+        ))
+
+    def handle(self, *args, **options):
+        if not options['loop']:
+            huella = huella_actual()
+            if not options['forzar'] and (leer_manifiesto() or {}).get('huella') == huella:
+                self.stdout.write(self.style.SUCCESS('El catálogo no cambió desde la última publicación.'))
+                return
+            self._informar(publicar_snapshot(huella))
+            return
+
+        publicador = Publicador(espera=options['espera'], espera_maxima=options['espera_maxima'])
+        self.stdout.write(f"Revisando el catálogo cada {options['intervalo']} segundos (Ctrl+C para salir).")
+        try:
+            while True:
+                close_old_connections()
+                try:
+                    manifiesto = publicador.revisar()
+                    if manifiesto is not None:
+                        self._informar(manifiesto)
+                except Exception as e:
+                    logger.error(f'Error publicando la copia del catálogo: {e}')
+                time.sleep(options['intervalo'])
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.SUCCESS('Detenido.'))
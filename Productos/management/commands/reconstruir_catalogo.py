@@ -0,0 +1,16 @@
+# Productos/management/commands/reconstruir_catalogo.py
+
+from django.core.management.base import BaseCommand
+
+from Productos.catalogo import reconstruir_catalogo
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye la tabla ProductoCatalogo que lee la tienda a partir de los productos, categorías y marcas.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=500, help='Productos por lote (un SELECT y un upsert por lote).')
+
+    def handle(self, *args, **options):
+        total = reconstruir_catalogo(tamano_lote=options['lote'])
+        self.stdout.write(self.style.SUCCESS(f'Catálogo reconstruido: {total} productos.'))
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.1 on 2026-10-17 10:00
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Productos', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='categoriaproducto',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now, verbose_name='Última actualización'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='marca',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now, verbose_name='Última actualización'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='producto',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now, verbose_name='Última actualización'),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.1 on 2026-10-17 10:30
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+# La configuración de texto, el índice GIN y el llenado inicial solo aplican en
+# Postgres; en otros motores (SQLite en pruebas) la búsqueda usa el índice en memoria.
+
+SQL_CREAR = """
+CREATE EXTENSION IF NOT EXISTS unaccent;
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'es_unaccent') THEN
+        CREATE TEXT SEARCH CONFIGURATION es_unaccent (COPY = spanish);
+        ALTER TEXT SEARCH CONFIGURATION es_unaccent
+            ALTER MAPPING FOR hword, hword_part, word WITH unaccent, spanish_stem;
+    END IF;
+END
+$$;
+CREATE INDEX IF NOT EXISTS productos_producto_search_vector_gin
+    ON "Productos_producto" USING GIN (search_vector);
+UPDATE "Productos_producto" p SET search_vector =
+    setweight(to_tsvector('es_unaccent', coalesce(p.nombre, '')), 'A') ||
+    setweight(to_tsvector('es_unaccent', coalesce((SELECT m.nombre FROM "Productos_marca" m WHERE m.id = p.marca_id), '')), 'B') ||
+    setweight(to_tsvector('es_unaccent', coalesce((SELECT c.nombre FROM "Productos_categoriaproducto" c WHERE c.id = p.categoria_id), '')), 'C') ||
+    setweight(to_tsvector('es_unaccent', coalesce(p.descripcion, '')), 'D');
+"""
+
+SQL_BORRAR = """
+DROP INDEX IF EXISTS productos_producto_search_vector_gin;
+DROP TEXT SEARCH CONFIGURATION IF EXISTS es_unaccent;
+"""
+
+
+def crear_busqueda(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(SQL_CREAR)
+
+
+def borrar_busqueda(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(SQL_BORRAR)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Productos', '0002_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='producto',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(crear_busqueda, borrar_busqueda),
+    ]
@@ -0,0 +1,105 @@
+# Generated by Django 5.2.1 on 2026-10-17 20:33
+
+import django.db.models.deletion
+from collections import defaultdict
+
+from django.db import migrations, models
+
+
+CAMPOS_PRODUCTO = (
+    'nombre', 'descripcion', 'imagen_url', 'peso', 'dimensiones', 'material', 'otros_detalles',
+    'precio_venta', 'ultimo_margen_aplicado', 'ultimo_costo_compra',
+    'stock_actual', 'stock_minimo', 'stock_maximo', 'activo',
+)
+
+
+def llenar_catalogo(apps, schema_editor):
+    # Llenado inicial con los modelos históricos (misma regla que Productos/catalogo.py).
+    # Después la tabla se mantiene sola; el comando reconstruir_catalogo la rehace.
+    Producto = apps.get_model('Productos', 'Producto')
+    ImagenProducto = apps.get_model('Productos', 'ImagenProducto')
+    ProductoCatalogo = apps.get_model('Productos', 'ProductoCatalogo')
+
+    ultimo_id = 0
+    while True:
+        productos = list(
+            Producto.objects.filter(id__gt=ultimo_id).select_related('categoria', 'marca').order_by('id')[:500]
+        )
+        if not productos:
+            break
+        imagenes = defaultdict(list)
+        for producto_id, imagen_id, imagen_url in (
+            ImagenProducto.objects.filter(producto_id__in=[p.id for p in productos])
+            .order_by('producto_id', 'id').values_list('producto_id', 'id', 'imagen_url')
+        ):
+            imagenes[producto_id].append({'id': imagen_id, 'imagen_url': imagen_url})
+
+        filas = []
+        for p in productos:
+            categoria, marca = p.categoria, p.marca
+            filas.append(ProductoCatalogo(
+                producto_id=p.id,
+                visible=bool(
+                    p.activo and p.precio_venta > 0
+                    and (categoria is None or categoria.activo)
+                    and (marca is None or marca.activo)
+                ),
+                **{campo: getattr(p, campo) for campo in CAMPOS_PRODUCTO},
+                categoria=categoria,
+                categoria_nombre=categoria.nombre if categoria else '',
+                categoria_descripcion=(categoria.descripcion or '') if categoria else '',
+                categoria_activo=categoria.activo if categoria else None,
+                marca=marca,
+                marca_nombre=marca.nombre if marca else '',
+                marca_activo=marca.activo if marca else None,
+                imagenes=imagenes.get(p.id, []),
+                updated_at=max(f.updated_at for f in (p, categoria, marca) if f is not None),
+            ))
+        ProductoCatalogo.objects.bulk_create(filas)
+        ultimo_id = productos[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Productos', '0003_producto_search_vector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductoCatalogo',
+            fields=[
+                ('producto', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='fila_catalogo', serialize=False, to='Productos.producto')),
+                ('visible', models.BooleanField(default=False)),
+                ('nombre', models.CharField(max_length=200)),
+                ('descripcion', models.TextField(blank=True)),
+                ('imagen_url', models.URLField(blank=True, max_length=1024, null=True)),
+                ('peso', models.CharField(blank=True, max_length=50)),
+                ('dimensiones', models.CharField(blank=True, max_length=100)),
+                ('material', models.CharField(blank=True, max_length=100)),
+                ('otros_detalles', models.TextField(blank=True)),
+                ('precio_venta', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('ultimo_margen_aplicado', models.DecimalField(blank=True, decimal_places=2, max_digits=5, null=True)),
+                ('ultimo_costo_compra', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('stock_actual', models.IntegerField(default=0)),
+                ('stock_minimo', models.PositiveIntegerField(default=10)),
+                ('stock_maximo', models.PositiveIntegerField(default=100)),
+                ('activo', models.BooleanField(default=True)),
+                ('categoria_nombre', models.CharField(blank=True, max_length=100)),
+                ('categoria_descripcion', models.TextField(blank=True)),
+                ('categoria_activo', models.BooleanField(null=True)),
+                ('marca_nombre', models.CharField(blank=True, max_length=100)),
+                ('marca_activo', models.BooleanField(null=True)),
+                ('imagenes', models.JSONField(blank=True, default=list)),
+                ('updated_at', models.DateTimeField()),
+                ('categoria', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='Productos.categoriaproducto')),
+                ('marca', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='Productos.marca')),
+            ],
+            options={
+                'verbose_name': 'Producto del Catálogo',
+                'verbose_name_plural': 'Productos del Catálogo',
+                'indexes': [models.Index(condition=models.Q(('visible', True)), fields=['nombre'], name='catalogo_visible_nombre_idx'), models.Index(condition=models.Q(('visible', True)), fields=['categoria', 'nombre'], name='catalogo_visible_cat_idx')],
+            },
+        ),
+        migrations.RunPython(llenar_catalogo, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,7 @@
 # backend_api/Productos/models.py
 
 from django.db import models
+from django.contrib.postgres.search import SearchVectorField
 from django.core.exceptions import ValidationError
 from decimal import Decimal
 
@@ -8,6 +9,7 @@ class CategoriaProducto(models.Model):
     nombre = models.CharField(max_length=100, verbose_name="Nombre de categoría")
     descripcion = models.TextField(verbose_name="Descripción")
     activo = models.BooleanField(default=True, verbose_name="Activo")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Última actualización")
 
     def __str__(self):
         return self.nombre
@@ -20,6 +22,7 @@ class Marca(models.Model):
     nombre = models.CharField(max_length=100, unique=True, verbose_name="Nombre de la Marca")
     
     activo = models.BooleanField(default=True, verbose_name="Activo")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Última actualización")
     
     class Meta:
         verbose_name = "Marca"
@@ -75,6 +78,9 @@ class Producto(models.Model):
     stock_maximo = models.PositiveIntegerField(default=100, verbose_name="Stock Máximo")
     stock_defectuoso = models.IntegerField(default=0, verbose_name="Stock Defectuoso/No Vendible")
     activo = models.BooleanField(default=True, verbose_name="Activo")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Última actualización")
+    # Vector de búsqueda ponderado (solo se llena en Postgres, ver Productos/busqueda.py).
+    search_vector = SearchVectorField(null=True, blank=True, editable=False)
 
     @property
     def stock(self):
@@ -86,6 +92,15 @@ class Producto(models.Model):
             raise ValidationError("El stock debe ser un número entero no negativo.")
         self.stock_actual = value
 
+    def save(self, *args, **kwargs):
+        # auto_now solo se escribe si el campo va en update_fields. Como el stock y el
+        # precio se guardan con update_fields, lo añadimos para que updated_at
+        # refleje cualquier cambio (las ETags del catálogo dependen de él).
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'updated_at' not in update_fields:
+            kwargs['update_fields'] = list(update_fields) + ['updated_at']
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return self.nombre
 
@@ -112,3 +127,54 @@ class ImagenProducto(models.Model):
     class Meta:
         verbose_name = "Imagen de Producto"
         verbose_name_plural = "Imágenes de Productos"
+
+
+class ProductoCatalogo(models.Model):
+    """
+    Fila desnormalizada de cada producto para la tienda: trae ya resuelta la
+    visibilidad (producto activo con precio, y categoría y marca activas o vacías),
+    los datos de su categoría y marca y sus imágenes. Así el catálogo se lista con
+    una sola tabla. Se mantiene sincronizada desde Productos/signals.py y el servicio
+    de stock, y se reconstruye con el comando reconstruir_catalogo.
+    """
+    producto = models.OneToOneField(Producto, on_delete=models.CASCADE, primary_key=True, related_name='fila_catalogo')
+    visible = models.BooleanField(default=False)
+
+    nombre = models.CharField(max_length=200)
+    descripcion = models.TextField(blank=True)
+    imagen_url = models.URLField(max_length=1024, blank=True, null=True)
+    peso = models.CharField(max_length=50, blank=True)
+    dimensiones = models.CharField(max_length=100, blank=True)
+    material = models.CharField(max_length=100, blank=True)
+    otros_detalles = models.TextField(blank=True)
+    precio_venta = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    ultimo_margen_aplicado = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True)
+    ultimo_costo_compra = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    stock_actual = models.IntegerField(default=0)
+    stock_minimo = models.PositiveIntegerField(default=10)
+    stock_maximo = models.PositiveIntegerField(default=100)
+    activo = models.BooleanField(default=True)
+
+    categoria = models.ForeignKey(CategoriaProducto, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    categoria_nombre = models.CharField(max_length=100, blank=True)
+    categoria_descripcion = models.TextField(blank=True)
+    categoria_activo = models.BooleanField(null=True)
+    marca = models.ForeignKey(Marca, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    marca_nombre = models.CharField(max_length=100, blank=True)
+    marca_activo = models.BooleanField(null=True)
+
+    # [{'id': ..., 'imagen_url': ...}] en el mismo orden que ImagenProducto.id
+    imagenes = models.JSONField(default=list, blank=True)
+    # Lo más reciente entre el producto, su categoría y su marca (para las ETags).
+    updated_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.nombre} ({'visible' if self.visible else 'oculto'})"
+
+    class Meta:
+        verbose_name = "Producto del Catálogo"
+        verbose_name_plural = "Productos del Catálogo"
+        indexes = [
+            models.Index(fields=['nombre'], name='catalogo_visible_nombre_idx', condition=models.Q(visible=True)),
+            models.Index(fields=['categoria', 'nombre'], name='catalogo_visible_cat_idx', condition=models.Q(visible=True)),
+        ]
@@ -0,0 +1,61 @@
+# backend_api/Productos/signals.py
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Producto, CategoriaProducto, Marca, ImagenProducto
+from .cache import marcar_catalogo_modificado
+from .busqueda import CAMPOS_BUSQUEDA, actualizar_vectores
+from .catalogo import sincronizar_catalogo, sincronizar_productos_de
+
+
+# Cualquier cambio en estos modelos altera lo que muestra el catálogo público,
+# así que simplemente se sube la versión y las respuestas viejas dejan de usarse.
+# Además se recalculan sus filas en ProductoCatalogo (la tabla que lee la tienda);
+# al borrar un producto su fila se va por CASCADE.
+
+@receiver(post_save, sender=Producto)
+@receiver(post_delete, sender=Producto)
+def producto_modificado(sender, instance, **kwargs):
+    update_fields = kwargs.get('update_fields')
+    if kwargs.get('signal') is post_save and (update_fields is None or CAMPOS_BUSQUEDA & set(update_fields)):
+        actualizar_vectores(Producto.objects.filter(pk=instance.pk))
+    if kwargs.get('signal') is post_save:
+        sincronizar_catalogo([instance.pk])
+    marcar_catalogo_modificado()
+
+
+@receiver(post_save, sender=CategoriaProducto)
+@receiver(post_delete, sender=CategoriaProducto)
+def categoria_modificada(sender, instance, **kwargs):
+    if kwargs.get('signal') is post_save:
+        # El nombre de la categoría forma parte del vector de sus productos.
+        actualizar_vectores(Producto.objects.filter(categoria_id=instance.pk))
+        sincronizar_productos_de(categoria_id=instance.pk)
+    marcar_catalogo_modificado()
+
+
+@receiver(post_save, sender=Marca)
+@receiver(post_delete, sender=Marca)
+def marca_modificada(sender, instance, **kwargs):
+    if kwargs.get('signal') is post_save:
+        actualizar_vectores(Producto.objects.filter(marca_id=instance.pk))
+        sincronizar_productos_de(marca_id=instance.pk)
+    marcar_catalogo_modificado()
+
+
+@receiver(post_save, sender=ImagenProducto)
+@receiver(post_delete, sender=ImagenProducto)
+def imagen_modificada(sender, instance, **kwargs):
+    # Las imágenes van dentro del producto, así que su cambio cuenta como
+    # modificación del producto (para las ETags basadas en updated_at).
+    origen = kwargs.get('origin')
+    if isinstance(origen, Producto) or getattr(origen, 'model', None) is Producto:
+        # Se borra junto con su producto: la fila del catálogo ya se fue por CASCADE
+        # y no hay que volver a crearla.
+        marcar_catalogo_modificado()
+        return
+    Producto.objects.filter(pk=instance.producto_id).update(updated_at=timezone.now())
+    sincronizar_catalogo([instance.producto_id])
+    marcar_catalogo_modificado()
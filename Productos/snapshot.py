@@ -0,0 +1,184 @@
+# backend_api/Productos/snapshot.py
+"""
+Copia estática del catálogo completo.
+
+La mayoría de los visitantes de la tienda descargan exactamente el mismo JSON de
+/api/public/catalogo/?all=true. Este módulo lo publica como archivo, ya comprimido
+(.json, .json.gz y .json.br si está instalado el paquete brotli), con el hash del
+contenido en el nombre: catalogo/catalogo-<hash>.json. Como el nombre cambia con el
+contenido, el CDN/navegador puede guardarlo para siempre.
+
+- Destino: CATALOGO_SNAPSHOT_DESTINO = 'storage' usa el almacenamiento por defecto
+  (el bucket); 'static' escribe en STATIC_ROOT para que lo sirva el servidor web o
+  el CDN que tome de ahí (WhiteNoise solo ve archivos nuevos con WHITENOISE_AUTOREFRESH).
+- Manifiesto: catalogo/manifest.json dice cuál es la copia vigente; lo expone
+  /api/public/catalogo/snapshot/ para que el frontend sepa qué URL descargar.
+- Antirrebote: el comando publicar_catalogo --loop compara la huella del catálogo
+  (ver huella_actual) y solo publica cuando dejó de cambiar durante
+  CATALOGO_SNAPSHOT_ESPERA segundos, o si ya pasó CATALOGO_SNAPSHOT_ESPERA_MAXIMA
+  desde el primer cambio. Una ráfaga de ediciones en el admin da una sola copia.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from .catalogo import filas_catalogo, serializar_catalogo
+from .models import CategoriaProducto, ProductoCatalogo
+from .serializers import CategoriaProductoSerializer
+
+try:
+    import brotli
+except ImportError:  # Opcional: sin brotli se publican solo .json y .json.gz.
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+CARPETA = 'catalogo'
+NOMBRE_MANIFIESTO = f'{CARPETA}/manifest.json'
+CLAVE_MANIFIESTO = 'catalogo:snapshot:manifiesto'
+# Copias anteriores que se dejan en el almacenamiento (alguien puede tener todavía el manifiesto viejo).
+CONSERVAR = 3
+
+ESPERA = getattr(settings, 'CATALOGO_SNAPSHOT_ESPERA', 30)
+ESPERA_MAXIMA = getattr(settings, 'CATALOGO_SNAPSHOT_ESPERA_MAXIMA', 300)
+
+
+def almacenamiento():
+    if getattr(settings, 'CATALOGO_SNAPSHOT_DESTINO', 'storage') == 'static':
+        return FileSystemStorage(location=settings.STATIC_ROOT, base_url=settings.STATIC_URL)
+    return default_storage
+
+
+def huella_actual():
+    """
+    Huella barata de lo que va en la copia: productos visibles y categorías activas
+    (cantidad y última modificación). Cambia con cualquier edición, alta o baja.
+    """
+    productos = ProductoCatalogo.objects.aggregate(
+        total=Count('pk', filter=Q(visible=True)), ultima=Max('updated_at'),
+    )
+    categorias = CategoriaProducto.objects.filter(activo=True).aggregate(total=Count('id'), ultima=Max('updated_at'))
+    partes = (productos['total'], productos['ultima'], categorias['total'], categorias['ultima'])
+    return hashlib.sha1('|'.join(str(parte) for parte in partes).encode('utf-8')).hexdigest()
+
+
+def construir_contenido():
+    """El mismo cuerpo que devuelve /api/public/catalogo/?all=true, ya renderizado a JSON."""
+    productos = serializar_catalogo(filas_catalogo(ProductoCatalogo.objects.filter(visible=True).order_by('nombre')))
+    categorias = CategoriaProductoSerializer(CategoriaProducto.objects.filter(activo=True).order_by('nombre'), many=True).data
+    return JSONRenderer().render({'products': productos, 'categories': categorias}), len(productos)
+
+
+def _guardar(storage, nombre, contenido):
+    if not storage.exists(nombre):
+        storage.save(nombre, ContentFile(contenido))
+
+
+def _reemplazar(storage, nombre, contenido):
+    # FileSystemStorage no sobrescribe (le cambia el nombre al nuevo), así que se borra antes.
+    if storage.exists(nombre):
+        storage.delete(nombre)
+    storage.save(nombre, ContentFile(contenido))
+
+
+def publicar_snapshot(huella=None):
+    """
+    Genera y sube la copia del catálogo y actualiza el manifiesto. Si el contenido
+    no cambió no se vuelve a subir nada. Devuelve el manifiesto.
+    """
+    huella = huella or huella_actual()
+    storage = almacenamiento()
+    contenido, total = construir_contenido()
+    hash_contenido = hashlib.sha256(contenido).hexdigest()[:16]
+    base = f'{CARPETA}/catalogo-{hash_contenido}.json'
+
+    _guardar(storage, base, contenido)
+    # mtime=0: el mismo JSON comprimido da siempre los mismos bytes.
+    _guardar(storage, f'{base}.gz', gzip.compress(contenido, compresslevel=9, mtime=0))
+    if brotli is not None:
+        _guardar(storage, f'{base}.br', brotli.compress(contenido, quality=11))
+
+    anterior = leer_manifiesto(storage) or {}
+    archivos = [base] + [nombre for nombre in anterior.get('archivos', []) if nombre != base]
+    for viejo in archivos[CONSERVAR:]:
+        for nombre in (viejo, f'{viejo}.gz', f'{viejo}.br'):
+            if storage.exists(nombre):
+                storage.delete(nombre)
+
+    manifiesto = {
+        'url': storage.url(base),
+        'gzip': storage.url(f'{base}.gz'),
+        'brotli': storage.url(f'{base}.br') if brotli is not None else None,
+        'hash': hash_contenido,
+        'productos': total,
+        'tamano': len(contenido),
+        'generado_en': timezone.now().isoformat(),
+        'huella': huella,
+        'archivos': archivos[:CONSERVAR],
+    }
+    _reemplazar(storage, NOMBRE_MANIFIESTO, json.dumps(manifiesto).encode('utf-8'))
+    cache.set(CLAVE_MANIFIESTO, manifiesto, timeout=ESPERA)
+    logger.info(f"Copia del catálogo publicada: {base} ({total} productos, {len(contenido)} bytes).")
+    return manifiesto
+
+
+def leer_manifiesto(storage=None):
+    storage = storage or almacenamiento()
+    if not storage.exists(NOMBRE_MANIFIESTO):
+        return None
+    with storage.open(NOMBRE_MANIFIESTO, 'rb') as archivo:
+        return json.loads(archivo.read())
+
+
+def obtener_manifiesto():
+    """Manifiesto vigente (o None si todavía no se publicó ninguna copia). Se guarda en caché unos segundos."""
+    manifiesto = cache.get(CLAVE_MANIFIESTO)
+    if manifiesto is None:
+        manifiesto = leer_manifiesto()
+        if manifiesto is not None:
+            cache.set(CLAVE_MANIFIESTO, manifiesto, timeout=ESPERA)
+    return manifiesto
+
+
+class Publicador:
+    """
+    Antirrebote para el modo --loop del comando: revisar() se llama cada pocos
+    segundos y publica solo cuando la huella del catálogo se quedó quieta `espera`
+    segundos (o lleva `espera_maxima` pendiente).
+    """
+
+    def __init__(self, espera=ESPERA, espera_maxima=ESPERA_MAXIMA):
+        self.espera = espera
+        self.espera_maxima = espera_maxima
+        self.publicada = (leer_manifiesto() or {}).get('huella')
+        self.vista = None
+        self.cambio_en = None
+        self.pendiente_desde = None
+
+    def revisar(self, ahora=None):
+        """Devuelve el manifiesto si publicó una copia nueva, o None."""
+        ahora = ahora if ahora is not None else time.monotonic()
+        huella = huella_actual()
+        if huella == self.publicada:
+            self.pendiente_desde = None
+            return None
+        if huella != self.vista:
+            self.vista, self.cambio_en = huella, ahora
+            if self.pendiente_desde is None:
+                self.pendiente_desde = ahora
+        if ahora - self.cambio_en < self.espera and ahora - self.pendiente_desde < self.espera_maxima:
+            return None
+        manifiesto = publicar_snapshot(huella)
+        self.publicada, self.pendiente_desde = huella, None
+        return manifiesto
@@ -0,0 +1,185 @@
+# backend_api/Productos/sugerencias.py
+"""
+Índice en memoria para el autocompletado del buscador de la tienda.
+
+Cada proceso mantiene un índice de trigramas y prefijos sobre los nombres de
+productos visibles, marcas y categorías activas. Las peticiones de sugerencias
+solo leen este índice; la base de datos se consulta únicamente cuando cambia la
+versión del catálogo, y aun así solo se releen los productos modificados.
+"""
+
+import threading
+from collections import defaultdict
+
+from .busqueda import normalizar
+from .cache import obtener_version_catalogo
+from .models import CategoriaProducto, Marca, Producto
+
+
+# Fracción mínima de trigramas de la palabra buscada que debe tener una palabra del
+# índice para considerarla parecida ("sement" -> "cemento" comparte 3 de 7).
+UMBRAL_SIMILITUD = 0.4
+
+# Ante igual puntaje se muestran primero categorías y marcas, que acotan más la búsqueda.
+PRIORIDAD_TIPO = {'categoria': 0, 'marca': 1, 'producto': 2}
+
+
+def trigramas(palabra):
+    relleno = f'  {palabra} '
+    return {relleno[i:i + 3] for i in range(len(relleno) - 2)}
+
+
+def palabras(texto):
+    return [p for p in ''.join(c if c.isalnum() else ' ' for c in normalizar(texto)).split() if p]
+
+
+class IndiceSugerencias:
+
+    def __init__(self):
+        self.entradas = {}                        # (tipo, id) -> nombre
+        self.palabras_entrada = {}                # (tipo, id) -> palabras normalizadas
+        self.entradas_por_palabra = defaultdict(set)
+        self.palabras_por_trigrama = defaultdict(set)
+        self.productos = {}                       # id -> (nombre, activo_con_precio, categoria_id, marca_id)
+        self.categorias_activas = set()
+        self.marcas_activas = set()
+        self.ultima_modificacion = None
+
+    # --- Mantenimiento ---
+
+    def _agregar(self, clave, nombre):
+        self._quitar(clave)
+        self.entradas[clave] = nombre
+        lista = palabras(nombre)
+        self.palabras_entrada[clave] = lista
+        for palabra in lista:
+            if not self.entradas_por_palabra[palabra]:
+                for trigrama in trigramas(palabra):
+                    self.palabras_por_trigrama[trigrama].add(palabra)
+            self.entradas_por_palabra[palabra].add(clave)
+
+    def _quitar(self, clave):
+        if clave not in self.entradas:
+            return
+        del self.entradas[clave]
+        for palabra in self.palabras_entrada.pop(clave):
+            self.entradas_por_palabra[palabra].discard(clave)
+            if not self.entradas_por_palabra[palabra]:
+                del self.entradas_por_palabra[palabra]
+                for trigrama in trigramas(palabra):
+                    self.palabras_por_trigrama[trigrama].discard(palabra)
+
+    def sincronizar(self):
+        """
+        Trae de la base de datos solo lo que cambió desde la última vez:
+        marcas y categorías completas (son pocas), los productos con updated_at
+        posterior a la última sincronización y la lista de ids para detectar borrados.
+        """
+        categorias = list(CategoriaProducto.objects.values('id', 'nombre', 'activo'))
+        marcas = list(Marca.objects.values('id', 'nombre', 'activo'))
+        self.categorias_activas = {c['id'] for c in categorias if c['activo']}
+        self.marcas_activas = {m['id'] for m in marcas if m['activo']}
+        for tipo, filas, activas in (('categoria', categorias, self.categorias_activas), ('marca', marcas, self.marcas_activas)):
+            vigentes = set()
+            for fila in filas:
+                clave = (tipo, fila['id'])
+                if fila['id'] in activas:
+                    vigentes.add(clave)
+                    if self.entradas.get(clave) != fila['nombre']:
+                        self._agregar(clave, fila['nombre'])
+            for clave in [c for c in self.entradas if c[0] == tipo and c not in vigentes]:
+                self._quitar(clave)
+
+        modificados = Producto.objects.all()
+        if self.ultima_modificacion is not None:
+            modificados = modificados.filter(updated_at__gte=self.ultima_modificacion)
+        filas = list(modificados.values('id', 'nombre', 'activo', 'precio_venta', 'categoria_id', 'marca_id', 'updated_at'))
+        for fila in filas:
+            self.productos[fila['id']] = (
+                fila['nombre'],
+                fila['activo'] and fila['precio_venta'] > 0,
+                fila['categoria_id'],
+                fila['marca_id'],
+            )
+        if filas:
+            self.ultima_modificacion = max(f['updated_at'] for f in filas)
+
+        existentes = set(Producto.objects.values_list('id', flat=True))
+        for producto_id in [pid for pid in self.productos if pid not in existentes]:
+            del self.productos[producto_id]
+
+        # La visibilidad depende también de la marca y la categoría, así que se
+        # reevalúa para todos (en memoria, sin consultas).
+        for producto_id, (nombre, vendible, categoria_id, marca_id) in self.productos.items():
+            clave = ('producto', producto_id)
+            visible = (
+                vendible
+                and (categoria_id is None or categoria_id in self.categorias_activas)
+                and (marca_id is None or marca_id in self.marcas_activas)
+            )
+            if not visible:
+                self._quitar(clave)
+            elif self.entradas.get(clave) != nombre:
+                self._agregar(clave, nombre)
+        for clave in [c for c in self.entradas if c[0] == 'producto' and c[1] not in self.productos]:
+            self._quitar(clave)
+
+    # --- Consulta ---
+
+    def _parecidas(self, consulta):
+        """Devuelve {palabra_del_indice: puntaje} para una palabra buscada."""
+        resultado = {}
+        if len(consulta) >= 3:
+            tris = trigramas(consulta)
+            conteo = defaultdict(int)
+            for trigrama in tris:
+                for palabra in self.palabras_por_trigrama.get(trigrama, ()):
+                    conteo[palabra] += 1
+            for palabra, comunes in conteo.items():
+                similitud = comunes / len(tris)
+                if similitud >= UMBRAL_SIMILITUD:
+                    resultado[palabra] = similitud
+        # Los prefijos exactos siempre cuentan como coincidencia completa.
+        for palabra in self.entradas_por_palabra:
+            if palabra.startswith(consulta):
+                resultado[palabra] = 1.0 + (1.0 if palabra == consulta else 0.0)
+        return resultado
+
+    def sugerir(self, texto, limite):
+        consultas = palabras(texto)
+        if not consultas:
+            return []
+        puntajes = None
+        for consulta in consultas:
+            por_entrada = {}
+            for palabra, puntaje in self._parecidas(consulta).items():
+                for clave in self.entradas_por_palabra.get(palabra, ()):
+                    por_entrada[clave] = max(por_entrada.get(clave, 0), puntaje)
+            if puntajes is None:
+                puntajes = por_entrada
+            else:
+                puntajes = {c: puntajes[c] + p for c, p in por_entrada.items() if c in puntajes}
+            if not puntajes:
+                return []
+        ordenadas = sorted(
+            puntajes,
+            key=lambda c: (-puntajes[c], PRIORIDAD_TIPO[c[0]], len(self.entradas[c]), self.entradas[c]),
+        )
+        return [{'tipo': tipo, 'id': pk, 'nombre': self.entradas[(tipo, pk)]} for tipo, pk in ordenadas[:limite]]
+
+
+_indice = IndiceSugerencias()
+_version_indice = None
+_lock = threading.Lock()
+
+
+def obtener_sugerencias(texto, limite=8):
+    global _version_indice
+    version = obtener_version_catalogo()
+    # El índice se modifica en el sitio, así que lecturas y sincronización comparten
+    # el candado; una consulta tarda milisegundos.
+    with _lock:
+        if _version_indice != version:
+            _indice.sincronizar()
+            _version_indice = version
+        return _indice.sugerir(texto, limite)
@@ -0,0 +1,238 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework.test import APIClient
+
+from .busqueda import PESOS, IndiceBusqueda, buscar_productos, obtener_indice
+from .models import CategoriaProducto, ImagenProducto, Marca, Producto
+from .sugerencias import IndiceSugerencias
+
+
+def crear_producto(nombre, categoria, marca, **extra):
+    datos = {'precio_venta': Decimal('10.00'), 'descripcion': ''}
+    datos.update(extra)
+    return Producto.objects.create(nombre=nombre, categoria=categoria, marca=marca, **datos)
+
+
+class CatalogoCondicionalTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.categoria = CategoriaProducto.objects.create(nombre='Cementos', descripcion='')
+        self.marca = Marca.objects.create(nombre='Argos')
+        self.cemento = crear_producto('Cemento gris', self.categoria, self.marca)
+        self.arena = crear_producto('Arena de peña', self.categoria, self.marca)
+
+    def test_listado_sin_last_modified(self):
+        response = self.client.get('/api/public/catalogo/?all=true')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('ETag', response)
+        self.assertNotIn('Last-Modified', response)
+
+    def test_ocultar_producto_no_da_304_falso(self):
+        response = self.client.get('/api/public/catalogo/?all=true')
+        etag = response['ETag']
+        self.assertEqual(len(response.json()['products']), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.arena.activo = False
+            self.arena.save()
+
+        # Lo que queda no tiene un updated_at más nuevo; aun así no es 304.
+        response = self.client.get(
+            '/api/public/catalogo/?all=true',
+            HTTP_IF_MODIFIED_SINCE=http_date(timezone.now().timestamp() + 60),
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual([p['nombre'] for p in response.json()['products']], ['Cemento gris'])
+
+    def test_misma_version_responde_304(self):
+        etag = self.client.get('/api/public/catalogo/?all=true')['ETag']
+        response = self.client.get('/api/public/catalogo/?all=true', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+
+def fila(id, nombre, marca='', categoria='', descripcion=''):
+    return {'id': id, 'nombre': nombre, 'marca__nombre': marca, 'categoria__nombre': categoria, 'descripcion': descripcion}
+
+
+class IndiceBusquedaTests(TestCase):
+    """Respaldo en memoria que se usa fuera de Postgres."""
+
+    def setUp(self):
+        self.indice = IndiceBusqueda([
+            fila(1, 'Tubería PVC sanitaria', marca='Pavco', categoria='Plomería'),
+            fila(2, 'Cemento gris', marca='Argos', categoria='Cementos', descripcion='Bulto de 50 kg'),
+            fila(3, 'Pegante cerámico', marca='Argos', categoria='Pegantes', descripcion='Para pegar cemento y cerámica'),
+            fila(4, 'Tornillos drywall', marca='Cementos Tornillos', categoria='Ferretería'),
+        ])
+
+    def test_ignora_tildes(self):
+        self.assertEqual(set(self.indice.buscar('tuberia')), {1})
+        self.assertEqual(set(self.indice.buscar('PLOMERÍA')), {1})
+
+    def test_stemming(self):
+        # 'tornillo' y 'tornillos' comparten raíz.
+        self.assertEqual(set(self.indice.buscar('tornillo')), {4})
+        self.assertEqual(set(self.indice.buscar('sanitarias')), {1})
+
+    def test_prefijo(self):
+        self.assertEqual(set(self.indice.buscar('cem')), {2, 3, 4})
+        self.assertEqual(set(self.indice.buscar('dryw')), {4})
+
+    def test_todas_las_palabras(self):
+        self.assertEqual(set(self.indice.buscar('cemento argos')), {2, 3})
+        self.assertEqual(set(self.indice.buscar('cemento gris')), {2})
+        self.assertEqual(self.indice.buscar('cemento pavco'), {})
+
+    def test_palabras_vacias_no_filtran(self):
+        self.assertEqual(set(self.indice.buscar('tubería de pvc')), {1})
+
+    def test_pesos_por_campo(self):
+        puntajes = self.indice.buscar('cemento')
+        # Nombre (A) > marca (B) > descripción (D).
+        self.assertEqual(puntajes[2], PESOS['A'])
+        self.assertEqual(puntajes[4], PESOS['B'])
+        self.assertEqual(puntajes[3], PESOS['D'])
+
+
+class BuscarProductosTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.categoria = CategoriaProducto.objects.create(nombre='Cementos', descripcion='')
+        self.marca = Marca.objects.create(nombre='Argos')
+        otra_marca = Marca.objects.create(nombre='Cemex')
+        crear_producto('Pegante', self.categoria, self.marca, descripcion='Con cemento blanco')
+        crear_producto('Cemento gris', self.categoria, self.marca)
+        crear_producto('Mortero', self.categoria, otra_marca)
+
+    def test_ordena_por_relevancia_y_nombre(self):
+        resultado = buscar_productos(Producto.objects.all(), 'cemento')
+        # El nombre pesa más que la descripción; la categoría 'Cementos' empata a
+        # Mortero y Pegante, y el empate se resuelve por nombre.
+        self.assertEqual([p.nombre for p in resultado], ['Cemento gris', 'Mortero', 'Pegante'])
+
+    def test_sin_coincidencias_devuelve_vacio(self):
+        self.assertFalse(buscar_productos(Producto.objects.all(), 'ladrillo').exists())
+
+    def test_solo_palabras_vacias_no_filtra(self):
+        self.assertEqual(buscar_productos(Producto.objects.all(), 'de la').count(), 3)
+
+    # Con caché local la versión también rota por ventanas de CACHE_TIMEOUT_LOCAL;
+    # se agranda para que solo la cambie el alta del producto.
+    @override_settings(CACHE_TIMEOUT_LOCAL=3600)
+    def test_reconstruye_al_cambiar_version(self):
+        indice = obtener_indice()
+        self.assertIs(obtener_indice(), indice)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            crear_producto('Ladrillo macizo', self.categoria, self.marca)
+
+        self.assertIsNot(obtener_indice(), indice)
+        self.assertEqual(
+            [p.nombre for p in buscar_productos(Producto.objects.all(), 'ladrillo')],
+            ['Ladrillo macizo'],
+        )
+
+
+class IndiceSugerenciasTests(TestCase):
+
+    def setUp(self):
+        self.categoria = CategoriaProducto.objects.create(nombre='Cementos', descripcion='')
+        self.marca = Marca.objects.create(nombre='Argos')
+        self.cemento = crear_producto('Cemento gris', self.categoria, self.marca)
+        self.arena = crear_producto('Arena de peña', self.categoria, self.marca)
+        self.indice = IndiceSugerencias()
+        self.indice.sincronizar()
+
+    def productos_sugeridos(self, texto):
+        return [s['nombre'] for s in self.indice.sugerir(texto, 10) if s['tipo'] == 'producto']
+
+    def test_tolera_errores_de_escritura(self):
+        self.assertIn('Cemento gris', self.productos_sugeridos('sement'))
+        self.assertEqual(self.indice.sugerir('sement', 10)[0], {'tipo': 'categoria', 'id': self.categoria.pk, 'nombre': 'Cementos'})
+
+    def test_solo_relee_productos_modificados(self):
+        # Un cambio con updated_at anterior a la marca de agua no se relee.
+        Producto.objects.filter(pk=self.arena.pk).update(
+            nombre='Arena lavada', updated_at=self.arena.updated_at - timedelta(minutes=1),
+        )
+        self.indice.sincronizar()
+        self.assertEqual(self.productos_sugeridos('arena'), ['Arena de peña'])
+
+        self.arena.refresh_from_db()
+        self.arena.save()
+        self.indice.sincronizar()
+        self.assertEqual(self.productos_sugeridos('arena'), ['Arena lavada'])
+
+    def test_quita_productos_borrados(self):
+        self.arena.delete()
+        self.indice.sincronizar()
+        self.assertEqual(self.productos_sugeridos('arena'), [])
+        self.assertNotIn(self.arena.pk, self.indice.productos)
+
+    def test_oculta_productos_de_marca_o_categoria_inactiva(self):
+        self.marca.activo = False
+        self.marca.save()
+        self.indice.sincronizar()
+        self.assertEqual(self.productos_sugeridos('cemento'), [])
+        self.assertFalse([s for s in self.indice.sugerir('argos', 10) if s['tipo'] == 'marca'])
+
+        self.marca.activo = True
+        self.marca.save()
+        self.categoria.activo = False
+        self.categoria.save()
+        self.indice.sincronizar()
+        self.assertEqual(self.productos_sugeridos('cemento'), [])
+
+        self.categoria.activo = True
+        self.categoria.save()
+        self.indice.sincronizar()
+        self.assertEqual(self.productos_sugeridos('cemento'), ['Cemento gris'])
+
+    def test_oculta_productos_sin_precio(self):
+        self.arena.precio_venta = 0
+        self.arena.save()
+        self.indice.sincronizar()
+        self.assertEqual(self.productos_sugeridos('arena'), [])
+
+
+# Más filas que presupuesto: un N+1 lo excede seguro.
+FILAS = 11
+
+
+@override_settings(PRESUPUESTO_CONSULTAS_ESTRICTO=True)
+class PresupuestoConsultasTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        for i in range(FILAS):
+            categoria = CategoriaProducto.objects.get_or_create(nombre=f'Categoría {i % 3}', defaults={'descripcion': ''})[0]
+            marca = Marca.objects.get_or_create(nombre=f'Marca {i % 4}')[0]
+            producto = crear_producto(f'Producto {i:02d}', categoria, marca, imagen_url='https://example.com/a.png')
+            for n in range(2):
+                ImagenProducto.objects.create(producto=producto, imagen_url=f'https://example.com/{i}-{n}.png')
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create_superuser('admin@example.com', 'clave-segura'))
+
+    def test_catalogo_publico(self):
+        response = self.client.get('/api/public/catalogo/?all=true')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['products']), FILAS)
+
+    def test_catalogo_cliente(self):
+        response = self.client.get('/api/cliente/catalogo/?all=true')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['products']), FILAS)
+
+    def test_listado_administrativo(self):
+        response = self.client.get('/api/productos/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), FILAS)
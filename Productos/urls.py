@@ -4,6 +4,8 @@ from django.urls import path
 from .views import (
     CatalogoPublicoView, 
     CatalogoClienteView,
+    SugerenciasCatalogoView,
+    CatalogoSnapshotView,
     ProductosStockSummaryView,
     ProductoListCreateView,
     ProductoRetrieveUpdateDestroyView,
@@ -16,6 +18,8 @@ from .views import (
 urlpatterns = [
     path('public/catalogo/', CatalogoPublicoView.as_view(), name='catalogo-publico'),
     path('cliente/catalogo/', CatalogoClienteView.as_view(), name='catalogo-cliente'),
+    path('public/catalogo/snapshot/', CatalogoSnapshotView.as_view(), name='catalogo-snapshot'),
+    path('catalogo/sugerencias/', SugerenciasCatalogoView.as_view(), name='catalogo-sugerencias'),
     path('resumen-stock/', ProductosStockSummaryView.as_view(), name='producto-stock-summary'),
     
     path('productos/', ProductoListCreateView.as_view(), name='producto-list-create'),
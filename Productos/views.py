@@ -11,16 +11,29 @@ from Ventas.models import DetalleVenta
 from Compras.models import ItemCompra
 from Pedidos.models import DetallePedido
 from django.db.models import ProtectedError, Q, F
-from .models import CategoriaProducto, Producto
+from django.utils.dateparse import parse_datetime
+from django.utils.http import quote_etag
+from .models import CategoriaProducto, Producto, ProductoCatalogo
 from rest_framework.permissions import IsAuthenticated
 from .serializers import CategoriaProductoSerializer, ProductoSerializer, ProductoDashboardStockSerializer, MarcaSerializer
 from rest_framework.permissions import AllowAny
 from Roles_Permisos.permissions import HasPrivilege
+from authentication.jwt_auth import ClaimsJWTAuthentication
 from rest_framework.pagination import PageNumberPagination
 from Roles_Permisos.permissions import HasPrivilege, IsAdminOrReadOnly 
 from rest_framework.permissions import IsAuthenticated
 from Stock.serializers import BajaDeStockCreateSerializer
 from rest_framework.decorators import action
+from .cache import clave_respuesta_catalogo, obtener_respuesta_cacheada, guardar_respuesta_cacheada
+from .busqueda import buscar_productos
+from .sugerencias import obtener_sugerencias
+from .snapshot import obtener_manifiesto
+from .catalogo import filas_catalogo, serializar_catalogo
+from .condicional import (
+    respuesta_no_modificada, aplicar_cabeceras_condicionales,
+    huella_catalogo, huella_producto, huella_categorias,
+)
+from backend_api.replicas import LecturaReplicaMixin
 
 
 class CatalogoPagination(PageNumberPagination):
@@ -29,9 +42,10 @@ class CatalogoPagination(PageNumberPagination):
     max_page_size = 50
 
 
-class CatalogoPublicoView(generics.ListAPIView):
+class CatalogoPublicoView(LecturaReplicaMixin, generics.ListAPIView):
     permission_classes = [permissions.AllowAny]
     serializer_class = ProductoSerializer
+    presupuesto_consultas = 10
 
     
     def get_pagination_class(self):
@@ -55,26 +69,19 @@ class CatalogoPublicoView(generics.ListAPIView):
         query = self.request.query_params.get('q', None)
         category_id = self.request.query_params.get('category', None)
 
-        queryset = Producto.objects.filter(
-            Q(activo=True) & 
-            Q(precio_venta__gt=0) & 
-            (Q(categoria__activo=True) | Q(categoria__isnull=True)) &
-            (Q(marca__activo=True) | Q(marca__isnull=True))
-        ).select_related('categoria', 'marca').order_by('nombre')
+        # La visibilidad (producto activo con precio, categoría y marca activas) ya
+        # viene resuelta en la tabla del catálogo (ver Productos/catalogo.py).
+        queryset = ProductoCatalogo.objects.filter(visible=True).order_by('nombre')
 
-        if query:
-            queryset = queryset.filter(
-                Q(nombre__icontains=query) |
-                Q(descripcion__icontains=query) |
-                Q(marca__nombre__icontains=query) |
-                Q(categoria__nombre__icontains=query)
-            )
-        
         if category_id:
             try:
                 queryset = queryset.filter(categoria_id=int(category_id))
             except (ValueError, TypeError):
                 pass
+
+        if query:
+            # Búsqueda por texto completo, ordenada por relevancia (ver Productos/busqueda.py).
+            queryset = buscar_productos(queryset, query, prefijo='producto__')
         
         return queryset
 
@@ -83,8 +90,30 @@ class CatalogoPublicoView(generics.ListAPIView):
         Sobrescribimos el método `list` para añadir las categorías a la respuesta,
         manejando correctamente tanto las respuestas paginadas como las no paginadas.
         """
-        # 1. Obtenemos la respuesta base de la clase padre
-        response = super().list(request, *args, **kwargs)
+        # 0. Si ya tenemos esta misma consulta para la versión actual del catálogo, usamos
+        #    su huella guardada; si no, la calculamos con dos agregados baratos.
+        clave = clave_respuesta_catalogo('publico', request)
+        cacheado = obtener_respuesta_cacheada(clave)
+        if cacheado is not None:
+            etag, ultima_modificacion = cacheado['etag'], cacheado['ultima_modificacion']
+        else:
+            etag, ultima_modificacion = huella_catalogo(self.get_queryset(), request)
+
+        # Si el cliente ya tiene esta versión respondemos 304 sin serializar nada.
+        no_modificado = respuesta_no_modificada(request, etag, ultima_modificacion)
+        if no_modificado is not None:
+            return no_modificado
+        if cacheado is not None:
+            return aplicar_cabeceras_condicionales(Response(cacheado['datos']), etag, ultima_modificacion)
+
+        # 1. Listamos desde la tabla del catálogo (ver Productos/catalogo.py): una sola
+        #    consulta sin JOINs, sin instanciar modelos ni pasar por ProductoSerializer.
+        filas = filas_catalogo(self.filter_queryset(self.get_queryset()))
+        pagina = self.paginate_queryset(filas)
+        if pagina is not None:
+            response = self.get_paginated_response(serializar_catalogo(pagina))
+        else:
+            response = Response(serializar_catalogo(filas))
         
         # 2. Obtenemos los datos de las categorías
         categorias_activas = CategoriaProducto.objects.filter(activo=True).order_by('nombre')
@@ -96,7 +125,7 @@ class CatalogoPublicoView(generics.ListAPIView):
             # Lo modificamos directamente.
             response.data['products'] = response.data.pop('results')
             response.data['categories'] = categorias_data
-            return response
+            final_data = response.data
         else:
             # CASO NO PAGINADO (WEB con ?all=true): `response.data` es una lista.
             # Construimos un nuevo diccionario desde cero.
@@ -104,31 +133,96 @@ class CatalogoPublicoView(generics.ListAPIView):
                 'products': response.data,
                 'categories': categorias_data
             }
-            return Response(final_data)
+            response = Response(final_data)
+
+        guardar_respuesta_cacheada(clave, {
+            'datos': final_data,
+            'etag': etag,
+            'ultima_modificacion': ultima_modificacion,
+        })
+        return aplicar_cabeceras_condicionales(response, etag, ultima_modificacion)
 
-class CatalogoClienteView(generics.ListAPIView):
+class CatalogoClienteView(LecturaReplicaMixin, generics.ListAPIView):
     """
     Vista del catálogo para clientes logueados, no requiere privilegios de admin.
     """
     permission_classes = [permissions.IsAuthenticated]
+    presupuesto_consultas = 10
+
     def get(self, request, *args, **kwargs):
-      
-        productos_activos = Producto.objects.filter(
-            Q(activo=True) & 
-            Q(precio_venta__gt=0) & 
-            (Q(categoria__activo=True) | Q(categoria__isnull=True)) &
-            (Q(marca__activo=True) | Q(marca__isnull=True))
-        ).select_related('categoria', 'marca').order_by('nombre')
+        productos_activos = ProductoCatalogo.objects.filter(visible=True).order_by('nombre')
 
+        clave = clave_respuesta_catalogo('cliente', request)
+        cacheado = obtener_respuesta_cacheada(clave)
+        if cacheado is not None:
+            etag, ultima_modificacion = cacheado['etag'], cacheado['ultima_modificacion']
+        else:
+            etag, ultima_modificacion = huella_catalogo(productos_activos, request)
 
+        no_modificado = respuesta_no_modificada(request, etag, ultima_modificacion)
+        if no_modificado is not None:
+            return no_modificado
+        if cacheado is not None:
+            response = Response(cacheado['datos'], status=status.HTTP_200_OK)
+            return aplicar_cabeceras_condicionales(response, etag, ultima_modificacion, privada=True)
 
         categorias_activas = CategoriaProducto.objects.filter(activo=True).order_by('nombre')
-        productos_serializer = ProductoSerializer(productos_activos, many=True)
         categorias_serializer = CategoriaProductoSerializer(categorias_activas, many=True)
-        return Response({
-            'products': productos_serializer.data,
+        datos = {
+            'products': serializar_catalogo(filas_catalogo(productos_activos)),
             'categories': categorias_serializer.data
-        }, status=status.HTTP_200_OK)
+        }
+        guardar_respuesta_cacheada(clave, {
+            'datos': datos,
+            'etag': etag,
+            'ultima_modificacion': ultima_modificacion,
+        })
+        response = Response(datos, status=status.HTTP_200_OK)
+        return aplicar_cabeceras_condicionales(response, etag, ultima_modificacion, privada=True)
+
+class CatalogoSnapshotView(APIView):
+    """
+    Dice cuál es la copia estática vigente del catálogo completo (ver
+    Productos/snapshot.py). El frontend descarga esa URL, que sirve el CDN o el
+    almacenamiento, en lugar de pedir /api/public/catalogo/?all=true.
+    """
+    permission_classes = [permissions.AllowAny]
+    CAMPOS_PUBLICOS = ('url', 'gzip', 'brotli', 'hash', 'productos', 'tamano', 'generado_en')
+
+    def get(self, request, *args, **kwargs):
+        manifiesto = obtener_manifiesto()
+        if manifiesto is None:
+            return Response({'detail': 'Todavía no hay una copia publicada del catálogo.'}, status=status.HTTP_404_NOT_FOUND)
+
+        etag = quote_etag(manifiesto['hash'])
+        ultima_modificacion = parse_datetime(manifiesto['generado_en'])
+        no_modificado = respuesta_no_modificada(request, etag, ultima_modificacion)
+        if no_modificado is not None:
+            return no_modificado
+        response = Response({campo: manifiesto.get(campo) for campo in self.CAMPOS_PUBLICOS})
+        return aplicar_cabeceras_condicionales(response, etag, ultima_modificacion)
+
+class SugerenciasCatalogoView(APIView):
+    """
+    Autocompletado del buscador de la tienda. Responde desde un índice en memoria
+    (ver Productos/sugerencias.py), así que las ráfagas de peticiones al escribir
+    no llegan a la base de datos. Tolera errores de tipeo ("sement" -> "cemento").
+    """
+    permission_classes = [permissions.AllowAny]
+    LIMITE_POR_DEFECTO = 8
+    LIMITE_MAXIMO = 20
+
+    def get(self, request, *args, **kwargs):
+        texto = request.query_params.get('q', '').strip()
+        try:
+            limite = int(request.query_params.get('limite', self.LIMITE_POR_DEFECTO))
+        except (ValueError, TypeError):
+            limite = self.LIMITE_POR_DEFECTO
+        limite = max(1, min(limite, self.LIMITE_MAXIMO))
+
+        if not texto:
+            return Response({'sugerencias': []})
+        return Response({'sugerencias': obtener_sugerencias(texto, limite)})
 
 # --- VISTAS ADMINISTRATIVAS DE CATEGORÍAS ---
 
@@ -148,6 +242,14 @@ class CategoriaProductoListCreateView(generics.ListCreateAPIView):
             queryset = queryset.filter(activo=True)
         return queryset.order_by('nombre')
 
+    def list(self, request, *args, **kwargs):
+        etag, ultima_modificacion = huella_categorias(self.get_queryset(), request)
+        no_modificado = respuesta_no_modificada(request, etag, ultima_modificacion)
+        if no_modificado is not None:
+            return no_modificado
+        response = super().list(request, *args, **kwargs)
+        return aplicar_cabeceras_condicionales(response, etag, ultima_modificacion, privada=True)
+
     def get_required_privilege(self, method):
         if method == 'GET':
             return 'categorias_ver'
@@ -168,6 +270,14 @@ class CategoriaProductoRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyA
         if method == 'DELETE':
             return 'categorias_eliminar'
         return None
+
+    def retrieve(self, request, *args, **kwargs):
+        etag, ultima_modificacion = huella_categorias(self.get_queryset().filter(pk=kwargs.get('pk')), request)
+        no_modificado = respuesta_no_modificada(request, etag, ultima_modificacion)
+        if no_modificado is not None:
+            return no_modificado
+        response = super().retrieve(request, *args, **kwargs)
+        return aplicar_cabeceras_condicionales(response, etag, ultima_modificacion, privada=True)
     
 
     def perform_destroy(self, instance):
@@ -178,9 +288,10 @@ class CategoriaProductoRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyA
 # --- VISTAS ADMINISTRATIVAS DE PRODUCTOS ---
 
 class ProductoListCreateView(generics.ListCreateAPIView):
-    queryset = Producto.objects.select_related('categoria').all().order_by('nombre')
+    queryset = Producto.objects.select_related('categoria', 'marca').prefetch_related('imagenes').all().order_by('nombre')
     serializer_class = ProductoSerializer
     permission_classes = [permissions.IsAuthenticated, HasPrivilege]
+    presupuesto_consultas = {'GET': 8}
     filter_backends = [filters.SearchFilter]
     search_fields = ['nombre', 'marca__nombre', 'categoria__nombre']
 
@@ -192,7 +303,7 @@ class ProductoListCreateView(generics.ListCreateAPIView):
         return None
 
     def get_queryset(self):
-        queryset = Producto.objects.select_related('categoria').all()
+        queryset = Producto.objects.select_related('categoria', 'marca').prefetch_related('imagenes').all()
         activo_param = self.request.query_params.get('activo')
         if activo_param and activo_param.lower() == 'true':
             queryset = queryset.filter(activo=True)
@@ -202,7 +313,7 @@ class ProductoRetrieveUpdateDestroyView(mixins.RetrieveModelMixin,
                                       mixins.UpdateModelMixin,
                                       mixins.DestroyModelMixin,
                                       viewsets.GenericViewSet):
-    queryset = Producto.objects.select_related('categoria', 'marca').all()
+    queryset = Producto.objects.select_related('categoria', 'marca').prefetch_related('imagenes').all()
     serializer_class = ProductoSerializer
     
    
@@ -217,6 +328,18 @@ class ProductoRetrieveUpdateDestroyView(mixins.RetrieveModelMixin,
         
         return [permissions.IsAuthenticated(), IsAdminOrReadOnly(), HasPrivilege()]
 
+    def retrieve(self, request, *args, **kwargs):
+        huella = huella_producto(kwargs.get('pk'))
+        if huella is None:
+            # No existe: dejamos que el flujo normal responda el 404.
+            return super().retrieve(request, *args, **kwargs)
+        etag, ultima_modificacion = huella
+        no_modificado = respuesta_no_modificada(request, etag, ultima_modificacion)
+        if no_modificado is not None:
+            return no_modificado
+        response = super().retrieve(request, *args, **kwargs)
+        return aplicar_cabeceras_condicionales(response, etag, ultima_modificacion)
+
     def get_required_privilege(self, method):
         if method in ['PUT', 'PATCH']:
             return 'productos_editar'
@@ -253,6 +376,7 @@ class ProductoRetrieveUpdateDestroyView(mixins.RetrieveModelMixin,
 # --- VISTA PARA EL DASHBOARD ---
 
 class ProductosStockSummaryView(APIView):
+    authentication_classes = [ClaimsJWTAuthentication]
     permission_classes = [permissions.IsAuthenticated, HasPrivilege]
     required_privilege = "dashboard_ver" # Quien ve el dashboard puede ver este resumen
 
@@ -3,4 +3,8 @@ from django.apps import AppConfig
 
 class Roles_PermisosConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'Roles_Permisos'
\ No newline at end of file
+    name = 'Roles_Permisos'
+
+    def ready(self):
+        # Registra los receptores que invalidan la caché de privilegios.
+        from . import signals  # noqa: F401
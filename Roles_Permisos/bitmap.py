@@ -0,0 +1,136 @@
+# Roles_Permisos/bitmap.py
+"""
+Representación compacta de un conjunto de privilegios como mapa de bits.
+
+Cada Permiso tiene un número estable (`bit`) que se le asigna al crearlo
+(reservar_bit) y que nunca se reutiliza. El token de acceso lleva los privilegios del usuario como
+un entero con esos bits encendidos, codificado en base64url (bytes little-endian:
+el bit N está en el byte N // 8, posición N % 8).
+"""
+
+import base64
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Max
+
+from backend_api.cache_compartida import cache_compartida
+
+
+CLAVE_MAPA = 'roles:mapa_bits'
+TTL_LOCAL = getattr(settings, 'PRIVILEGIOS_CACHE_TTL_LOCAL', 5)
+TTL_COMPARTIDO = getattr(settings, 'PRIVILEGIOS_CACHE_TTL', 60 * 60)
+
+_local = None
+_lock = threading.Lock()
+
+
+def codificar(mascara):
+    crudo = mascara.to_bytes((mascara.bit_length() + 7) // 8, 'little')
+    return base64.urlsafe_b64encode(crudo).decode('ascii').rstrip('=')
+
+
+def decodificar(texto):
+    relleno = '=' * (-len(texto) % 4)
+    return int.from_bytes(base64.urlsafe_b64decode(texto + relleno), 'little')
+
+
+class MapaBits:
+    """Tablas precalculadas codename <-> bit y una máscara por prefijo de módulo."""
+
+    def __init__(self, pares):
+        self.bit_por_codename = dict(pares)
+        self.codename_por_bit = {bit: codename for codename, bit in self.bit_por_codename.items()}
+        self.mascara_por_prefijo = {}
+        for codename, bit in self.bit_por_codename.items():
+            partes = codename.split('_')
+            for i in range(1, len(partes)):
+                prefijo = '_'.join(partes[:i]) + '_'
+                self.mascara_por_prefijo[prefijo] = self.mascara_por_prefijo.get(prefijo, 0) | (1 << bit)
+
+    def mascara(self, codenames):
+        mascara = 0
+        for codename in codenames:
+            bit = self.bit_por_codename.get(codename)
+            if bit is not None:
+                mascara |= 1 << bit
+        return mascara
+
+    def expandir(self, mascara):
+        return [codename for bit, codename in sorted(self.codename_por_bit.items()) if mascara >> bit & 1]
+
+
+class MascaraPrivilegios:
+    """Privilegios decodificados de un token; se consulta igual que PrivilegiosRol."""
+    __slots__ = ('mascara', 'mapa')
+
+    def __init__(self, mascara, mapa):
+        self.mascara = mascara
+        self.mapa = mapa
+
+    def tiene(self, privilegio):
+        # 'ventas_ver' se cumple con cualquier permiso del módulo.
+        if privilegio.endswith('_ver'):
+            prefijo = privilegio.rsplit('_', 1)[0] + '_'
+            return bool(self.mascara & self.mapa.mascara_por_prefijo.get(prefijo, 0))
+        bit = self.mapa.bit_por_codename.get(privilegio)
+        return bit is not None and bool(self.mascara >> bit & 1)
+
+
+def reservar_bit():
+    """
+    Siguiente número libre del mapa de bits. Sale de SecuenciaBits (bloqueada
+    hasta el final de la transacción), no del máximo de los permisos que existen:
+    el número de un permiso borrado no se vuelve a dar.
+    """
+    from .models import Permiso, SecuenciaBits
+    with transaction.atomic():
+        secuencia, _ = SecuenciaBits.objects.select_for_update().get_or_create(pk=1)
+        # Por si se asignó algún bit a mano por encima de la secuencia.
+        maximo = Permiso.objects.aggregate(maximo=Max('bit'))['maximo']
+        bit = max(secuencia.siguiente, 0 if maximo is None else maximo + 1)
+        secuencia.siguiente = bit + 1
+        secuencia.save(update_fields=['siguiente'])
+    return bit
+
+
+def obtener_mapa():
+    global _local
+    ahora = time.monotonic()
+    if _local is not None and _local[0] > ahora:
+        return _local[1]
+
+    # Con una caché local invalidar_mapa() solo borraría la copia de este proceso:
+    # como en privilegios.py, sin caché compartida se va a la base cada TTL_LOCAL.
+    compartida = cache_compartida()
+    pares = cache.get(CLAVE_MAPA) if compartida else None
+    if pares is None:
+        from .models import Permiso
+        pares = list(Permiso.objects.exclude(bit=None).values_list('codename', 'bit'))
+        if compartida:
+            cache.set(CLAVE_MAPA, pares, timeout=TTL_COMPARTIDO)
+
+    mapa = MapaBits(pares)
+    with _lock:
+        _local = (ahora + TTL_LOCAL, mapa)
+    return mapa
+
+
+def invalidar_mapa():
+    def _invalidar():
+        global _local
+        cache.delete(CLAVE_MAPA)
+        with _lock:
+            _local = None
+    transaction.on_commit(_invalidar)
+
+
+def codificar_privilegios(codenames):
+    return codificar(obtener_mapa().mascara(codenames))
+
+
+def decodificar_privilegios(texto):
+    return MascaraPrivilegios(decodificar(texto), obtener_mapa())
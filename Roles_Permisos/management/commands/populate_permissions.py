@@ -3,6 +3,7 @@
 from django.core.management.base import BaseCommand
 from Roles_Permisos.models import Permiso
 from django.db import transaction
+from Roles_Permisos.bitmap import invalidar_mapa, reservar_bit
 
 class Command(BaseCommand):
     help = 'Crea y sincroniza los permisos granulares (privilegios) para cada módulo del sistema.'
@@ -24,6 +25,7 @@ class Command(BaseCommand):
         'Creditos': ['ver', 'editar', 'anular', 'abonar', 'verificar_abonos'],
         'Solicitudes': ['ver', 'crear', 'gestionar'],
         'Stock': ['ver_bajas', 'registrar_baja'],
+        'Sistema': ['ver_metricas'],
         
         'Devoluciones': [
             'ver_devolucion_proveedor', 
@@ -66,9 +68,20 @@ class Command(BaseCommand):
                 )
                 if creado:
                     nuevos_creados += 1
+                    self.stdout.write(f'   - {permiso.codename} -> bit {permiso.bit}')
         
         if nuevos_creados > 0:
             self.stdout.write(f'-> Se crearon {nuevos_creados} nuevos permisos.')
+
+        # Numeración estable para el mapa de bits de los tokens: los permisos nuevos
+        # toman su bit al crearse (Permiso.save) de la secuencia, que nunca reutiliza
+        # el de un permiso borrado, así un token ya emitido nunca cambia de significado.
+        # Aquí solo se completan los que hayan quedado sin bit.
+        for permiso in Permiso.objects.filter(bit__isnull=True).order_by('id'):
+            permiso.bit = reservar_bit()
+            permiso.save(update_fields=['bit'])
+            self.stdout.write(f'   - {permiso.codename} -> bit {permiso.bit}')
+        invalidar_mapa()
         
         total_permisos = Permiso.objects.count()
         self.stdout.write(self.style.SUCCESS(f"--- Sincronización completada. Total de permisos en el sistema: {total_permisos} ---"))
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.1 on 2026-10-17 12:00
+
+from django.db import migrations, models
+
+
+def asignar_bits(apps, schema_editor):
+    Permiso = apps.get_model('Roles_Permisos', 'Permiso')
+    for bit, permiso in enumerate(Permiso.objects.order_by('id')):
+        permiso.bit = bit
+        permiso.save(update_fields=['bit'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Roles_Permisos', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='permiso',
+            name='bit',
+            field=models.PositiveIntegerField(blank=True, help_text='Posición estable del permiso en el mapa de bits de los tokens. La asigna populate_permissions y no se reutiliza.', null=True, unique=True, verbose_name='Bit'),
+        ),
+        migrations.RunPython(asignar_bits, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.1 on 2026-10-17 20:50
+
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def iniciar_secuencia(apps, schema_editor):
+    Permiso = apps.get_model('Roles_Permisos', 'Permiso')
+    SecuenciaBits = apps.get_model('Roles_Permisos', 'SecuenciaBits')
+    maximo = Permiso.objects.aggregate(maximo=Max('bit'))['maximo']
+    SecuenciaBits.objects.update_or_create(pk=1, defaults={'siguiente': 0 if maximo is None else maximo + 1})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Roles_Permisos', '0002_permiso_bit'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SecuenciaBits',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('siguiente', models.PositiveIntegerField(default=0, verbose_name='Siguiente bit libre')),
+            ],
+            options={
+                'verbose_name': 'Secuencia de bits de permisos',
+                'verbose_name_plural': 'Secuencia de bits de permisos',
+            },
+        ),
+        migrations.AlterField(
+            model_name='permiso',
+            name='bit',
+            field=models.PositiveIntegerField(blank=True, help_text='Posición estable del permiso en el mapa de bits de los tokens. Se asigna al crear el permiso y no se reutiliza.', null=True, unique=True, verbose_name='Bit'),
+        ),
+        migrations.RunPython(iniciar_secuencia, migrations.RunPython.noop),
+    ]
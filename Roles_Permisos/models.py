@@ -19,17 +19,45 @@ class Permiso(models.Model):
         verbose_name="Módulo",
         help_text="El módulo al que pertenece este permiso. Ej: Ventas"
     )
+    bit = models.PositiveIntegerField(
+        unique=True,
+        null=True,
+        blank=True,
+        verbose_name="Bit",
+        help_text="Posición estable del permiso en el mapa de bits de los tokens. Se asigna al crear el permiso y no se reutiliza."
+    )
     
 
     def __str__(self):
         return self.nombre
 
+    def save(self, *args, **kwargs):
+        # Todo permiso entra al mapa de bits, se cree desde populate_permissions, el admin o la shell.
+        if self.bit is None:
+            from .bitmap import reservar_bit
+            self.bit = reservar_bit()
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = set(kwargs['update_fields']) | {'bit'}
+        super().save(*args, **kwargs)
+
     class Meta:
         verbose_name = "Permiso"
         verbose_name_plural = "Permisos"
         # Ordenar por módulo y luego por nombre para una mejor visualización en el admin
         ordering = ['modulo', 'nombre']
 
+class SecuenciaBits(models.Model):
+    """
+    Fila única con el próximo número libre del mapa de bits. Al borrar un permiso
+    su número no vuelve a usarse: un token emitido antes nunca pasa a conceder
+    el privilegio de un permiso nuevo.
+    """
+    siguiente = models.PositiveIntegerField(default=0, verbose_name="Siguiente bit libre")
+
+    class Meta:
+        verbose_name = "Secuencia de bits de permisos"
+        verbose_name_plural = "Secuencia de bits de permisos"
+
 class Rol(models.Model):
    
     nombre = models.CharField(
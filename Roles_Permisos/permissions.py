@@ -2,6 +2,7 @@
 
 from rest_framework.permissions import BasePermission
 from rest_framework import permissions
+from .privilegios import obtener_privilegios_rol
 
 class HasPrivilege(BasePermission):
     """
@@ -20,7 +21,7 @@ class HasPrivilege(BasePermission):
             return False
         
         # El superusuario siempre tiene acceso total
-        if request.user.is_superuser:
+        if getattr(request.user, 'is_superuser', False):
             return True
 
         # Determinar el privilegio requerido por la vista
@@ -34,23 +35,22 @@ class HasPrivilege(BasePermission):
             # Por seguridad, si una vista usa este permiso, DEBE definir el privilegio.
             return False
 
-        # Si el usuario no tiene un rol activo, denegar acceso.
-        if not hasattr(request.user, 'rol') or not request.user.rol or not request.user.rol.activo:
+        # Con autenticación por claims (ver authentication/jwt_auth.py) los privilegios
+        # ya vienen verificados dentro del token.
+        privilegios_token = getattr(request.user, 'privilegios_token', None)
+        if privilegios_token is not None:
+            return privilegios_token.tiene(required_privilege)
+
+        # Si el usuario no tiene rol (p. ej. un Cliente), denegar acceso. Usamos rol_id
+        # para no cargar el rol: sus privilegios y su estado salen de la caché.
+        rol_id = getattr(request.user, 'rol_id', None)
+        if not rol_id:
             return False
 
-        ✨
-        # Si el permiso requerido es para 'ver', comprobamos si tiene CUALQUIER privilegio del módulo.
-        if required_privilege.endswith('_ver'):
-            # Extraemos el nombre del módulo. Ej: 'ventas_ver' -> 'ventas'
-            module_name_prefix = required_privilege.rsplit('_', 1)[0] + "_"
-            
-            # Verificamos si existe algún permiso que comience con el prefijo del módulo.
-            # Ej: 'ventas_crear', 'ventas_editar', etc.
-            return request.user.rol.permisos.filter(codename__startswith=module_name_prefix).exists()
-        
-        # Si el permiso no es de 'ver' (ej: 'ventas_crear'), se mantiene la lógica original
-        # de buscar el privilegio exacto.
-        return request.user.rol.permisos.filter(codename=required_privilege).exists()
+        # Los privilegios del rol vienen precalculados como sets (ver privilegios.py).
+        # Un rol inactivo no tiene ningún privilegio, y si el permiso requerido es de
+        # 'ver' (ej: 'ventas_ver') basta con CUALQUIER privilegio del módulo.
+        return obtener_privilegios_rol(rol_id).tiene(required_privilege)
        
 
 class IsAdminOrReadOnly(permissions.BasePermission):
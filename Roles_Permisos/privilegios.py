@@ -0,0 +1,145 @@
+# Roles_Permisos/privilegios.py
+"""
+Resolución de privilegios por rol con caché en dos niveles.
+
+Cada rol se carga una sola vez en la caché compartida (Django cache) como el
+conjunto de codenames que tiene y si está activo. Cada proceso guarda además una
+copia local por unos segundos, así que la mayoría de las verificaciones de
+HasPrivilege no hacen ni consultas ni viajes a la caché.
+
+Si la caché es local del proceso (LocMemCache, el valor por defecto), invalidar un
+rol solo limpia el worker que atendió la edición: en ese caso no se usa el nivel
+compartido y cada proceso vuelve a la base cada TTL_LOCAL segundos, que es lo que
+tarda como máximo en verse un privilegio revocado o un rol desactivado.
+"""
+
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from backend_api.cache_compartida import cache_compartida
+
+
+# Segundos que un proceso confía en su copia local antes de volver a la caché compartida.
+# Es el retraso máximo con el que los demás procesos ven un cambio de rol.
+TTL_LOCAL = getattr(settings, 'PRIVILEGIOS_CACHE_TTL_LOCAL', 5)
+TTL_COMPARTIDO = getattr(settings, 'PRIVILEGIOS_CACHE_TTL', 60 * 60)
+
+_locales = {}
+_lock = threading.Lock()
+
+
+def _clave(rol_id):
+    return f'roles:privilegios:{rol_id}'
+
+
+def _clave_version(rol_id):
+    return f'roles:version:{rol_id}'
+
+
+def obtener_version_rol(rol_id):
+    """
+    Versión actual del rol. Viaja dentro del token de acceso: si el rol cambia
+    después de emitido el token, la versión deja de coincidir y los claims del
+    token ya no se aceptan como fuente de privilegios.
+    """
+    version = cache.get(_clave_version(rol_id))
+    if version is None:
+        version = time.time_ns()
+        if not cache.add(_clave_version(rol_id), version, timeout=None):
+            version = cache.get(_clave_version(rol_id), version)
+    return version
+
+
+def prefijos_de_modulo(codenames):
+    """
+    Todos los prefijos terminados en '_' de cada codename:
+    'devoluciones_ver_proveedor' -> {'devoluciones_', 'devoluciones_ver_'}.
+    Con esto la regla de '_ver' (cualquier permiso del módulo) es una búsqueda en un set.
+    """
+    prefijos = set()
+    for codename in codenames:
+        partes = codename.split('_')
+        for i in range(1, len(partes)):
+            prefijos.add('_'.join(partes[:i]) + '_')
+    return frozenset(prefijos)
+
+
+class PrivilegiosRol:
+    __slots__ = ('activo', 'codenames', 'prefijos')
+
+    def __init__(self, activo, codenames):
+        self.activo = activo
+        self.codenames = frozenset(codenames)
+        self.prefijos = prefijos_de_modulo(self.codenames)
+
+    def tiene(self, privilegio):
+        if not self.activo:
+            return False
+        # 'ventas_ver' se cumple con cualquier permiso del módulo ('ventas_crear', ...).
+        if privilegio.endswith('_ver'):
+            return privilegio.rsplit('_', 1)[0] + '_' in self.prefijos
+        return privilegio in self.codenames
+
+
+def _cargar_desde_bd(rol_id):
+    from .models import Rol, Permiso
+    activo = Rol.objects.filter(pk=rol_id).values_list('activo', flat=True).first()
+    if activo is None:
+        return {'activo': False, 'codenames': []}
+    codenames = list(Permiso.objects.filter(roles=rol_id).values_list('codename', flat=True))
+    return {'activo': activo, 'codenames': codenames}
+
+
+def obtener_privilegios_rol(rol_id):
+    ahora = time.monotonic()
+    entrada = _locales.get(rol_id)
+    if entrada is not None and entrada[0] > ahora:
+        return entrada[1]
+
+    compartida = cache_compartida()
+    datos = cache.get(_clave(rol_id)) if compartida else None
+    if datos is None:
+        datos = _cargar_desde_bd(rol_id)
+        if compartida:
+            cache.set(_clave(rol_id), datos, timeout=TTL_COMPARTIDO)
+
+    privilegios = PrivilegiosRol(datos['activo'], datos['codenames'])
+    with _lock:
+        _locales[rol_id] = (ahora + TTL_LOCAL, privilegios)
+    return privilegios
+
+
+def usuario_tiene_privilegio(user, privilegio):
+    if getattr(user, 'is_superuser', False):
+        return True
+    rol_id = getattr(user, 'rol_id', None)
+    if not rol_id:
+        return False
+    return obtener_privilegios_rol(rol_id).tiene(privilegio)
+
+
+def _invalidar(rol_ids):
+    # Al borrar la versión se genera una nueva en la próxima lectura.
+    cache.delete_many([_clave(rol_id) for rol_id in rol_ids] + [_clave_version(rol_id) for rol_id in rol_ids])
+    with _lock:
+        for rol_id in rol_ids:
+            _locales.pop(rol_id, None)
+
+
+def invalidar_privilegios_rol(*rol_ids):
+    """
+    Descarta los privilegios cacheados de los roles indicados una vez confirmada
+    la transacción (antes, otra petición podría volver a cachear los datos viejos).
+    """
+    rol_ids = [rol_id for rol_id in rol_ids if rol_id]
+    if rol_ids:
+        transaction.on_commit(lambda: _invalidar(rol_ids))
+
+
+def invalidar_todos_los_roles():
+    from .models import Rol
+    invalidar_privilegios_rol(*Rol.objects.values_list('id', flat=True))
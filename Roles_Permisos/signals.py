@@ -0,0 +1,38 @@
+# Roles_Permisos/signals.py
+
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from .models import Rol, Permiso
+from .privilegios import invalidar_privilegios_rol, invalidar_todos_los_roles
+from .bitmap import invalidar_mapa
+
+
+# Respaldo para los cambios que no pasan por RolRetrieveUpdateDestroyView
+# (admin de Django, shell, comandos como populate_permissions).
+
+@receiver(post_save, sender=Rol)
+@receiver(post_delete, sender=Rol)
+def rol_modificado(sender, instance, **kwargs):
+    invalidar_privilegios_rol(instance.pk)
+
+
+@receiver(m2m_changed, sender=Rol.permisos.through)
+def permisos_de_rol_modificados(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if reverse:
+        # Se modificaron los roles de un permiso: afecta a los roles tocados.
+        if pk_set:
+            invalidar_privilegios_rol(*pk_set)
+        else:
+            invalidar_todos_los_roles()
+    else:
+        invalidar_privilegios_rol(instance.pk)
+
+
+@receiver(post_save, sender=Permiso)
+@receiver(post_delete, sender=Permiso)
+def permiso_modificado(sender, instance, **kwargs):
+    invalidar_todos_los_roles()
+    invalidar_mapa()
@@ -5,6 +5,8 @@ from rest_framework.exceptions import ValidationError, PermissionDenied
 from .models import Rol, Permiso
 from .serializers import RolSerializer, PermisoSerializer
 from .permissions import HasPrivilege
+from .privilegios import invalidar_privilegios_rol
+from .bitmap import obtener_mapa, decodificar
 
 # Constantes para nombres de roles protegidos
 ADMINISTRADOR_ROLE_NAME = 'Administrador'
@@ -36,6 +38,26 @@ class PermisoListCreateView(generics.ListAPIView):
             
         return Response(grouped_data)
 
+class PermisoBitsView(generics.GenericAPIView):
+    """
+    Tabla para expandir el mapa de bits 'privileges_bitmap' del token de acceso.
+    El bitmap es base64url (sin relleno) de un entero en bytes little-endian:
+    el permiso con bit N está presente si el byte N // 8 tiene encendido el bit N % 8.
+    Con ?bitmap=... se devuelve además la lista de codenames ya expandida.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        mapa = obtener_mapa()
+        data = {'bits': {codename: bit for codename, bit in sorted(mapa.bit_por_codename.items(), key=lambda par: par[1])}}
+        bitmap = request.query_params.get('bitmap')
+        if bitmap:
+            try:
+                data['privileges'] = mapa.expandir(decodificar(bitmap))
+            except (ValueError, TypeError):
+                raise ValidationError({'bitmap': 'El mapa de bits no es un base64url válido.'})
+        return Response(data)
+
 class PermisoRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
     queryset = Permiso.objects.all()
     serializer_class = PermisoSerializer
@@ -87,6 +109,10 @@ class RolRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
                 )
         
         serializer.save()
+        # Los privilegios del rol están cacheados: si cambiaron los permisos o se
+        # activó/desactivó el rol, hay que descartarlos.
+        if 'permisos' in serializer.validated_data or 'activo' in serializer.validated_data:
+            invalidar_privilegios_rol(instance.pk)
 
     def perform_destroy(self, instance):
         if instance.nombre.lower() in PROTECTED_ROLE_NAMES:
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.1 on 2026-10-17 20:18
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def registrar_saldos_iniciales(apps, schema_editor):
+    # El kardex arranca con el stock que tenía cada producto al crear la tabla.
+    Producto = apps.get_model('Productos', 'Producto')
+    MovimientoStock = apps.get_model('Stock', 'MovimientoStock')
+    ahora = django.utils.timezone.now()
+    periodo = django.utils.timezone.localdate(ahora).replace(day=1)
+    MovimientoStock.objects.bulk_create(
+        [
+            MovimientoStock(producto_id=producto_id, fecha=ahora, periodo=periodo, tipo='SALDO_INICIAL', cantidad=stock, saldo_resultante=stock)
+            for producto_id, stock in Producto.objects.exclude(stock_actual=0).values_list('id', 'stock_actual').iterator()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Productos', '0003_producto_search_vector'),
+        ('Stock', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MovimientoStock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateTimeField(default=django.utils.timezone.now)),
+                ('periodo', models.DateField(editable=False)),
+                ('tipo', models.CharField(choices=[('SALDO_INICIAL', 'Saldo inicial'), ('COMPRA', 'Compra confirmada'), ('COMPRA_REVERSION', 'Reversión de compra'), ('VENTA', 'Venta directa'), ('VENTA_ANULACION', 'Anulación de venta'), ('PEDIDO', 'Pedido confirmado'), ('PEDIDO_CANCELACION', 'Cancelación de pedido'), ('BAJA', 'Baja de stock'), ('DEVOLUCION_CLIENTE', 'Devolución de cliente'), ('CAMBIO', 'Producto entregado en cambio'), ('RECEPCION_PROVEEDOR', 'Recepción de proveedor')], max_length=30)),
+                ('cantidad', models.IntegerField(help_text='Positiva para entradas, negativa para salidas.')),
+                ('saldo_resultante', models.IntegerField(help_text='Stock del producto después del movimiento.')),
+                ('documento_tipo', models.CharField(blank=True, help_text='Modelo que originó el movimiento (pedido, venta, compra...).', max_length=50)),
+                ('documento_id', models.PositiveIntegerField(blank=True, null=True)),
+                ('producto', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.PROTECT, related_name='movimientos_stock', to='Productos.producto')),
+            ],
+            options={
+                'verbose_name': 'Movimiento de Stock',
+                'verbose_name_plural': 'Movimientos de Stock',
+                'ordering': ['fecha', 'id'],
+                'indexes': [models.Index(fields=['producto', 'fecha', 'id'], include=('tipo', 'cantidad', 'saldo_resultante'), name='stock_mov_producto_fecha_idx'), models.Index(fields=['periodo'], name='stock_mov_periodo_idx'), models.Index(fields=['documento_tipo', 'documento_id'], name='stock_mov_documento_idx')],
+            },
+        ),
+        migrations.RunPython(registrar_saldos_iniciales, migrations.RunPython.noop),
+    ]
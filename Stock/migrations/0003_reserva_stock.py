@@ -0,0 +1,32 @@
+# Generated by Django 5.2.1 on 2026-10-17 20:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Pedidos', '0002_initial'),
+        ('Productos', '0003_producto_search_vector'),
+        ('Stock', '0002_movimiento_stock'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReservaStock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cantidad', models.PositiveIntegerField()),
+                ('expira_en', models.DateTimeField()),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+                ('pedido', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='reservas_stock', to='Pedidos.pedido')),
+                ('producto', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='reservas_stock', to='Productos.producto')),
+            ],
+            options={
+                'verbose_name': 'Reserva de Stock',
+                'verbose_name_plural': 'Reservas de Stock',
+                'indexes': [models.Index(fields=['producto', 'expira_en'], include=('cantidad',), name='stock_reserva_producto_idx'), models.Index(fields=['expira_en'], name='stock_reserva_expira_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-17 20:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Stock', '0003_reserva_stock'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='movimientostock',
+            name='tipo',
+            field=models.CharField(choices=[('SALDO_INICIAL', 'Saldo inicial'), ('COMPRA', 'Compra confirmada'), ('COMPRA_REVERSION', 'Reversión de compra'), ('VENTA', 'Venta directa'), ('VENTA_ANULACION', 'Anulación de venta'), ('PEDIDO', 'Pedido confirmado'), ('PEDIDO_CANCELACION', 'Cancelación de pedido'), ('BAJA', 'Baja de stock'), ('DEVOLUCION_CLIENTE', 'Devolución de cliente'), ('CAMBIO', 'Producto entregado en cambio'), ('RECEPCION_PROVEEDOR', 'Recepción de proveedor'), ('AJUSTE', 'Ajuste de inventario')], max_length=30),
+        ),
+    ]
@@ -56,4 +56,78 @@ class ItemDevolucionAProveedor(models.Model):
     recepcion_confirmada = models.BooleanField(default=False)
 
     def __str__(self):
-        return f"{self.cantidad_enviada} x {self.producto_original.nombre}"
\ No newline at end of file
+        return f"{self.cantidad_enviada} x {self.producto_original.nombre}"
+
+class MovimientoStock(models.Model):
+    """
+    Kardex: una fila por cada cambio de Producto.stock_actual, escrita en la misma
+    transacción que el cambio (ver Stock/servicios.py). Nunca se edita ni se borra.
+    """
+    class Tipo(models.TextChoices):
+        SALDO_INICIAL = 'SALDO_INICIAL', 'Saldo inicial'
+        COMPRA = 'COMPRA', 'Compra confirmada'
+        COMPRA_REVERSION = 'COMPRA_REVERSION', 'Reversión de compra'
+        VENTA = 'VENTA', 'Venta directa'
+        VENTA_ANULACION = 'VENTA_ANULACION', 'Anulación de venta'
+        PEDIDO = 'PEDIDO', 'Pedido confirmado'
+        PEDIDO_CANCELACION = 'PEDIDO_CANCELACION', 'Cancelación de pedido'
+        BAJA = 'BAJA', 'Baja de stock'
+        DEVOLUCION_CLIENTE = 'DEVOLUCION_CLIENTE', 'Devolución de cliente'
+        CAMBIO = 'CAMBIO', 'Producto entregado en cambio'
+        RECEPCION_PROVEEDOR = 'RECEPCION_PROVEEDOR', 'Recepción de proveedor'
+        AJUSTE = 'AJUSTE', 'Ajuste de inventario'
+
+    producto = models.ForeignKey('Productos.Producto', on_delete=models.PROTECT, related_name='movimientos_stock', db_index=False)
+    fecha = models.DateTimeField(default=timezone.now)
+    # Primer día del mes de `fecha`: permite descartar meses enteros al filtrar y
+    # archivar el historial por mes.
+    periodo = models.DateField(editable=False)
+    tipo = models.CharField(max_length=30, choices=Tipo.choices)
+    cantidad = models.IntegerField(help_text="Positiva para entradas, negativa para salidas.")
+    saldo_resultante = models.IntegerField(help_text="Stock del producto después del movimiento.")
+    documento_tipo = models.CharField(max_length=50, blank=True, help_text="Modelo que originó el movimiento (pedido, venta, compra...).")
+    documento_id = models.PositiveIntegerField(null=True, blank=True)
+
+    def save(self, *args, **kwargs):
+        if not self.periodo:
+            self.periodo = timezone.localdate(self.fecha).replace(day=1)
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.get_tipo_display()}: {self.cantidad:+d} x Producto {self.producto_id} (saldo {self.saldo_resultante})"
+
+    class Meta:
+        verbose_name = "Movimiento de Stock"
+        verbose_name_plural = "Movimientos de Stock"
+        ordering = ['fecha', 'id']
+        indexes = [
+            # El kardex de un producto se lee solo desde este índice (en Postgres, INCLUDE).
+            models.Index(fields=['producto', 'fecha', 'id'], include=['tipo', 'cantidad', 'saldo_resultante'], name='stock_mov_producto_fecha_idx'),
+            models.Index(fields=['periodo'], name='stock_mov_periodo_idx'),
+            models.Index(fields=['documento_tipo', 'documento_id'], name='stock_mov_documento_idx'),
+        ]
+
+
+class ReservaStock(models.Model):
+    """
+    Unidades apartadas por un pedido en 'pendiente_pago_temporal' hasta su fecha
+    límite de pago, o mientras se verifica su pago (ver Stock/reservas.py). Una reserva vencida ya no descuenta del disponible aunque la
+    fila siga existiendo; el comando cancelar_pedidos_temporales las borra en bloque.
+    """
+    pedido = models.ForeignKey('Pedidos.Pedido', on_delete=models.CASCADE, related_name='reservas_stock', db_constraint=False)
+    producto = models.ForeignKey('Productos.Producto', on_delete=models.CASCADE, related_name='reservas_stock', db_index=False)
+    cantidad = models.PositiveIntegerField()
+    expira_en = models.DateTimeField()
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Reserva de {self.cantidad} x Producto {self.producto_id} (Pedido #{self.pedido_id})"
+
+    class Meta:
+        verbose_name = "Reserva de Stock"
+        verbose_name_plural = "Reservas de Stock"
+        indexes = [
+            # Suma de reservas vigentes por producto leyendo solo el índice.
+            models.Index(fields=['producto', 'expira_en'], include=['cantidad'], name='stock_reserva_producto_idx'),
+            models.Index(fields=['expira_en'], name='stock_reserva_expira_idx'),
+        ]
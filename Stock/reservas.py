@@ -0,0 +1,155 @@
+# backend/Stock/reservas.py
+"""
+Reservas de stock para pedidos pendientes de pago.
+
+disponible = stock_actual - reservas vigentes (expira_en > ahora). El disponible de
+cada producto se cachea hasta que cambie su stock o sus reservas, o hasta que venza
+la primera de sus reservas, lo que pase antes.
+
+La reserva se crea hasta la fecha límite de pago. Si el cliente sube el comprobante
+(el pedido pasa a 'en_verificacion' o 'pago_incompleto') se extiende
+RESERVA_STOCK_VERIFICACION_HORAS, y se libera solo al confirmar el pedido (dentro
+de Pedido.descontar_stock) o al cancelarlo.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Min, Sum
+from django.utils import timezone
+
+from backend_api.cache_compartida import timeout_segun_cache
+
+from .models import ReservaStock
+from .servicios import StockInsuficienteError, agrupar_lineas
+
+logger = logging.getLogger(__name__)
+
+TTL_DISPONIBLE = 60
+HORAS_VERIFICACION = getattr(settings, 'RESERVA_STOCK_VERIFICACION_HORAS', 72)
+
+
+def _clave(producto_id):
+    return f'stock:disponible:{producto_id}'
+
+
+def reservas_vigentes(producto_ids, excluir_pedido=None):
+    """{producto_id: unidades reservadas vigentes} en una sola consulta agrupada."""
+    qs = ReservaStock.objects.filter(producto_id__in=producto_ids, expira_en__gt=timezone.now())
+    if excluir_pedido is not None:
+        qs = qs.exclude(pedido_id=excluir_pedido)
+    return dict(qs.values('producto_id').annotate(total=Sum('cantidad')).values_list('producto_id', 'total'))
+
+
+def disponible(producto_ids):
+    """{producto_id: unidades que se pueden vender}, usando la caché por producto."""
+    from Productos.models import Producto
+
+    producto_ids = list(set(producto_ids))
+    cacheados = cache.get_many([_clave(pid) for pid in producto_ids])
+    resultado = {pid: cacheados[_clave(pid)] for pid in producto_ids if _clave(pid) in cacheados}
+    faltan = [pid for pid in producto_ids if pid not in resultado]
+    if not faltan:
+        return resultado
+
+    ahora = timezone.now()
+    stock = dict(Producto.objects.filter(id__in=faltan).values_list('id', 'stock_actual'))
+    vigentes = (
+        ReservaStock.objects.filter(producto_id__in=faltan, expira_en__gt=ahora)
+        .values('producto_id').annotate(total=Sum('cantidad'), vence=Min('expira_en'))
+    )
+    reservado = {fila['producto_id']: fila for fila in vigentes}
+
+    for pid, stock_actual in stock.items():
+        fila = reservado.get(pid)
+        resultado[pid] = stock_actual - (fila['total'] if fila else 0)
+        # Con caché local invalidar_disponible solo limpia este proceso: ahí el valor
+        # vive como mucho CACHE_TIMEOUT_LOCAL segundos.
+        timeout = timeout_segun_cache(TTL_DISPONIBLE)
+        if fila:
+            # El valor deja de ser cierto cuando vence la primera reserva.
+            timeout = max(1, min(timeout, int((fila['vence'] - ahora).total_seconds())))
+        cache.set(_clave(pid), resultado[pid], timeout=timeout)
+    return resultado
+
+
+def invalidar_disponible(producto_ids):
+    producto_ids = list(producto_ids)
+    if producto_ids:
+        transaction.on_commit(lambda: cache.delete_many([_clave(pid) for pid in producto_ids]))
+
+
+@transaction.atomic
+def reservar_stock_pedido(pedido):
+    """
+    Aparta las unidades de todas las líneas del pedido hasta su fecha_limite_pago.
+    Bloquea los productos en orden de id (como el servicio de stock) para que dos
+    pedidos no reserven las mismas últimas unidades.
+    """
+    from Productos.models import Producto
+
+    cantidades = agrupar_lineas(pedido.detalles.values_list('producto_id', 'cantidad'))
+    if not cantidades:
+        return []
+
+    bloqueados = {
+        fila['id']: fila
+        for fila in Producto.objects.select_for_update().filter(id__in=cantidades).order_by('id').values('id', 'nombre', 'stock_actual')
+    }
+    reservado = reservas_vigentes(list(cantidades), excluir_pedido=pedido.pk)
+    faltantes = []
+    for pid, cantidad in cantidades.items():
+        libre = bloqueados[pid]['stock_actual'] - reservado.get(pid, 0)
+        if libre < cantidad:
+            faltantes.append({'producto_id': pid, 'nombre': bloqueados[pid]['nombre'], 'disponible': max(libre, 0), 'requerido': cantidad})
+    if faltantes:
+        raise StockInsuficienteError(faltantes)
+
+    ReservaStock.objects.filter(pedido=pedido).delete()
+    reservas = ReservaStock.objects.bulk_create([
+        ReservaStock(pedido=pedido, producto_id=pid, cantidad=cantidad, expira_en=pedido.fecha_limite_pago)
+        for pid, cantidad in cantidades.items()
+    ])
+    invalidar_disponible(cantidades)
+    logger.info(f"Pedido #{pedido.pk}: reservadas {len(reservas)} líneas hasta {pedido.fecha_limite_pago}.")
+    return reservas
+
+
+def liberar_reservas(pedido_ids):
+    """Borra en un solo DELETE las reservas de los pedidos indicados."""
+    qs = ReservaStock.objects.filter(pedido_id__in=list(pedido_ids))
+    producto_ids = set(qs.values_list('producto_id', flat=True))
+    if not producto_ids:
+        return 0
+    borradas, _ = qs.delete()
+    invalidar_disponible(producto_ids)
+    return borradas
+
+
+def extender_reservas(pedido_ids, horas=HORAS_VERIFICACION):
+    """
+    Extiende las reservas vigentes de los pedidos mientras se verifica su pago. Las
+    ya vencidas no se reviven: esas unidades pueden estar apartadas por otro pedido.
+    """
+    ahora = timezone.now()
+    qs = ReservaStock.objects.filter(pedido_id__in=list(pedido_ids), expira_en__gt=ahora)
+    producto_ids = set(qs.values_list('producto_id', flat=True))
+    if not producto_ids:
+        return 0
+    extendidas = qs.update(expira_en=ahora + timedelta(hours=horas))
+    invalidar_disponible(producto_ids)
+    return extendidas
+
+
+def liberar_reservas_vencidas(ahora=None):
+    """Borra en bloque las reservas ya vencidas (ya no descontaban del disponible)."""
+    qs = ReservaStock.objects.filter(expira_en__lte=ahora or timezone.now())
+    producto_ids = set(qs.values_list('producto_id', flat=True))
+    if not producto_ids:
+        return 0
+    borradas, _ = qs.delete()
+    invalidar_disponible(producto_ids)
+    return borradas
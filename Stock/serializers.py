@@ -3,7 +3,8 @@
 from rest_framework import serializers
 from django.db import transaction
 from django.utils import timezone
-from .models import BajaDeStock, DevolucionAProveedor, ItemDevolucionAProveedor
+from .models import BajaDeStock, DevolucionAProveedor, ItemDevolucionAProveedor, MovimientoStock
+from .servicios import descontar_stock, reponer_stock, StockInsuficienteError
 from Productos.models import Producto
 from Devoluciones.models import ItemDevuelto
 from Proveedores.models import Proveedor 
@@ -35,13 +36,21 @@ class BajaDeStockCreateSerializer(serializers.ModelSerializer):
 
     @transaction.atomic
     def create(self, validated_data):
-        producto = validated_data['producto']
-        cantidad_baja = validated_data['cantidad']
-        producto.stock_actual -= cantidad_baja
-        producto.save(update_fields=['stock_actual'])
         baja = BajaDeStock.objects.create(**validated_data)
+        try:
+            descontar_stock([(baja.producto_id, baja.cantidad)], MovimientoStock.Tipo.BAJA, baja)
+        except StockInsuficienteError as e:
+            raise serializers.ValidationError(e.messages)
         return baja
 
+# --- Serializers para el Kardex ---
+class MovimientoStockSerializer(serializers.ModelSerializer):
+    tipo_display = serializers.CharField(source='get_tipo_display', read_only=True)
+
+    class Meta:
+        model = MovimientoStock
+        fields = ['id', 'fecha', 'tipo', 'tipo_display', 'cantidad', 'saldo_resultante', 'documento_tipo', 'documento_id']
+
 # --- Serializers para Devoluciones a Proveedor ---
 class ItemGestionProveedorReadSerializer(serializers.ModelSerializer):
     producto_original_nombre = serializers.CharField(source='producto_original.nombre', read_only=True)
@@ -116,10 +125,10 @@ class ConfirmarRecepcionSerializer(serializers.Serializer):
         
         # 3. Actualiza el stock
         if productos_a_actualizar:
-            productos_qs = Producto.objects.select_for_update().filter(id__in=productos_a_actualizar.keys())
-            for producto in productos_qs:
-                producto.stock_actual += productos_a_actualizar[producto.id]['cantidad_a_sumar']
-            Producto.objects.bulk_update(productos_qs, ['stock_actual'])
+            reponer_stock(
+                [(producto_id, datos['cantidad_a_sumar']) for producto_id, datos in productos_a_actualizar.items()],
+                MovimientoStock.Tipo.RECEPCION_PROVEEDOR, instance,
+            )
 
         # 4. Actualiza los items de la gestión
         ItemDevolucionAProveedor.objects.bulk_update(items_a_actualizar, ['cantidad_recibida', 'producto_recibido', 'notas_recepcion', 'recepcion_confirmada'])
@@ -0,0 +1,156 @@
+# backend/Stock/servicios.py
+"""
+Punto único para mover el stock vendible de los productos.
+
+Todas las entradas y salidas de un documento (pedido, venta, compra...) se aplican
+juntas: un SELECT ... FOR UPDATE de los productos involucrados ordenado por id (todas
+las transacciones bloquean en el mismo orden, así no hay interbloqueos) y un único
+UPDATE con stock_actual = stock_actual + delta. Si falta stock en alguna línea no se
+toca nada y se informa exactamente qué productos faltaron.
+
+Cada cambio queda además en el kardex (MovimientoStock) con el saldo resultante,
+dentro de la misma transacción.
+"""
+
+import logging
+from collections import defaultdict
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, DecimalField, Q, Value, When
+from django.db.models.functions import Greatest, Now
+from django.utils import timezone
+
+from .models import MovimientoStock
+
+logger = logging.getLogger(__name__)
+
+
+class StockInsuficienteError(ValidationError):
+    """
+    Stock insuficiente en una o más líneas. `faltantes` es una lista de
+    {'producto_id', 'nombre', 'disponible', 'requerido'}.
+    """
+
+    def __init__(self, faltantes):
+        self.faltantes = faltantes
+        super().__init__([
+            f"No hay stock suficiente para '{f['nombre']}'. Disponible: {f['disponible']}, Requerido: {f['requerido']}."
+            for f in faltantes
+        ])
+
+
+def agrupar_lineas(lineas):
+    """Suma las cantidades por producto: un mismo producto puede venir en varias líneas."""
+    cantidades = defaultdict(int)
+    for producto_id, cantidad in lineas:
+        if producto_id and cantidad:
+            cantidades[producto_id] += cantidad
+    return cantidades
+
+
+@transaction.atomic
+def aplicar_movimientos(deltas, tipo, documento=None, limitar_en_cero=False, costos=None, respetar_reservas=False):
+    """
+    Aplica {producto_id: delta} al stock de los productos (delta negativo = salida)
+    y lo registra en el kardex con el `tipo` (MovimientoStock.Tipo) y el `documento`
+    (instancia de modelo) que lo originó.
+
+    - Con limitar_en_cero las salidas dejan el stock en 0 en lugar de fallar
+      (lo que hacía la reversión de compras).
+    - `costos` ({producto_id: costo}) actualiza también ultimo_costo_compra en el mismo UPDATE.
+    - Con respetar_reservas una salida no puede usar unidades reservadas por
+      pedidos pendientes de pago (ver Stock/reservas.py).
+
+    Devuelve {producto_id: (stock_anterior, stock_nuevo)}.
+    """
+    from Productos.models import Producto
+    from Productos.cache import marcar_catalogo_modificado
+    from Productos.catalogo import sincronizar_catalogo
+    from .reservas import invalidar_disponible, reservas_vigentes
+
+    deltas = {pid: delta for pid, delta in deltas.items() if delta}
+    costos = costos or {}
+    ids = sorted(set(deltas) | set(costos))
+    if not ids:
+        return {}
+
+    bloqueados = {
+        fila['id']: fila
+        for fila in Producto.objects.select_for_update().filter(id__in=ids).order_by('id').values('id', 'nombre', 'stock_actual')
+    }
+    if len(bloqueados) != len(ids):
+        raise ValidationError(f"Productos inexistentes: {sorted(set(ids) - set(bloqueados))}.")
+
+    reservado = reservas_vigentes(ids) if respetar_reservas else {}
+    faltantes = [
+        {'producto_id': pid, 'nombre': bloqueados[pid]['nombre'], 'disponible': max(bloqueados[pid]['stock_actual'] - reservado.get(pid, 0), 0), 'requerido': -delta}
+        for pid, delta in deltas.items()
+        if delta < 0 and not limitar_en_cero and bloqueados[pid]['stock_actual'] - reservado.get(pid, 0) + delta < 0
+    ]
+    if faltantes:
+        raise StockInsuficienteError(faltantes)
+
+    nuevo_stock = F('stock_actual') + Case(
+        *[When(id=pid, then=Value(delta)) for pid, delta in deltas.items()],
+        default=Value(0), output_field=IntegerField(),
+    )
+    cambios = {
+        'stock_actual': Greatest(nuevo_stock, Value(0)) if limitar_en_cero else nuevo_stock,
+        # updated_at va explícito porque update() no pasa por save() (las ETags del catálogo dependen de él).
+        'updated_at': Now(),
+    }
+    if costos:
+        cambios['ultimo_costo_compra'] = Case(
+            *[When(id=pid, then=Value(costo)) for pid, costo in costos.items()],
+            default=F('ultimo_costo_compra'), output_field=DecimalField(max_digits=12, decimal_places=2),
+        )
+
+    # Condición de respaldo: aunque las filas están bloqueadas, el UPDATE solo toca
+    # productos que siguen teniendo stock para su salida.
+    condicion = Q(id__in=ids)
+    if not limitar_en_cero:
+        for pid, delta in deltas.items():
+            if delta < 0:
+                condicion &= ~Q(id=pid) | Q(stock_actual__gte=-delta)
+    actualizados = Producto.objects.filter(condicion).update(**cambios)
+    if actualizados != len(ids):
+        raise ValidationError("El stock cambió mientras se procesaba el movimiento. Intenta de nuevo.")
+
+    # El stock también va en la tabla del catálogo: se recalculan esas filas en la misma transacción.
+    sincronizar_catalogo(ids)
+    marcar_catalogo_modificado()
+    invalidar_disponible(ids)
+
+    resultado = {}
+    for pid in ids:
+        anterior = bloqueados[pid]['stock_actual']
+        nuevo = anterior + deltas.get(pid, 0)
+        resultado[pid] = (anterior, max(nuevo, 0) if limitar_en_cero else nuevo)
+
+    ahora = timezone.now()
+    MovimientoStock.objects.bulk_create([
+        MovimientoStock(
+            producto_id=pid, fecha=ahora, periodo=timezone.localdate(ahora).replace(day=1), tipo=tipo,
+            cantidad=nuevo - anterior, saldo_resultante=nuevo,
+            documento_tipo=documento._meta.model_name if documento is not None else '',
+            documento_id=documento.pk if documento is not None else None,
+        )
+        for pid, (anterior, nuevo) in resultado.items() if nuevo != anterior
+    ])
+    return resultado
+
+
+def descontar_stock(lineas, tipo, documento=None, respetar_reservas=False):
+    """Salida de stock para líneas (producto_id, cantidad). Falla si alguna no alcanza."""
+    return aplicar_movimientos({pid: -cantidad for pid, cantidad in agrupar_lineas(lineas).items()}, tipo, documento, respetar_reservas=respetar_reservas)
+
+
+def reponer_stock(lineas, tipo, documento=None, costos=None):
+    """Entrada de stock para líneas (producto_id, cantidad)."""
+    return aplicar_movimientos(dict(agrupar_lineas(lineas)), tipo, documento, costos=costos)
+
+
+def retirar_stock_hasta_cero(lineas, tipo, documento=None):
+    """Salida de stock que nunca deja un producto en negativo ni falla por faltantes."""
+    return aplicar_movimientos({pid: -cantidad for pid, cantidad in agrupar_lineas(lineas).items()}, tipo, documento, limitar_en_cero=True)
@@ -1 +1,313 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from Clientes.models import Cliente
+from Compras.models import Compra, ItemCompra
+from Pedidos.models import DetallePedido, Pedido
+from Productos.models import CategoriaProducto, Marca, Producto, ProductoCatalogo
+from Proveedores.models import Proveedor
+from Ventas.models import DetalleVenta, Venta
+
+from .models import MovimientoStock, ReservaStock
+from .reservas import (
+    HORAS_VERIFICACION, disponible, extender_reservas, liberar_reservas_vencidas, reservar_stock_pedido,
+)
+from .servicios import StockInsuficienteError, aplicar_movimientos, descontar_stock
+
+
+def crear_producto(nombre, stock, categoria=None, marca=None):
+    categoria = categoria or CategoriaProducto.objects.get_or_create(nombre='Obra gris', defaults={'descripcion': ''})[0]
+    marca = marca or Marca.objects.get_or_create(nombre='Argos')[0]
+    return Producto.objects.create(
+        nombre=nombre, categoria=categoria, marca=marca, descripcion='',
+        precio_venta=Decimal('10.00'), stock_actual=stock,
+    )
+
+
+def stock(producto):
+    producto.refresh_from_db(fields=['stock_actual'])
+    return producto.stock_actual
+
+
+class AplicarMovimientosTests(TestCase):
+
+    def setUp(self):
+        self.cemento = crear_producto('Cemento', 10)
+        self.arena = crear_producto('Arena', 3)
+        self.varilla = crear_producto('Varilla', 1)
+
+    def test_pedido_con_una_linea_corta_no_aplica_nada(self):
+        with self.assertRaises(StockInsuficienteError) as error:
+            descontar_stock(
+                [(self.cemento.pk, 4), (self.arena.pk, 2), (self.arena.pk, 2), (self.varilla.pk, 5)],
+                MovimientoStock.Tipo.PEDIDO,
+            )
+
+        # Se informan todas las líneas que faltan (arena agrupada: 2 + 2), no solo la primera.
+        faltantes = sorted(error.exception.faltantes, key=lambda f: f['producto_id'])
+        self.assertEqual(faltantes, [
+            {'producto_id': self.arena.pk, 'nombre': 'Arena', 'disponible': 3, 'requerido': 4},
+            {'producto_id': self.varilla.pk, 'nombre': 'Varilla', 'disponible': 1, 'requerido': 5},
+        ])
+        self.assertEqual(len(error.exception.messages), 2)
+        self.assertEqual((stock(self.cemento), stock(self.arena), stock(self.varilla)), (10, 3, 1))
+        self.assertFalse(MovimientoStock.objects.exists())
+
+    def test_lote_con_entradas_y_salidas(self):
+        resultado = aplicar_movimientos(
+            {self.cemento.pk: -4, self.arena.pk: 5, self.varilla.pk: 0},
+            MovimientoStock.Tipo.CAMBIO,
+        )
+
+        self.assertEqual(resultado, {self.cemento.pk: (10, 6), self.arena.pk: (3, 8)})
+        self.assertEqual((stock(self.cemento), stock(self.arena), stock(self.varilla)), (6, 8, 1))
+        movimientos = {m.producto_id: m for m in MovimientoStock.objects.all()}
+        self.assertEqual(set(movimientos), {self.cemento.pk, self.arena.pk})
+        self.assertEqual((movimientos[self.cemento.pk].cantidad, movimientos[self.cemento.pk].saldo_resultante), (-4, 6))
+        self.assertEqual((movimientos[self.arena.pk].cantidad, movimientos[self.arena.pk].saldo_resultante), (5, 8))
+        # La tabla del catálogo queda con el mismo stock.
+        self.assertEqual(ProductoCatalogo.objects.get(pk=self.cemento.pk).stock_actual, 6)
+
+    def test_limitar_en_cero(self):
+        resultado = aplicar_movimientos({self.varilla.pk: -5}, MovimientoStock.Tipo.COMPRA_REVERSION, limitar_en_cero=True)
+        self.assertEqual(resultado, {self.varilla.pk: (1, 0)})
+        self.assertEqual(MovimientoStock.objects.get().cantidad, -1)
+
+    def test_costos_sin_movimiento(self):
+        aplicar_movimientos({self.cemento.pk: 2}, MovimientoStock.Tipo.COMPRA, costos={self.arena.pk: Decimal('7.50')})
+        self.arena.refresh_from_db()
+        self.assertEqual(self.arena.ultimo_costo_compra, Decimal('7.50'))
+        self.assertEqual(stock(self.arena), 3)
+        self.assertEqual(MovimientoStock.objects.count(), 1)
+
+
+class KardexTests(TestCase):
+
+    def setUp(self):
+        self.producto = crear_producto('Cemento', 0)
+        self.usuario = get_user_model().objects.create_superuser('admin@example.com', 'clave-segura')
+        self.client = APIClient()
+        self.client.force_authenticate(self.usuario)
+        self.url = f'/api/stock/kardex/{self.producto.pk}/'
+
+    def mover(self, delta, tipo=MovimientoStock.Tipo.AJUSTE, fecha=None):
+        aplicar_movimientos({self.producto.pk: delta}, tipo)
+        movimiento = MovimientoStock.objects.latest('id')
+        if fecha is not None:
+            MovimientoStock.objects.filter(pk=movimiento.pk).update(fecha=fecha, periodo=fecha.date().replace(day=1))
+        return movimiento
+
+    def test_saldo_resultante_en_orden(self):
+        self.mover(10, MovimientoStock.Tipo.SALDO_INICIAL)
+        self.mover(-3)
+        self.mover(5)
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        filas = response.json()['results']
+        self.assertEqual([(f['cantidad'], f['saldo_resultante']) for f in filas], [(10, 10), (-3, 7), (5, 12)])
+        self.assertEqual(filas[0]['tipo_display'], 'Saldo inicial')
+
+    def test_filtros_desde_y_hasta(self):
+        zona = timezone.get_current_timezone()
+        self.mover(10, fecha=datetime(2026, 1, 31, 12, tzinfo=zona))
+        self.mover(-1, fecha=datetime(2026, 2, 1, 12, tzinfo=zona))
+        self.mover(-2, fecha=datetime(2026, 3, 15, 12, tzinfo=zona))
+
+        def cantidades(query):
+            return [f['cantidad'] for f in self.client.get(self.url + query).json()['results']]
+
+        self.assertEqual(cantidades('?desde=2026-02-01'), [-1, -2])
+        self.assertEqual(cantidades('?hasta=2026-02-01'), [10, -1])
+        self.assertEqual(cantidades('?desde=2026-02-01&hasta=2026-02-28'), [-1])
+        self.assertEqual(self.client.get(self.url + '?desde=01/02/2026').status_code, 400)
+
+    def test_paginacion_por_cursor(self):
+        for _ in range(5):
+            self.mover(1)
+
+        response = self.client.get(self.url + '?page_size=2').json()
+        saldos = [f['saldo_resultante'] for f in response['results']]
+        while response['next']:
+            response = self.client.get(response['next']).json()
+            saldos += [f['saldo_resultante'] for f in response['results']]
+        self.assertEqual(saldos, [1, 2, 3, 4, 5])
+
+    def test_producto_inexistente(self):
+        self.assertEqual(self.client.get('/api/stock/kardex/999999/').status_code, 404)
+
+    def test_requiere_privilegio(self):
+        self.client.force_authenticate(get_user_model().objects.create_user('sinrol@example.com', 'clave-segura'))
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+
+class MovimientosPorDocumentoTests(TestCase):
+    """Cada documento deja un movimiento con su tipo y la referencia al documento."""
+
+    def setUp(self):
+        self.producto = crear_producto('Cemento', 10)
+
+    def movimiento_de(self, documento):
+        return MovimientoStock.objects.get(documento_tipo=documento._meta.model_name, documento_id=documento.pk)
+
+    def ultimo(self):
+        return MovimientoStock.objects.latest('id')
+
+    def test_compra(self):
+        proveedor = Proveedor.objects.create(nombre='Ferretería Central', documento='900123', telefono='3000000', direccion='Calle 1')
+        compra = Compra.objects.create(numero_factura='F-1', proveedor=proveedor)
+        ItemCompra.objects.create(compra=compra, producto=self.producto, cantidad=4, costo_unitario=Decimal('8.00'))
+
+        compra.estado = 'confirmada'
+        compra.save()
+        movimiento = self.movimiento_de(compra)
+        self.assertEqual((movimiento.tipo, movimiento.cantidad, movimiento.saldo_resultante), (MovimientoStock.Tipo.COMPRA, 4, 14))
+
+        compra.estado = 'anulada'
+        compra.save()
+        movimiento = self.ultimo()
+        self.assertEqual((movimiento.tipo, movimiento.cantidad, movimiento.saldo_resultante), (MovimientoStock.Tipo.COMPRA_REVERSION, -4, 10))
+        self.assertEqual((movimiento.documento_tipo, movimiento.documento_id), ('compra', compra.pk))
+
+    def test_venta_directa(self):
+        cliente = Cliente.objects.create(
+            nombre='Ana', apellido='Pérez', correo='ana@example.com', telefono='3000000',
+            tipo_documento='CC', documento='1010', direccion='Calle 2', password='x',
+        )
+        venta = Venta.objects.create(cliente=cliente)
+        DetalleVenta.objects.create(venta=venta, producto=self.producto, precio_unitario_venta=Decimal('10.00'), cantidad=3)
+
+        venta.estado = 'Completada'
+        venta.save()
+        movimiento = self.movimiento_de(venta)
+        self.assertEqual((movimiento.tipo, movimiento.cantidad, movimiento.saldo_resultante), (MovimientoStock.Tipo.VENTA, -3, 7))
+
+        venta.estado = 'Anulada'
+        venta.save()
+        movimiento = self.ultimo()
+        self.assertEqual((movimiento.tipo, movimiento.cantidad, movimiento.saldo_resultante), (MovimientoStock.Tipo.VENTA_ANULACION, 3, 10))
+
+    def test_pedido(self):
+        pedido = Pedido.objects.create(total=Decimal('20.00'), nombre_receptor='Ana', telefono_receptor='3000000')
+        DetallePedido.objects.create(pedido=pedido, producto=self.producto, cantidad=2, precio_unitario=Decimal('10.00'))
+
+        pedido.descontar_stock()
+        movimiento = self.movimiento_de(pedido)
+        self.assertEqual((movimiento.tipo, movimiento.cantidad, movimiento.saldo_resultante), (MovimientoStock.Tipo.PEDIDO, -2, 8))
+
+        pedido.restaurar_stock()
+        movimiento = self.ultimo()
+        self.assertEqual((movimiento.tipo, movimiento.cantidad, movimiento.saldo_resultante), (MovimientoStock.Tipo.PEDIDO_CANCELACION, 2, 10))
+        self.assertEqual(movimiento.documento_tipo, 'pedido')
+
+
+class ReservasTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.cemento = crear_producto('Cemento', 5)
+        self.arena = crear_producto('Arena', 2)
+
+    def crear_pedido(self, *lineas, horas=1):
+        pedido = Pedido.objects.create(
+            total=Decimal('10.00'), nombre_receptor='Ana', telefono_receptor='3000000',
+            fecha_limite_pago=timezone.now() + timedelta(hours=horas),
+        )
+        for producto, cantidad in lineas:
+            DetallePedido.objects.create(pedido=pedido, producto=producto, cantidad=cantidad, precio_unitario=Decimal('10.00'))
+        return pedido
+
+    def reservar(self, pedido):
+        with self.captureOnCommitCallbacks(execute=True):
+            return reservar_stock_pedido(pedido)
+
+    def test_reserva_descuenta_del_disponible(self):
+        self.assertEqual(disponible([self.cemento.pk]), {self.cemento.pk: 5})
+        self.reservar(self.crear_pedido((self.cemento, 3)))
+        # La caché del disponible se invalidó al confirmar la reserva.
+        self.assertEqual(disponible([self.cemento.pk]), {self.cemento.pk: 2})
+        self.assertEqual(stock(self.cemento), 5)
+
+    def test_faltante_no_reserva_nada(self):
+        self.reservar(self.crear_pedido((self.cemento, 4)))
+        pedido = self.crear_pedido((self.cemento, 2), (self.arena, 3))
+
+        with self.assertRaises(StockInsuficienteError) as error:
+            self.reservar(pedido)
+
+        faltantes = sorted(error.exception.faltantes, key=lambda f: f['producto_id'])
+        self.assertEqual(faltantes, [
+            {'producto_id': self.cemento.pk, 'nombre': 'Cemento', 'disponible': 1, 'requerido': 2},
+            {'producto_id': self.arena.pk, 'nombre': 'Arena', 'disponible': 2, 'requerido': 3},
+        ])
+        self.assertFalse(ReservaStock.objects.filter(pedido=pedido).exists())
+
+    def test_reserva_vencida_deja_de_contar(self):
+        pedido = self.crear_pedido((self.cemento, 3))
+        self.reservar(pedido)
+        ReservaStock.objects.filter(pedido=pedido).update(expira_en=timezone.now() - timedelta(seconds=1))
+        cache.clear()
+
+        self.assertEqual(disponible([self.cemento.pk]), {self.cemento.pk: 5})
+        # Otro pedido puede tomar esas unidades.
+        self.reservar(self.crear_pedido((self.cemento, 5)))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(liberar_reservas_vencidas(), 1)
+        self.assertFalse(ReservaStock.objects.filter(pedido=pedido).exists())
+
+    def test_en_verificacion_extiende_la_reserva(self):
+        pedido = self.crear_pedido((self.cemento, 3))
+        self.reservar(pedido)
+
+        pedido.estado = 'en_verificacion'
+        pedido.save()
+
+        reserva = ReservaStock.objects.get(pedido=pedido)
+        self.assertGreater(reserva.expira_en, timezone.now() + timedelta(hours=HORAS_VERIFICACION - 1))
+
+    def test_no_revive_reservas_vencidas(self):
+        pedido = self.crear_pedido((self.cemento, 3))
+        self.reservar(pedido)
+        vencida = timezone.now() - timedelta(seconds=1)
+        ReservaStock.objects.filter(pedido=pedido).update(expira_en=vencida)
+
+        self.assertEqual(extender_reservas([pedido.pk]), 0)
+        self.assertEqual(ReservaStock.objects.get(pedido=pedido).expira_en, vencida)
+
+    def test_cancelar_libera_la_reserva(self):
+        pedido = self.crear_pedido((self.cemento, 3))
+        self.reservar(pedido)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            pedido.estado = 'cancelado'
+            pedido.save()
+
+        self.assertFalse(ReservaStock.objects.filter(pedido=pedido).exists())
+        self.assertEqual(disponible([self.cemento.pk]), {self.cemento.pk: 5})
+
+    def test_confirmar_respeta_reservas_de_otros_pedidos(self):
+        otro = self.crear_pedido((self.cemento, 3))
+        self.reservar(otro)
+        pedido = self.crear_pedido((self.cemento, 2))
+        self.reservar(pedido)
+
+        # La reserva propia se convierte en descuento; la del otro pedido se respeta.
+        pedido.descontar_stock()
+        self.assertEqual(stock(self.cemento), 3)
+        self.assertFalse(ReservaStock.objects.filter(pedido=pedido).exists())
+        self.assertTrue(ReservaStock.objects.filter(pedido=otro).exists())
+
+        # Una venta directa ya no puede usar las 3 unidades reservadas.
+        with self.assertRaises(StockInsuficienteError) as error:
+            descontar_stock([(self.cemento.pk, 1)], MovimientoStock.Tipo.VENTA, respetar_reservas=True)
+        self.assertEqual(error.exception.faltantes[0]['disponible'], 0)
+        # Sin respetar reservas (p. ej. una baja) sí se puede.
+        descontar_stock([(self.cemento.pk, 1)], MovimientoStock.Tipo.BAJA)
+        self.assertEqual(stock(self.cemento), 2)
@@ -1,8 +1,9 @@
 # backend/Stock/urls.py
 
 from django.urls import path
-from .views import BajaDeStockListView
+from .views import BajaDeStockListView, KardexProductoView
 
 urlpatterns = [
     path('bajas/', BajaDeStockListView.as_view(), name='bajas-stock-list-create'),
+    path('kardex/<int:producto_pk>/', KardexProductoView.as_view(), name='kardex-producto'),
 ]
\ No newline at end of file
@@ -1,11 +1,18 @@
 # backend/Stock/views.py
 
+from datetime import datetime
+
+from django.shortcuts import get_object_or_404
 from rest_framework import generics, permissions
-from .models import BajaDeStock
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination
+from .models import BajaDeStock, MovimientoStock
 from .serializers import (
     BajaDeStockReadSerializer,
     BajaDeStockCreateSerializer,
+    MovimientoStockSerializer,
 )
+from Productos.models import Producto
 from Roles_Permisos.permissions import HasPrivilege
 
 class BajaDeStockListView(generics.ListCreateAPIView):
@@ -20,4 +27,40 @@ class BajaDeStockListView(generics.ListCreateAPIView):
     def get_required_privilege(self, method):
         if method == 'GET': return 'stock_ver_bajas'
         if method == 'POST': return 'stock_registrar_baja'
-        return None
\ No newline at end of file
+        return None
+
+
+class KardexPagination(CursorPagination):
+    # Paginación por cursor (fecha, id): cada página es un rango del índice
+    # (producto, fecha, id), sin OFFSET ni COUNT sobre todo el historial.
+    ordering = ('fecha', 'id')
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+
+class KardexProductoView(generics.ListAPIView):
+    """
+    Movimientos de stock de un producto en orden cronológico, con el saldo después
+    de cada uno. Filtros opcionales: desde y hasta (YYYY-MM-DD).
+    """
+    serializer_class = MovimientoStockSerializer
+    pagination_class = KardexPagination
+    permission_classes = [permissions.IsAuthenticated, HasPrivilege]
+    required_privilege = 'stock_ver'
+
+    def get_queryset(self):
+        producto = get_object_or_404(Producto.objects.only('id'), pk=self.kwargs['producto_pk'])
+        queryset = MovimientoStock.objects.filter(producto=producto)
+        try:
+            desde = self.request.query_params.get('desde')
+            hasta = self.request.query_params.get('hasta')
+            if desde:
+                desde = datetime.strptime(desde, '%Y-%m-%d').date()
+                queryset = queryset.filter(periodo__gte=desde.replace(day=1), fecha__date__gte=desde)
+            if hasta:
+                hasta = datetime.strptime(hasta, '%Y-%m-%d').date()
+                queryset = queryset.filter(periodo__lte=hasta.replace(day=1), fecha__date__lte=hasta)
+        except ValueError:
+            raise ValidationError("Las fechas deben tener el formato YYYY-MM-DD.")
+        return queryset
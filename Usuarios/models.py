@@ -61,11 +61,9 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
         return self.email
     
     def has_privilege(self, privilege_code_name):
-        if self.is_superuser:
-            return True
-        if not self.rol:
-            return False
-        return self.rol.privilegios.filter(codigo=privilege_code_name).exists()
+        # Misma regla que HasPrivilege, usando los privilegios cacheados del rol.
+        from Roles_Permisos.privilegios import usuario_tiene_privilegio
+        return usuario_tiene_privilegio(self, privilege_code_name)
 
     class Meta:
         verbose_name = "Usuario del Sistema"
@@ -4,7 +4,7 @@ from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password as django_validate_password
 from django.core.exceptions import ValidationError as DjangoValidationError
 from Roles_Permisos.models import Rol
-from django.core.mail import send_mail
+from Notificaciones.correo import encolar_correo
 from django.conf import settings
 import secrets
 
@@ -97,7 +97,7 @@ class UsuarioCreateSerializer(serializers.ModelSerializer):
             f"Saludos cordiales,\nEl equipo del Sistema"
         )
         try:
-            send_mail(subject, message, settings.DEFAULT_FROM_EMAIL, [user.email], fail_silently=False)
+            encolar_correo(subject, message, [user.email])
         except Exception as e:
             print(f"ALERTA: Email de bienvenida no pudo ser enviado a {user.email}. Error: {e}")
 
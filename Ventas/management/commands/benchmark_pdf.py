@@ -0,0 +1,40 @@
+# Ventas/management/commands/benchmark_pdf.py
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from backend_api.pdf import TIPOS_DOCUMENTO, obtener_documento
+
+
+class Command(BaseCommand):
+    help = 'Mide cuántos PDF por segundo se generan de cada tipo de documento (solo el render, sin consultas).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tipo', action='append', choices=sorted(TIPOS_DOCUMENTO), help='Tipo a medir (se puede repetir). Por defecto, todos.')
+        parser.add_argument('--id', type=int, help='Documento a usar. Por defecto, el más reciente de cada tipo.')
+        parser.add_argument('--repeticiones', type=int, default=20, help='Renders por tipo de documento.')
+
+    def handle(self, *args, **options):
+        tipos = options['tipo'] or sorted(TIPOS_DOCUMENTO)
+        if options['id'] and len(tipos) > 1:
+            raise CommandError('--id solo tiene sentido con un único --tipo.')
+        repeticiones = max(options['repeticiones'], 1)
+
+        for tipo in tipos:
+            documento = obtener_documento(tipo)
+            pk = options['id'] or documento.modelo.objects.order_by('-pk').values_list('pk', flat=True).first()
+            if pk is None:
+                self.stdout.write(self.style.WARNING(f'{tipo}: no hay documentos para medir.'))
+                continue
+            obj = documento.obtener(pk)
+            tamano = len(documento.render(obj))  # Primer render fuera de la medición (calienta fuentes y cachés).
+
+            inicio = time.perf_counter()
+            for _ in range(repeticiones):
+                documento.render(obj)
+            total = time.perf_counter() - inicio
+
+            self.stdout.write(self.style.SUCCESS(
+                f'{tipo} #{pk}: {repeticiones / total:.1f} PDF/s, {total / repeticiones * 1000:.1f} ms por PDF, {tamano / 1024:.1f} KB.'
+            ))
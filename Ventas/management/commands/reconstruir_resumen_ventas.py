@@ -0,0 +1,27 @@
+# Ventas/management/commands/reconstruir_resumen_ventas.py
+
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from Ventas.resumen import reconstruir
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye el resumen diario de ventas que usan los dashboards (todo el historial o un rango de fechas).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--desde', help='Primer día a recalcular (YYYY-MM-DD). Por defecto, la primera venta o pedido.')
+        parser.add_argument('--hasta', help='Último día a recalcular (YYYY-MM-DD). Por defecto, hoy.')
+
+    def _fecha(self, valor):
+        if not valor:
+            return None
+        try:
+            return datetime.strptime(valor, '%Y-%m-%d').date()
+        except ValueError:
+            raise CommandError('Las fechas deben tener el formato YYYY-MM-DD.')
+
+    def handle(self, *args, **options):
+        dias = reconstruir(desde=self._fecha(options['desde']), hasta=self._fecha(options['hasta']))
+        self.stdout.write(self.style.SUCCESS(f'Resumen de ventas recalculado: {dias} días procesados.'))
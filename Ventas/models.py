@@ -1,16 +1,18 @@
 # backend_api/Ventas/models.py
 
 from django.db import models, transaction
+from django.db.models import OuterRef, Subquery
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 from decimal import Decimal
 from datetime import timedelta
 import logging
+from backend_api.mixins import RastreoEstadoMixin
 
 
 logger = logging.getLogger(__name__)
 
-class Venta(models.Model):
+class Venta(RastreoEstadoMixin, models.Model):
     ESTADO_CHOICES = [('Pendiente', 'Pendiente'), ('Completada', 'Completada'), ('Anulada', 'Anulada')]
     METODO_PAGO_ADICIONAL_CHOICES = [('Efectivo', 'Efectivo'), ('Transferencia', 'Transferencia')]
     METODO_ENTREGA_CHOICES = [('domicilio', 'Domicilio'), ('tienda', 'Reclama en Tienda')]
@@ -54,6 +56,8 @@ class Venta(models.Model):
         # Importaciones locales al método
         from Productos.models import Producto
         from Creditos.models import Credito
+        from Stock.models import MovimientoStock
+        from Stock.servicios import descontar_stock
         with transaction.atomic():
             if self.credito_usado and self.monto_cubierto_con_credito > 0:
                 credito = Credito.objects.select_for_update().get(id=self.credito_usado.id)
@@ -64,32 +68,27 @@ class Venta(models.Model):
                 credito.save(update_fields=['capital_utilizado'])
                 logger.info(f"   CRÉDITO: Actualizado cupo utilizado para crédito ID {credito.id}")
 
-            for detalle in self.detalles.all():
-                producto = Producto.objects.select_for_update().get(id=detalle.producto.id)
-                if not self.pedido_origen:
-                    if producto.stock_actual < detalle.cantidad:
-                        raise ValidationError(f"Stock insuficiente para '{producto.nombre}' al confirmar la venta directa.")
-                    producto.stock_actual -= detalle.cantidad
-                    producto.save(update_fields=['stock_actual'])
-                    logger.info(f"   STOCK: Descontado {detalle.cantidad} de '{producto.nombre}' (Venta Directa).")
-                else:
-                    logger.info(f"   STOCK: Verificado el descuento de stock para '{producto.nombre}' (Venta desde Pedido).")
-                
-                detalle.costo_unitario_historico = producto.ultimo_costo_compra
-                detalle.save(update_fields=['costo_unitario_historico'])
+            if not self.pedido_origen:
+                descontar_stock(self.detalles.values_list('producto_id', 'cantidad'), MovimientoStock.Tipo.VENTA, self, respetar_reservas=True)
+                logger.info(f"   STOCK: Descontado el stock de la venta directa.")
+            else:
+                logger.info(f"   STOCK: El descuento de stock se hizo al confirmar el pedido de origen.")
+
+            # Costo histórico de cada línea en un solo UPDATE.
+            self.detalles.update(costo_unitario_historico=Subquery(
+                Producto.objects.filter(pk=OuterRef('producto_id')).values('ultimo_costo_compra')[:1]
+            ))
 
     def _revertir_anulacion(self):
         logger.info(f"VENTA ID {self.id}: Reversión por anulación...")
         # Importaciones locales al método
-        from Productos.models import Producto
         from Creditos.models import Credito
+        from Stock.models import MovimientoStock
+        from Stock.servicios import reponer_stock
         with transaction.atomic():
             if not self.pedido_origen:
-                for detalle in self.detalles.all():
-                    producto = Producto.objects.select_for_update().get(id=detalle.producto.id)
-                    producto.stock_actual += detalle.cantidad
-                    producto.save(update_fields=['stock_actual'])
-                    logger.info(f"   STOCK: Devuelto {detalle.cantidad} a '{producto.nombre}'. Nuevo stock: {producto.stock_actual}")
+                reponer_stock(self.detalles.values_list('producto_id', 'cantidad'), MovimientoStock.Tipo.VENTA_ANULACION, self)
+                logger.info(f"   STOCK: Devuelto el stock de la venta.")
             else:
                 logger.info(f"   La venta proviene de un pedido. El stock se restauró en el modelo Pedido.")
             
@@ -102,17 +101,16 @@ class Venta(models.Model):
     
     def save(self, *args, **kwargs):
         is_new = self._state.adding
-        estado_original = None
-        if not is_new:
-            try:
-                estado_original = Venta.objects.get(pk=self.pk).estado
-            except Venta.DoesNotExist:
-                pass
+        estado_original = self.estado_original
         super().save(*args, **kwargs)
+        self.sincronizar_valores_originales(kwargs.get('update_fields'))
         if self.estado == 'Completada' and (is_new or estado_original != 'Completada'):
             self._procesar_completado()
         elif self.estado == 'Anulada' and estado_original == 'Completada':
             self._revertir_anulacion()
+        if self.estado == 'Completada' or estado_original == 'Completada':
+            from .resumen import programar_recalculo
+            programar_recalculo(self._meta.get_field('fecha').to_python(self.fecha))
 
     class Meta:
         verbose_name = "Venta"
@@ -151,3 +149,37 @@ class DetalleVenta(models.Model):
     class Meta:
         verbose_name = "Detalle de Venta"
         verbose_name_plural = "Detalles de Venta"
+
+
+# --- RESUMEN DIARIO PARA LOS DASHBOARDS ---
+# Tablas derivadas: se recalculan por día desde Venta/DetalleVenta/DetallePedido
+# (ver Ventas/resumen.py), nunca se editan a mano.
+
+class VentaDiaria(models.Model):
+    fecha = models.DateField(unique=True)
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    cantidad_ventas = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.fecha}: ${self.total:,.0f} ({self.cantidad_ventas} ventas)"
+
+    class Meta:
+        verbose_name = "Resumen Diario de Ventas"
+        verbose_name_plural = "Resúmenes Diarios de Ventas"
+        ordering = ['-fecha']
+
+class ProductoVentaDiaria(models.Model):
+    fecha = models.DateField()
+    producto = models.ForeignKey('Productos.Producto', on_delete=models.CASCADE, related_name='resumen_ventas_diarias')
+    # Se guardan por separado las unidades de ventas completadas y las de pedidos
+    # confirmados/en camino/entregados, que es como el dashboard las ha sumado siempre.
+    unidades_ventas = models.PositiveIntegerField(default=0)
+    unidades_pedidos = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.fecha} - Producto {self.producto_id}: {self.unidades_ventas + self.unidades_pedidos} unidades"
+
+    class Meta:
+        verbose_name = "Resumen Diario por Producto"
+        verbose_name_plural = "Resúmenes Diarios por Producto"
+        constraints = [models.UniqueConstraint(fields=['fecha', 'producto'], name='unique_producto_venta_diaria')]
@@ -0,0 +1,112 @@
+# Ventas/pdf.py
+"""Comprobante de venta en PDF (con el detalle de la devolución si la tiene)."""
+
+from reportlab.lib.units import inch
+from reportlab.platypus import Spacer
+
+from backend_api.pdf import (
+    DocumentoPDF, TABLA_DATOS, datos_cliente, TABLA_ITEMS, TABLA_ITEMS_SECUNDARIA, moneda, p, tabla,
+)
+from .models import Venta
+
+
+class DocumentoVenta(DocumentoPDF):
+    tipo = 'venta'
+    modelo = Venta
+    margenes = (inch / 2, inch / 2, inch * 1.2, inch / 2 + 0.2 * inch)
+
+    def nombre_archivo(self, venta):
+        return f'Factura_Venta_{venta.id}.pdf'
+
+    def obtener(self, pk):
+        return Venta.objects.select_related('cliente', 'credito_usado', 'devolucion').prefetch_related(
+            'detalles', 'devolucion__items_devueltos__producto', 'devolucion__items_cambio__producto',
+        ).get(pk=pk)
+
+    def filas_version(self, venta):
+        filas = [venta, datos_cliente(venta.cliente), *venta.detalles.all()]
+        devolucion = getattr(venta, 'devolucion', None)
+        if devolucion is not None:
+            filas.append(devolucion)
+            for item in [*devolucion.items_devueltos.all(), *devolucion.items_cambio.all()]:
+                filas += [item, item.producto.nombre]
+        return filas
+
+    def contenido(self, venta):
+        from .serializers import VentaReadSerializer
+
+        cliente = venta.cliente
+        story = [
+            tabla([
+                [p(f"<b>CLIENTE:</b> {cliente.nombre} {cliente.apellido or ''}".strip()), p(f"<b>COMPROBANTE DE VENTA N°: {venta.id}</b>", 'chico_derecha')],
+                [p(f"{cliente.get_tipo_documento_display()} {cliente.documento}"), p(f"<b>FECHA VENTA:</b> {venta.fecha.strftime('%d/%m/%Y')}", 'chico_derecha')],
+            ], [4 * inch, 3.5 * inch], TABLA_DATOS),
+            Spacer(1, 0.25 * inch),
+        ]
+
+        items = [[p("<b>Cant.</b>", 'chico_negrita'), p("<b>Descripción</b>", 'chico_negrita'), p("<b>P. Unit.</b>", 'chico_negrita_derecha'), p("<b>Total</b>", 'chico_negrita_derecha')]]
+        for item in venta.detalles.all():
+            items.append([
+                p(item.cantidad, 'chico_centro'), p(item.producto_nombre_historico),
+                p(moneda(item.precio_unitario_venta), 'chico_derecha'), p(moneda(item.subtotal), 'chico_derecha'),
+            ])
+        story.append(tabla(items, [0.6 * inch, 4.4 * inch, 1.25 * inch, 1.25 * inch], TABLA_ITEMS))
+
+        story += [
+            tabla([
+                ["", p("Subtotal:", 'chico_derecha'), p(moneda(venta.subtotal), 'chico_derecha')],
+                ["", p("IVA (19%):", 'chico_derecha'), p(moneda(venta.iva), 'chico_derecha')],
+                ["", p("<b>TOTAL VENTA:</b>", 'chico_negrita_derecha'), p(f"<b>{moneda(venta.total)}</b>", 'chico_negrita_derecha')],
+            ], [4.75 * inch, 1.5 * inch, 1.25 * inch]),
+            Spacer(1, 0.2 * inch),
+            p(f"<b>Forma de Pago:</b> {VentaReadSerializer().get_resumen_pago(venta)}"),
+        ]
+
+        devolucion = getattr(venta, 'devolucion', None)
+        if devolucion is not None:
+            story += self._devolucion(devolucion)
+        return story
+
+    def _devolucion(self, devolucion):
+        story = [
+            Spacer(1, 0.3 * inch),
+            p("DETALLE DE LA DEVOLUCIÓN", 'subtitulo_centro'),
+            tabla([
+                [p(f"<b>Fecha:</b> {devolucion.fecha_devolucion.strftime('%d/%m/%Y')}"), p(f"<b>Reembolso:</b> {devolucion.get_tipo_reembolso_display()}")],
+                [p(f"<b>Motivo General:</b> {devolucion.motivo_general or 'No especificado'}"), ""],
+            ], [3.75 * inch, 3.75 * inch]),
+            Spacer(1, 0.1 * inch),
+        ]
+
+        devueltos = list(devolucion.items_devueltos.all())
+        if devueltos:
+            filas = [[p("<b>Cant.</b>", 'chico_negrita'), p("<b>Producto</b>", 'chico_negrita'), p("<b>Motivo</b>", 'chico_negrita'), p("<b>Subtotal</b>", 'chico_negrita_derecha')]]
+            filas += [
+                [p(item.cantidad, 'chico_centro'), p(item.producto.nombre), p(item.get_motivo_display()), p(moneda(item.subtotal), 'chico_derecha')]
+                for item in devueltos
+            ]
+            story += [
+                p("<b>Productos Devueltos</b>", 'chico_negrita'),
+                tabla(filas, [0.6 * inch, 4.15 * inch, 1.5 * inch, 1.25 * inch], TABLA_ITEMS_SECUNDARIA),
+                Spacer(1, 0.2 * inch),
+            ]
+
+        cambio = list(devolucion.items_cambio.all())
+        if cambio:
+            filas = [[p("<b>Cant.</b>", 'chico_negrita'), p("<b>Producto</b>", 'chico_negrita'), p("<b>P. Unit.</b>", 'chico_negrita_derecha'), p("<b>Subtotal</b>", 'chico_negrita_derecha')]]
+            filas += [
+                [p(item.cantidad, 'chico_centro'), p(item.producto.nombre), p(moneda(item.precio_unitario_actual), 'chico_derecha'), p(moneda(item.subtotal), 'chico_derecha')]
+                for item in cambio
+            ]
+            story += [
+                p("<b>Productos de Cambio Entregados</b>", 'chico_negrita'),
+                tabla(filas, [0.6 * inch, 4.65 * inch, 1 * inch, 1.25 * inch], TABLA_ITEMS_SECUNDARIA),
+                Spacer(1, 0.2 * inch),
+            ]
+
+        story.append(tabla([
+            ["", p("Total Devolución:", 'chico_derecha'), p(moneda(devolucion.total_productos_devueltos), 'chico_derecha')],
+            ["", p("Total Cambio:", 'chico_derecha'), p(moneda(devolucion.total_productos_cambio), 'chico_derecha')],
+            ["", p("<b>BALANCE DEVOLUCIÓN:</b>", 'chico_negrita_derecha'), p(f"<b>{moneda(devolucion.balance_final)}</b>", 'chico_negrita_derecha')],
+        ], [4.25 * inch, 2 * inch, 1.25 * inch]))
+        return story
@@ -0,0 +1,49 @@
+# backend_api/Ventas/ranking.py
+"""
+Ranking de más y menos vendidos en una sola consulta.
+
+Se agrupa el resumen diario (ProductoVentaDiaria, que ya une ventas y pedidos) por
+producto, categoría o marca, se numeran los grupos en ambos sentidos con
+ROW_NUMBER() y solo vuelven a la aplicación las filas que quedan entre las
+primeras `limite` de alguno de los dos órdenes.
+"""
+
+from django.db.models import F, Q, Sum, Window
+from django.db.models.functions import RowNumber
+
+from .models import ProductoVentaDiaria
+
+
+AGRUPACIONES = {
+    'producto': ('producto_id', 'producto__nombre'),
+    'categoria': ('producto__categoria_id', 'producto__categoria__nombre'),
+    'marca': ('producto__marca_id', 'producto__marca__nombre'),
+}
+
+
+def ranking_ventas(desde, hasta, agrupar_por='producto', limite=5):
+    """
+    Devuelve (mas_vendidos, menos_vendidos): listas de {'id', 'nombre', 'unidades_vendidas'}.
+    A igual cantidad de unidades se ordena por nombre.
+    """
+    campo_id, campo_nombre = AGRUPACIONES[agrupar_por]
+    filas = (
+        ProductoVentaDiaria.objects
+        .filter(fecha__range=[desde, hasta], **{f'{campo_id}__isnull': False})
+        .values(campo_id, campo_nombre)
+        .annotate(unidades=Sum('unidades_ventas') + Sum('unidades_pedidos'))
+        .annotate(
+            posicion_mas=Window(RowNumber(), order_by=[F('unidades').desc(), F(campo_nombre).asc(), F(campo_id).asc()]),
+            posicion_menos=Window(RowNumber(), order_by=[F('unidades').asc(), F(campo_nombre).asc(), F(campo_id).asc()]),
+        )
+        .filter(Q(posicion_mas__lte=limite) | Q(posicion_menos__lte=limite))
+    )
+
+    mas_vendidos, menos_vendidos = [], []
+    for fila in filas:
+        item = {'id': fila[campo_id], 'nombre': fila[campo_nombre], 'unidades_vendidas': fila['unidades']}
+        if fila['posicion_mas'] <= limite:
+            mas_vendidos.append((fila['posicion_mas'], item))
+        if fila['posicion_menos'] <= limite:
+            menos_vendidos.append((fila['posicion_menos'], item))
+    return [item for _, item in sorted(mas_vendidos, key=lambda p: p[0])], [item for _, item in sorted(menos_vendidos, key=lambda p: p[0])]
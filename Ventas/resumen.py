@@ -0,0 +1,149 @@
+# backend_api/Ventas/resumen.py
+"""
+Resumen diario de ventas para los dashboards.
+
+VentaDiaria guarda el total y la cantidad de ventas completadas de cada día y
+ProductoVentaDiaria las unidades por producto y día. Cuando una venta se completa
+o se anula, o un pedido entra o sale de los estados confirmados, se recalcula solo
+el día afectado (al confirmar la transacción). Así los dashboards leen unas pocas
+filas por día en lugar de recorrer todo el historial de ventas.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, Min, Sum
+from django.db.models.functions import TruncDate, TruncDay, TruncMonth, TruncWeek
+from django.utils import timezone
+from decimal import Decimal
+
+from .models import Venta, DetalleVenta, VentaDiaria, ProductoVentaDiaria
+
+logger = logging.getLogger(__name__)
+
+# Estados en los que un pedido cuenta para el ranking de productos.
+ESTADOS_PEDIDO_CONTADOS = ('confirmado', 'en_camino', 'entregado')
+
+
+def _filtro(campo, fechas=None, desde=None, hasta=None):
+    if fechas is not None:
+        return {f'{campo}__in': fechas}
+    filtro = {}
+    if desde:
+        filtro[f'{campo}__gte'] = desde
+    if hasta:
+        filtro[f'{campo}__lte'] = hasta
+    return filtro
+
+
+@transaction.atomic
+def recalcular(fechas=None, desde=None, hasta=None):
+    """
+    Recalcula el resumen de los días indicados (una lista de fechas o un rango; sin
+    argumentos, todo el historial). Cada grupo de filas sale de una sola consulta
+    agrupada por día, así que el costo depende de las ventas de esos días.
+    """
+    from Pedidos.models import DetallePedido
+
+    totales = {
+        fila['fecha']: fila
+        for fila in Venta.objects.filter(estado='Completada', **_filtro('fecha', fechas, desde, hasta))
+        .values('fecha').annotate(total=Sum('total'), cantidad=Count('id'))
+    }
+
+    unidades = {}
+    for fila in (
+        DetalleVenta.objects.filter(venta__estado='Completada', **_filtro('venta__fecha', fechas, desde, hasta))
+        .values('venta__fecha', 'producto_id').annotate(unidades=Sum('cantidad'))
+    ):
+        unidades.setdefault((fila['venta__fecha'], fila['producto_id']), [0, 0])[0] += fila['unidades']
+    for fila in (
+        DetallePedido.objects.filter(pedido__estado__in=ESTADOS_PEDIDO_CONTADOS, producto__isnull=False)
+        .annotate(dia=TruncDate('pedido__fecha_creacion'))
+        .filter(**_filtro('dia', fechas, desde, hasta))
+        .values('dia', 'producto_id').annotate(unidades=Sum('cantidad'))
+    ):
+        unidades.setdefault((fila['dia'], fila['producto_id']), [0, 0])[1] += fila['unidades']
+
+    # Se borran las filas de los días recalculados que ya no tienen datos y se
+    # reescriben las demás con un upsert (otra transacción puede estar recalculando el mismo día).
+    VentaDiaria.objects.filter(**_filtro('fecha', fechas, desde, hasta)).exclude(fecha__in=list(totales)).delete()
+    VentaDiaria.objects.bulk_create(
+        [VentaDiaria(fecha=fecha, total=fila['total'], cantidad_ventas=fila['cantidad']) for fecha, fila in totales.items()],
+        update_conflicts=True, unique_fields=['fecha'], update_fields=['total', 'cantidad_ventas'],
+    )
+
+    existentes = ProductoVentaDiaria.objects.filter(**_filtro('fecha', fechas, desde, hasta)).values_list('id', 'fecha', 'producto_id')
+    sobrantes = [pk for pk, fecha, producto_id in existentes if (fecha, producto_id) not in unidades]
+    if sobrantes:
+        ProductoVentaDiaria.objects.filter(id__in=sobrantes).delete()
+    ProductoVentaDiaria.objects.bulk_create(
+        [
+            ProductoVentaDiaria(fecha=fecha, producto_id=producto_id, unidades_ventas=ventas, unidades_pedidos=pedidos)
+            for (fecha, producto_id), (ventas, pedidos) in unidades.items()
+        ],
+        update_conflicts=True, unique_fields=['fecha', 'producto'], update_fields=['unidades_ventas', 'unidades_pedidos'],
+        batch_size=1000,
+    )
+    return len(totales), len(unidades)
+
+
+def programar_recalculo(*fechas):
+    """Recalcula los días indicados cuando se confirme la transacción en curso."""
+    fechas = sorted({fecha for fecha in fechas if fecha})
+    if fechas:
+        # robust: un fallo al recalcular el resumen no debe romper la venta ya confirmada;
+        # se corrige con el comando reconstruir_resumen_ventas.
+        transaction.on_commit(lambda: recalcular(fechas=fechas), robust=True)
+
+
+def reconstruir(desde=None, hasta=None):
+    """Recalcula el resumen completo (o un rango) en bloques de un mes."""
+    from Pedidos.models import Pedido
+
+    if desde is None:
+        primeras = [
+            Venta.objects.aggregate(primera=Min('fecha'))['primera'],
+            Pedido.objects.aggregate(primera=Min('fecha_creacion'))['primera'],
+        ]
+        primeras = [p if not hasattr(p, 'hour') else timezone.localdate(p) for p in primeras if p]
+        if not primeras:
+            return 0
+        desde = min(primeras)
+    hasta = hasta or timezone.localdate()
+
+    dias = 0
+    inicio = desde
+    while inicio <= hasta:
+        fin = min(inicio + timedelta(days=30), hasta)
+        recalcular(desde=inicio, hasta=fin)
+        dias += (fin - inicio).days + 1
+        inicio = fin + timedelta(days=1)
+    logger.info(f"Resumen de ventas reconstruido del {desde} al {hasta}.")
+    return dias
+
+
+# --- Lecturas para los dashboards ---
+
+def total_ventas(desde, hasta):
+    return VentaDiaria.objects.filter(fecha__range=[desde, hasta]).aggregate(
+        total=Sum('total', default=Decimal('0.00'))
+    )['total']
+
+
+def tendencia_ventas(desde, hasta):
+    """Devuelve (periodos, formato): el total por día, semana o mes según el largo del rango."""
+    delta_dias = (hasta - desde).days
+    if delta_dias <= 45:
+        trunc_kind, date_format = TruncDay('fecha'), "%d %b"
+    elif delta_dias <= 365 * 2:
+        trunc_kind, date_format = TruncWeek('fecha'), "Sem %W, %y"
+    else:
+        trunc_kind, date_format = TruncMonth('fecha'), "%b %Y"
+    periodos = (
+        VentaDiaria.objects.filter(fecha__range=[desde, hasta])
+        .annotate(periodo=trunc_kind).values('periodo')
+        .annotate(total_ventas=Sum('total')).order_by('periodo')
+    )
+    return periodos, date_format
@@ -0,0 +1,62 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from Clientes.models import Cliente
+from Productos.models import CategoriaProducto, Marca, Producto
+
+from .models import DetalleVenta, Venta
+
+
+def crear_cliente(documento):
+    return Cliente.objects.create(
+        nombre='Ana', apellido='Pérez', correo=f'{documento}@example.com', telefono='3000000',
+        tipo_documento='CC', documento=documento, direccion='Calle 2', password='x',
+    )
+
+
+# Con el modo estricto una vista que se pasa de su presupuesto_consultas falla con
+# PresupuestoConsultasExcedido. Hay más filas que presupuesto: un N+1 lo excede seguro.
+FILAS = 11
+
+@override_settings(PRESUPUESTO_CONSULTAS_ESTRICTO=True)
+class PresupuestoConsultasTests(TestCase):
+
+    def setUp(self):
+        categoria = CategoriaProducto.objects.create(nombre='Obra gris', descripcion='')
+        marca = Marca.objects.create(nombre='Argos')
+        productos = [
+            Producto.objects.create(
+                nombre=f'Producto {i}', categoria=categoria, marca=marca, descripcion='',
+                precio_venta=Decimal('10.00'), stock_actual=100,
+            )
+            for i in range(3)
+        ]
+        self.cliente = crear_cliente('1010')
+        otro = crear_cliente('2020')
+        for i in range(FILAS + 1):
+            venta = Venta.objects.create(cliente=self.cliente if i else otro)
+            for producto in productos:
+                DetalleVenta.objects.create(venta=venta, producto=producto, precio_unitario_venta=Decimal('10.00'), cantidad=2)
+            venta.estado = 'Completada'
+            venta.save()
+        self.venta = venta
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create_superuser('admin@example.com', 'clave-segura'))
+
+    def test_listado(self):
+        response = self.client.get('/api/ventas/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), FILAS + 1)
+
+    def test_detalle(self):
+        response = self.client.get(f'/api/ventas/{self.venta.pk}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['detalles']), 3)
+
+    def test_completadas_por_cliente(self):
+        response = self.client.get(f'/api/ventas/cliente/{self.cliente.pk}/completadas_con_items/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), FILAS)
@@ -6,12 +6,14 @@ from .views import (
     VentaRetrieveUpdateDestroyView,
     VentasCompletadasPorClienteView,
     GenerarVentaPDFView,
-    MobileDashboardView
+    MobileDashboardView,
+    RankingVentasDashboardView
 )
 
 urlpatterns = [
     # --- RUTA PARA EL DASHBOARD ---
     path('resumen-general-dashboard/', ResumenGeneralDashboardView.as_view(), name='resumen-general-dashboard'),
+    path('ranking-dashboard/', RankingVentasDashboardView.as_view(), name='ranking-ventas-dashboard'),
     
     path('admin/dashboard/mobile/', MobileDashboardView.as_view(), name='mobile-dashboard'),
     # --- RUTAS PARA EL CRUD DE VENTAS ---
@@ -14,22 +14,15 @@ from django.utils import timezone
 from decimal import Decimal
 import logging
 from datetime import datetime, timedelta
-import io
 from datetime import datetime, timedelta, date
 from rest_framework.permissions import IsAdminUser
 
-# Imports de ReportLab para PDF
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.units import inch
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import Paragraph, Table, TableStyle, Spacer, SimpleDocTemplate
-from reportlab.lib import colors
-from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_RIGHT
-
 from Clientes.models import Cliente
 from Creditos.models import Credito
 from Productos.models import Producto
 from .models import Venta, DetalleVenta
+from . import resumen
+from .ranking import AGRUPACIONES, ranking_ventas
 from Pedidos.models import Pedido, DetallePedido
 
 from .serializers import (
@@ -38,14 +31,19 @@ from .serializers import (
 )
 from Productos.serializers import ProductoDashboardStockSerializer
 from Roles_Permisos.permissions import HasPrivilege
+from authentication.jwt_auth import ClaimsJWTAuthentication
 from .renderers import BinaryPDFRenderer 
+from .pdf import DocumentoVenta
+from backend_api.cache_pdf import respuesta_pdf
 
 from django.db.models import F, ExpressionWrapper, fields
+from backend_api.replicas import LecturaReplicaMixin
 
 logger = logging.getLogger(__name__)
 
 # --- VISTA PARA EL DASHBOARD ---
-class ResumenGeneralDashboardView(APIView):
+class ResumenGeneralDashboardView(LecturaReplicaMixin, APIView):
+    authentication_classes = [ClaimsJWTAuthentication]
     permission_classes = [permissions.IsAuthenticated, HasPrivilege]
     required_privilege = "dashboard_ver"
 
@@ -63,10 +61,9 @@ class ResumenGeneralDashboardView(APIView):
         
         periodo_filtrado = bool(fecha_inicio_str and fecha_fin_str)
 
-        # a) Datos de Ventas (Se filtra por ventas y pedidos confirmados)
-        ventas_base = Venta.objects.all()
-        ventas_hoy_total = ventas_base.filter(fecha=hoy, estado='Completada').aggregate(total=Sum('total', default=Decimal('0.00')))['total']
-        ventas_periodo_total = ventas_base.filter(fecha__range=[fecha_inicio, fecha_fin], estado='Completada').aggregate(total=Sum('total', default=Decimal('0.00')))['total']
+        # a) Datos de Ventas (desde el resumen diario, ver Ventas/resumen.py)
+        ventas_hoy_total = resumen.total_ventas(hoy, hoy)
+        ventas_periodo_total = resumen.total_ventas(fecha_inicio, fecha_fin)
         
         # b) Datos de Créditos
         creditos_activos_qs = Credito.objects.filter(estado='Activo')
@@ -86,43 +83,12 @@ class ResumenGeneralDashboardView(APIView):
         productos_para_reponer_qs = Producto.objects.filter(activo=True, stock_actual__lte=F('stock_minimo')).order_by('stock_actual')[:10]
         
         # d) Ranking de Productos (Ventas + Pedidos)
-        detalles_ventas = DetalleVenta.objects.filter(
-            venta__fecha__range=[fecha_inicio, fecha_fin], 
-            venta__estado='Completada'
-        ).values('producto_id', 'producto__nombre').annotate(unidades=Sum('cantidad'))
-
-        detalles_pedidos = DetallePedido.objects.filter(
-            pedido__fecha_creacion__date__range=[fecha_inicio, fecha_fin],
-            pedido__estado__in=['confirmado', 'en_camino', 'entregado']
-        ).values('producto_id', 'producto__nombre').annotate(unidades=Sum('cantidad'))
-
-        unidades_combinadas = defaultdict(int)
-        nombres_productos = {}
-        for item in list(detalles_ventas) + list(detalles_pedidos):
-            if item['producto_id']:
-                unidades_combinadas[item['producto_id']] += item['unidades']
-                nombres_productos[item['producto_id']] = item['producto__nombre']
-        
-        ranking_productos = [
-            {'producto__nombre': nombres_productos[pid], 'unidades_vendidas': unidades}
-            for pid, unidades in unidades_combinadas.items()
-        ]
-        
-        ranking_ordenado = sorted(ranking_productos, key=lambda x: x['unidades_vendidas'], reverse=True)
-        
-        productos_mas_vendidos = ranking_ordenado[:5]
-        productos_menos_vendidos = sorted(ranking_productos, key=lambda x: x['unidades_vendidas'])[:5]
+        mas_vendidos, menos_vendidos = ranking_ventas(fecha_inicio, fecha_fin)
+        productos_mas_vendidos = [{'producto__nombre': p['nombre'], 'unidades_vendidas': p['unidades_vendidas']} for p in mas_vendidos]
+        productos_menos_vendidos = [{'producto__nombre': p['nombre'], 'unidades_vendidas': p['unidades_vendidas']} for p in menos_vendidos]
 
         # e) Tendencia de Ventas
-        delta_dias = (fecha_fin - fecha_inicio).days
-        if delta_dias <= 45:
-            trunc_kind, date_format = TruncDay('fecha'), "%d %b"
-        elif delta_dias <= 365 * 2:
-            trunc_kind, date_format = TruncWeek('fecha'), "Sem %W, %y"
-        else:
-            trunc_kind, date_format = TruncMonth('fecha'), "%b %Y"
-        
-        tendencia_ventas_qs = ventas_base.filter(fecha__range=[fecha_inicio, fecha_fin], estado='Completada').annotate(periodo=trunc_kind).values('periodo').annotate(total_ventas=Sum('total')).order_by('periodo')
+        tendencia_ventas_qs, date_format = resumen.tendencia_ventas(fecha_inicio, fecha_fin)
         tendencia_ventas = [{'name': item['periodo'].strftime(date_format), 'ventas': item['total_ventas'] or 0} for item in tendencia_ventas_qs]
 
         # Ensamblaje de la Respuesta
@@ -142,11 +108,45 @@ class ResumenGeneralDashboardView(APIView):
         }
         return Response(data)
 
+class RankingVentasDashboardView(LecturaReplicaMixin, APIView):
+    """
+    Más y menos vendidos agrupados por producto, categoría o marca.
+    Parámetros: agrupar_por (producto|categoria|marca), fecha_inicio, fecha_fin y limite.
+    """
+    authentication_classes = [ClaimsJWTAuthentication]
+    permission_classes = [permissions.IsAuthenticated, HasPrivilege]
+    required_privilege = "dashboard_ver"
+
+    def get(self, request, *args, **kwargs):
+        hoy = timezone.now().date()
+        agrupar_por = request.query_params.get('agrupar_por', 'producto')
+        if agrupar_por not in AGRUPACIONES:
+            raise ValidationError({'agrupar_por': f"Debe ser uno de: {', '.join(AGRUPACIONES)}."})
+        try:
+            fecha_fin = datetime.strptime(request.query_params['fecha_fin'], '%Y-%m-%d').date() if request.query_params.get('fecha_fin') else hoy
+            fecha_inicio = datetime.strptime(request.query_params['fecha_inicio'], '%Y-%m-%d').date() if request.query_params.get('fecha_inicio') else fecha_fin - timedelta(days=29)
+        except ValueError:
+            raise ValidationError("Las fechas deben tener el formato YYYY-MM-DD.")
+        try:
+            limite = min(max(int(request.query_params.get('limite', 5)), 1), 50)
+        except ValueError:
+            limite = 5
+
+        mas_vendidos, menos_vendidos = ranking_ventas(fecha_inicio, fecha_fin, agrupar_por=agrupar_por, limite=limite)
+        return Response({
+            'agrupar_por': agrupar_por,
+            'mas_vendidos': mas_vendidos,
+            'menos_vendidos': menos_vendidos,
+        })
+
 # --- VISTAS DEL MÓDULO DE VENTAS ---
 
 class VentaListCreateView(generics.ListCreateAPIView):
-    queryset = Venta.objects.select_related('cliente', 'devolucion').prefetch_related('detalles__producto').all().order_by('-id')
+    queryset = Venta.objects.select_related('cliente', 'devolucion').prefetch_related(
+        'detalles__producto', 'devolucion__items_devueltos__producto', 'devolucion__items_cambio__producto',
+    ).all().order_by('-id')
     permission_classes = [permissions.IsAuthenticated, HasPrivilege]
+    presupuesto_consultas = {'GET': 10}
 
     def get_serializer_class(self):
         if self.request.method == 'POST':
@@ -176,6 +176,7 @@ class VentaRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
 ).all()
     
     permission_classes = [permissions.IsAuthenticated, HasPrivilege]
+    presupuesto_consultas = {'GET': 10}
 
     def get_serializer_class(self):
         if self.request.method in ['PUT', 'PATCH']:
@@ -214,19 +215,21 @@ class VentasCompletadasPorClienteView(generics.ListAPIView):
     serializer_class = VentaReadSerializer
     permission_classes = [permissions.IsAuthenticated, HasPrivilege]
     required_privilege = "ventas_ver" 
+    presupuesto_consultas = 10
 
     def get_queryset(self):
         cliente_pk = self.kwargs.get('cliente_pk')
         if not cliente_pk: return Venta.objects.none()
         cliente = get_object_or_404(Cliente, pk=cliente_pk)
-        return Venta.objects.filter(cliente=cliente, estado='Completada').order_by('-fecha', '-id')
+        # Mismo queryset que el detalle: el serializer incluye los detalles y la devolución de cada venta.
+        return VentaRetrieveUpdateDestroyView.queryset.filter(cliente=cliente, estado='Completada').order_by('-fecha', '-id')
 
 class VentaNoCompletadaError(APIException):
     status_code = status.HTTP_400_BAD_REQUEST
     default_detail = "Solo se pueden generar PDFs de ventas en estado 'Completada'."
     default_code = 'venta_no_completada'
 
-class GenerarVentaPDFView(APIView):
+class GenerarVentaPDFView(LecturaReplicaMixin, APIView):
     permission_classes = [permissions.IsAuthenticated, HasPrivilege]
     required_privilege = "ventas_ver"
     renderer_classes = [BinaryPDFRenderer, JSONRenderer]
@@ -239,180 +242,16 @@ class GenerarVentaPDFView(APIView):
         if venta.estado != 'Completada' and not tiene_devolucion:
             raise VentaNoCompletadaError("Solo se pueden generar PDFs de ventas completadas o con devolución.")
 
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=letter,
-                                rightMargin=inch/2, leftMargin=inch/2,
-                                topMargin=inch*1.5, bottomMargin=inch/2)
-        story = []
-        styles = getSampleStyleSheet()
-
-        # --- Estilos personalizados para el PDF ---
-        style_normal = ParagraphStyle('Normal', parent=styles['Normal'], fontSize=9, leading=11)
-        style_normal_right = ParagraphStyle(name='NormalRight', parent=style_normal, alignment=TA_RIGHT)
-        style_normal_center = ParagraphStyle(name='NormalCenter', parent=style_normal, alignment=TA_CENTER)
-        style_bold = ParagraphStyle(name='BoldText', parent=style_normal, fontName='Helvetica-Bold')
-        style_bold_right = ParagraphStyle(name='BoldRight', parent=style_bold, alignment=TA_RIGHT)
-        style_h2_center = ParagraphStyle(name='H2Center', parent=styles['h2'], alignment=TA_CENTER, fontSize=12, spaceBefore=12, spaceAfter=8)
-
-        # --- Sección 1: Encabezado de la Venta ---
-        cliente_info_str = f"<b>CLIENTE:</b> {venta.cliente.nombre} {venta.cliente.apellido or ''}".strip()
-        doc_info_str = f"{venta.cliente.get_tipo_documento_display()} {venta.cliente.documento}"
-        
-        header_data = [
-            [Paragraph(cliente_info_str, style_normal), Paragraph(f"<b>COMPROBANTE DE VENTA N°: {venta.id}</b>", style_normal_right)],
-            [Paragraph(doc_info_str, style_normal), Paragraph(f"<b>FECHA VENTA:</b> {venta.fecha.strftime('%d/%m/%Y')}", style_normal_right)],
-        ]
-        header_table = Table(header_data, colWidths=[4*inch, 3.5*inch])
-        header_table.setStyle(TableStyle([('VALIGN', (0,0), (-1,-1), 'TOP'), ('BOTTOMPADDING', (0,0), (-1,-1), 6)]))
-        story.append(header_table)
-        story.append(Spacer(1, 0.25 * inch))
-
-        # --- Sección 2: Tabla de Productos Vendidos ---
-        items_data = [[
-            Paragraph("<b>Cant.</b>", style_bold), Paragraph("<b>Descripción</b>", style_bold),
-            Paragraph("<b>P. Unit.</b>", style_bold_right), Paragraph("<b>Total</b>", style_bold_right)
-        ]]
-        for item in venta.detalles.all():
-            items_data.append([
-                Paragraph(str(item.cantidad), style_normal_center),
-                Paragraph(item.producto_nombre_historico, style_normal),
-                Paragraph(f"${item.precio_unitario_venta:,.0f}", style_normal_right),
-                Paragraph(f"${item.subtotal:,.0f}", style_normal_right)
-            ])
-        
-        items_table = Table(items_data, colWidths=[0.6*inch, 4.4*inch, 1.25*inch, 1.25*inch])
-        items_table.setStyle(TableStyle([
-            ('BACKGROUND', (0,0), (-1,0), colors.lightgrey), 
-            ('ALIGN', (0,0), (-1,-1), 'CENTER'), 
-            ('ALIGN', (1,1), (1,-1), 'LEFT'),
-            ('ALIGN', (2,0), (-1,-1), 'RIGHT'),
-            ('GRID', (0,0), (-1,-1), 0.5, colors.lightgrey),
-            ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
-        ]))
-        story.append(items_table)
-        
-        # --- Sección 3: Totales de la Venta ---
-        totals_data = [
-            ["", Paragraph("Subtotal:", style_normal_right), Paragraph(f"${venta.subtotal:,.0f}", style_normal_right)],
-            ["", Paragraph("IVA (19%):", style_normal_right), Paragraph(f"${venta.iva:,.0f}", style_normal_right)],
-            ["", Paragraph("<b>TOTAL VENTA:</b>", style_bold_right), Paragraph(f"<b>${venta.total:,.0f}</b>", style_bold_right)],
-        ]
-        totals_table = Table(totals_data, colWidths=[4.75*inch, 1.5*inch, 1.25*inch])
-        story.append(totals_table)
-        story.append(Spacer(1, 0.2*inch))
-        
-        pago_resumen_str = VentaReadSerializer().get_resumen_pago(venta)
-        story.append(Paragraph(f"<b>Forma de Pago:</b> {pago_resumen_str}", style_normal))
-
-        # --- Sección de Devolución ---
-        if tiene_devolucion:
-            devolucion = venta.devolucion
-            story.append(Spacer(1, 0.3 * inch))
-            story.append(Paragraph("DETALLE DE LA DEVOLUCIÓN", style_h2_center))
-            
-            info_devolucion_data = [
-                [
-                    Paragraph(f"<b>Fecha:</b> {devolucion.fecha_devolucion.strftime('%d/%m/%Y')}", style_normal),
-                    Paragraph(f"<b>Reembolso:</b> {devolucion.get_tipo_reembolso_display()}", style_normal),
-                ],
-                [
-                    Paragraph(f"<b>Motivo General:</b> {devolucion.motivo_general or 'No especificado'}", style_normal), ""
-                ]
-            ]
-            info_devolucion_table = Table(info_devolucion_data, colWidths=[3.75*inch, 3.75*inch])
-            story.append(info_devolucion_table)
-            story.append(Spacer(1, 0.1 * inch))
-
-            # Tabla de Productos Devueltos
-            if devolucion.items_devueltos.exists():
-                story.append(Paragraph("<b>Productos Devueltos</b>", style_bold))
-                items_devueltos_data = [[
-                    Paragraph("<b>Cant.</b>", style_bold), Paragraph("<b>Producto</b>", style_bold),
-                    Paragraph("<b>Motivo</b>", style_bold), Paragraph("<b>Subtotal</b>", style_bold_right)
-                ]]
-                for item in devolucion.items_devueltos.all():
-                    items_devueltos_data.append([
-                        Paragraph(str(item.cantidad), style_normal_center),
-                        # --- CORRECCIÓN 1 AQUÍ ---
-                        Paragraph(item.producto.nombre, style_normal),
-                        Paragraph(item.get_motivo_display(), style_normal),
-                        Paragraph(f"${item.subtotal:,.0f}", style_normal_right)
-                    ])
-                
-                tabla_devueltos = Table(items_devueltos_data, colWidths=[0.6*inch, 4.15*inch, 1.5*inch, 1.25*inch])
-                tabla_devueltos.setStyle(TableStyle([
-                    ('BACKGROUND', (0,0), (-1,0), colors.whitesmoke),
-                    ('GRID', (0,0), (-1,-1), 0.5, colors.lightgrey),
-                    ('ALIGN', (0,0), (-1,-1), 'CENTER'),
-                    ('ALIGN', (1,1), (2,-1), 'LEFT'),
-                    ('ALIGN', (3,0), (3,-1), 'RIGHT'),
-                ]))
-                story.append(tabla_devueltos)
-                story.append(Spacer(1, 0.2 * inch))
-
-            # Tabla de Productos de Cambio Entregados
-            if devolucion.items_cambio.exists():
-                story.append(Paragraph("<b>Productos de Cambio Entregados</b>", style_bold))
-                items_cambio_data = [[
-                    Paragraph("<b>Cant.</b>", style_bold), Paragraph("<b>Producto</b>", style_bold),
-                    Paragraph("<b>P. Unit.</b>", style_bold_right), Paragraph("<b>Subtotal</b>", style_bold_right)
-                ]]
-                for item in devolucion.items_cambio.all():
-                    items_cambio_data.append([
-                        Paragraph(str(item.cantidad), style_normal_center),
-                        # --- CORRECCIÓN 2 AQUÍ ---
-                        Paragraph(item.producto.nombre, style_normal),
-                        Paragraph(f"${item.precio_unitario_actual:,.0f}", style_normal_right),
-                        Paragraph(f"${item.subtotal:,.0f}", style_normal_right)
-                    ])
-                
-                tabla_cambio = Table(items_cambio_data, colWidths=[0.6*inch, 4.65*inch, 1*inch, 1.25*inch])
-                tabla_cambio.setStyle(TableStyle([
-                    ('BACKGROUND', (0,0), (-1,0), colors.whitesmoke),
-                    ('GRID', (0,0), (-1,-1), 0.5, colors.lightgrey),
-                    ('ALIGN', (0,0), (-1,-1), 'CENTER'),
-                    ('ALIGN', (1,1), (1,-1), 'LEFT'),
-                    ('ALIGN', (2,0), (-1,-1), 'RIGHT'),
-                ]))
-                story.append(tabla_cambio)
-                story.append(Spacer(1, 0.2 * inch))
-
-            # Totales del Balance de la Devolución
-            balance_data = [
-                ["", Paragraph("Total Devolución:", style_normal_right), Paragraph(f"${devolucion.total_productos_devueltos:,.0f}", style_normal_right)],
-                ["", Paragraph("Total Cambio:", style_normal_right), Paragraph(f"${devolucion.total_productos_cambio:,.0f}", style_normal_right)],
-                ["", Paragraph("<b>BALANCE DEVOLUCIÓN:</b>", style_bold_right), Paragraph(f"<b>${devolucion.balance_final:,.0f}</b>", style_bold_right)],
-            ]
-            balance_table = Table(balance_data, colWidths=[4.25*inch, 2*inch, 1.25*inch])
-            story.append(balance_table)
-        
-        def add_header_footer(canv, doc):
-            canv.saveState()
-            canv.setFont('Helvetica-Bold', 12)
-            canv.drawString(inch/2, letter[1] - inch, "Depósito y Ferretería del Sur")
-            canv.setFont('Helvetica', 9)
-            canv.drawString(inch/2, letter[1] - inch - 15, "NIT: 900.123.456-7")
-            canv.setFont('Helvetica-Oblique', 8)
-            canv.drawCentredString(letter[0]/2, inch/2 - 10, f"Página {doc.page} | Generado el {timezone.now().strftime('%d/%m/%Y %H:%M')}")
-            canv.restoreState()
-        
-        doc.build(story, onFirstPage=add_header_footer, onLaterPages=add_header_footer)
-        
-        pdf_bytes = buffer.getvalue()
-        buffer.close()
-
-        response = Response(pdf_bytes, content_type='application/pdf')
-        response['Content-Disposition'] = f'inline; filename="Factura_Venta_{venta.id}.pdf"'
-        
-        return response
+        return respuesta_pdf(request, DocumentoVenta(), venta)
     
 
 
-class MobileDashboardView(APIView):
+class MobileDashboardView(LecturaReplicaMixin, APIView):
     """
     Vista mejorada para devolver las estadísticas clave
     para el dashboard de la aplicación móvil.
     """
+    authentication_classes = [ClaimsJWTAuthentication]
     permission_classes = [permissions.IsAuthenticated, HasPrivilege]
     required_privilege = "dashboard_ver" 
 
@@ -421,16 +260,10 @@ class MobileDashboardView(APIView):
         hace_30_dias = hoy - timedelta(days=30)
 
         # 1. Ventas de Hoy (Formateadas como texto sin decimales si no son necesarios)
-        ventas_hoy = Venta.objects.filter(
-            fecha=hoy,
-            estado='Completada'
-        ).aggregate(total=Sum('total'))['total'] or Decimal('0.00')
+        ventas_hoy = resumen.total_ventas(hoy, hoy)
 
         #  Cálculo de ventas de los últimos 30 días
-        ventas_30_dias = Venta.objects.filter(
-            fecha__range=[hace_30_dias, hoy],
-            estado='Completada'
-        ).aggregate(total=Sum('total'))['total'] or Decimal('0.00')
+        ventas_30_dias = resumen.total_ventas(hace_30_dias, hoy)
 
         # 2. Pedidos por Verificar (estado 'en_verificacion')
         pedidos_por_verificar = Pedido.objects.filter(estado='en_verificacion').count()
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class AuthenticationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'authentication'
+
+    def ready(self):
+        # Registra los receptores que marcan cuándo cambió un usuario o cliente.
+        from . import signals  # noqa: F401
+        from . import checks  # noqa: F401
@@ -0,0 +1,20 @@
+# authentication/checks.py
+
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+from backend_api.cache_compartida import cache_compartida
+
+
+@register(Tags.security, Tags.caches)
+def autorizacion_por_claims(app_configs, **kwargs):
+    if getattr(settings, 'JWT_AUTORIZACION_POR_CLAIMS', False) and not cache_compartida():
+        return [Warning(
+            'JWT_AUTORIZACION_POR_CLAIMS está activo pero la caché es local del proceso.',
+            hint=(
+                'Los cambios de rol y las desactivaciones no llegarían a los demás workers, así que '
+                'los claims no se usan y se consulta la base. Configure CACHE_BACKEND con Redis u otro backend compartido.'
+            ),
+            id='authentication.W001',
+        )]
+    return []
@@ -1,9 +1,11 @@
 # authentication/jwt_auth.py
+import time
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from Clientes.models import Cliente
 from rest_framework_simplejwt.exceptions import InvalidToken, AuthenticationFailed
+from .principal import UsuarioToken, claims_vigentes, cache_principales
 
 User = get_user_model()
 
@@ -20,11 +22,19 @@ class CustomJWTAuthentication(JWTAuthentication):
         except KeyError:
             raise InvalidToken('El token no contiene una identificación de usuario reconocible.')
 
+        # Si ya lo cargamos hace poco y no ha cambiado, no volvemos a la base de datos.
+        usuario_cacheado = cache_principales.obtener(user_type, user_id)
+        if usuario_cacheado is not None:
+            return usuario_cacheado
+        cargado_en = time.time()
+
         #  Buscamos en la tabla correcta basándonos en 'user_type'
         if user_type == 'system_user':
             try:
-                user = User.objects.get(pk=user_id)
+                # El rol se trae de una vez para que nadie más tenga que consultarlo.
+                user = User.objects.select_related('rol').get(pk=user_id)
                 if self.user_can_authenticate(user):
+                    cache_principales.guardar(user_type, user_id, user, cargado_en)
                     return user
             except User.DoesNotExist:
                 pass # El error se lanzará al final
@@ -33,6 +43,7 @@ class CustomJWTAuthentication(JWTAuthentication):
             try:
                 cliente = Cliente.objects.get(pk=user_id)
                 if cliente.activo: # Verificamos si el cliente está activo
+                    cache_principales.guardar(user_type, user_id, cliente, cargado_en)
                     return cliente
             except Cliente.DoesNotExist:
                 pass # El error se lanzará al final
@@ -43,3 +54,20 @@ class CustomJWTAuthentication(JWTAuthentication):
     def user_can_authenticate(self, user):
         is_active = getattr(user, "is_active", None)
         return is_active or is_active is None
+
+
+class ClaimsJWTAuthentication(CustomJWTAuthentication):
+    """
+    Autenticación opcional para vistas de solo lectura que únicamente necesitan
+    autorizar (p. ej. los dashboards): si JWT_AUTORIZACION_POR_CLAIMS está activo
+    y los claims del token siguen vigentes, devuelve un UsuarioToken construido
+    con ellos, sin consultar la base de datos. Si el usuario o su rol cambiaron
+    después de emitir el token, se usa la búsqueda normal.
+
+    Se activa por vista con: authentication_classes = [ClaimsJWTAuthentication]
+    """
+
+    def get_user(self, validated_token):
+        if getattr(settings, 'JWT_AUTORIZACION_POR_CLAIMS', False) and claims_vigentes(validated_token):
+            return UsuarioToken(validated_token)
+        return super().get_user(validated_token)
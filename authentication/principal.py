@@ -0,0 +1,162 @@
+# authentication/principal.py
+"""
+Utilidades sobre el usuario autenticado (el "principal" de cada petición).
+
+Cada vez que se guarda o elimina un CustomUser o un Cliente se registra en la
+caché la hora del cambio. Los tokens emitidos antes de esa hora dejan de
+aceptarse como fuente confiable de datos del usuario.
+
+Esas marcas (y la versión de cada rol) solo les llegan a todos los workers si la
+caché es compartida. Con la caché local del proceso los claims del token nunca se
+dan por vigentes y se consulta siempre la base de datos.
+"""
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from backend_api.cache_compartida import cache_compartida, timeout_segun_cache
+from Roles_Permisos.privilegios import PrivilegiosRol, obtener_version_rol
+from Roles_Permisos.bitmap import decodificar_privilegios
+
+
+def _clave_modificado(user_type, user_id):
+    return f'auth:modificado:{user_type}:{user_id}'
+
+
+def marcar_principal_modificado(user_type, user_id):
+    # Basta con recordarlo mientras pueda existir un token de acceso emitido antes.
+    ttl = int(settings.SIMPLE_JWT['ACCESS_TOKEN_LIFETIME'].total_seconds())
+
+    def marcar():
+        cache.set(_clave_modificado(user_type, user_id), time.time(), timeout=ttl)
+        cache_principales.descartar(user_type, user_id)
+
+    transaction.on_commit(marcar)
+
+
+def obtener_marca_modificado(user_type, user_id):
+    return cache.get(_clave_modificado(user_type, user_id))
+
+
+def claims_vigentes(token):
+    """
+    Indica si los claims del token todavía describen al usuario: el token trae
+    la versión del rol (tokens nuevos), el usuario no cambió después de emitirlo
+    y su rol sigue en la misma versión.
+    """
+    if not cache_compartida():
+        # Otro worker pudo desactivar al usuario o cambiar su rol sin que este se entere.
+        return False
+    if 'rol_version' not in token or token.get('user_type') not in ('system_user', 'cliente'):
+        return False
+    user_id = token.get(settings.SIMPLE_JWT['USER_ID_CLAIM'])
+    marca = obtener_marca_modificado(token['user_type'], user_id)
+    if marca is not None and marca >= token.get('iat', 0):
+        return False
+    rol_id = token.get('rol_id')
+    if rol_id and token['rol_version'] != obtener_version_rol(rol_id):
+        return False
+    return True
+
+
+class UsuarioToken:
+    """
+    Usuario construido solo con los claims del token, sin tocar la base de datos.
+    Sirve para autorizar (HasPrivilege), no para vistas que necesiten el modelo real.
+    """
+    is_authenticated = True
+    is_anonymous = False
+    is_active = True
+    is_staff = False
+
+    def __init__(self, token):
+        self.id = self.pk = token[settings.SIMPLE_JWT['USER_ID_CLAIM']]
+        self.user_type = token.get('user_type')
+        self.is_superuser = bool(token.get('is_superuser', False))
+        self.rol_id = token.get('rol_id')
+        self.rol_nombre = token.get('rol')
+        self.full_name = token.get('full_name', '')
+        if 'privileges_bitmap' in token:
+            self.privilegios_token = decodificar_privilegios(token['privileges_bitmap'])
+        else:
+            # Tokens emitidos antes del mapa de bits traen la lista de codenames.
+            self.privilegios_token = PrivilegiosRol(True, token.get('privileges', []))
+
+    def has_privilege(self, privilege_code_name):
+        return self.is_superuser or self.privilegios_token.tiene(privilege_code_name)
+
+    def __str__(self):
+        return self.full_name or f'{self.user_type} #{self.id}'
+
+
+class CachePrincipales:
+    """
+    Caché LRU con TTL, por proceso, de los usuarios ya cargados por
+    CustomJWTAuthentication, con clave (user_type, id). Una entrada deja de servir si:
+    - venció su TTL,
+    - el usuario se modificó después de cargarla (marca en la caché compartida),
+    - la versión de su rol cambió.
+    Cada petición recibe una copia para que nadie modifique el objeto compartido.
+
+    Las marcas de modificado llegan a todos los workers solo si la caché es
+    compartida. Con la caché local del proceso el TTL se reduce a
+    CACHE_TIMEOUT_LOCAL (5 s por defecto): es lo que un usuario o cliente
+    desactivado, o con la contraseña cambiada, puede seguir autenticándose en los
+    workers que no atendieron el cambio.
+    """
+
+    def __init__(self, max_entradas, ttl):
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obtener(self, user_type, user_id):
+        clave = (user_type, user_id)
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                return None
+            usuario, cargado_en, expira, rol_version = entrada
+            if expira <= time.monotonic():
+                del self._entradas[clave]
+                return None
+            self._entradas.move_to_end(clave)
+
+        marca = obtener_marca_modificado(user_type, user_id)
+        rol_id = getattr(usuario, 'rol_id', None)
+        if (marca is not None and marca >= cargado_en) or (rol_id and obtener_version_rol(rol_id) != rol_version):
+            self.descartar(user_type, user_id)
+            return None
+        return copy.copy(usuario)
+
+    def guardar(self, user_type, user_id, usuario, cargado_en):
+        """`cargado_en` es la hora (time.time()) tomada ANTES de consultar la base de datos."""
+        rol_id = getattr(usuario, 'rol_id', None)
+        rol_version = obtener_version_rol(rol_id) if rol_id else None
+        with self._lock:
+            expira = time.monotonic() + timeout_segun_cache(self.ttl)
+            self._entradas[(user_type, user_id)] = (usuario, cargado_en, expira, rol_version)
+            self._entradas.move_to_end((user_type, user_id))
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+
+    def descartar(self, user_type, user_id):
+        with self._lock:
+            self._entradas.pop((user_type, user_id), None)
+
+    def limpiar(self):
+        with self._lock:
+            self._entradas.clear()
+
+
+cache_principales = CachePrincipales(
+    max_entradas=getattr(settings, 'PRINCIPAL_CACHE_MAX_ENTRADAS', 1000),
+    ttl=getattr(settings, 'PRINCIPAL_CACHE_TTL', 300),
+)
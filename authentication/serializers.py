@@ -7,7 +7,7 @@ from django.core.validators import RegexValidator
 from rest_framework.validators import UniqueValidator 
 from django.core.exceptions import ValidationError as DjangoCoreValidationError
 
-from django.core.mail import send_mail
+from Notificaciones.correo import encolar_correo
 from django.conf import settings
 
 User = get_user_model()
@@ -133,14 +133,12 @@ class ClienteRegistrationSerializer(serializers.ModelSerializer): # Para auto-re
                 f"Si tienes alguna pregunta o necesitas asistencia, no dudes en contactarnos.\n\n"
                 f"Saludos cordiales,\nEl equipo de ConstruSys"
             )
-            send_mail(
+            encolar_correo(
                 subject,
                 message_body,
-                settings.DEFAULT_FROM_EMAIL, # email remitente configurado en settings.py
                 [cliente.correo], # El correo del cliente recién registrado
-                fail_silently=False 
             )
-            print(f"INFO (ClienteRegistrationSerializer.create): Correo de bienvenida ENVIADO a {cliente.correo}")
+            print(f"INFO (ClienteRegistrationSerializer.create): Correo de bienvenida ENCOLADO para {cliente.correo}")
         except Exception as e:
             # Es importante loggear este error para saber si algo falló con el envío del correo
             print(f"ERROR (ClienteRegistrationSerializer.create): No se pudo enviar el correo de bienvenida a {cliente.correo}. Causa: {str(e)}")
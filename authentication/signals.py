@@ -0,0 +1,23 @@
+# authentication/signals.py
+
+from django.conf import settings
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from Clientes.models import Cliente
+from .principal import marcar_principal_modificado
+
+
+# Cualquier cambio del usuario (activo, contraseña, rol, datos) invalida lo que
+# dicen de él los tokens ya emitidos.
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def usuario_modificado(sender, instance, **kwargs):
+    marcar_principal_modificado('system_user', instance.pk)
+
+
+@receiver(post_save, sender=Cliente)
+@receiver(post_delete, sender=Cliente)
+def cliente_modificado(sender, instance, **kwargs):
+    marcar_principal_modificado('cliente', instance.pk)
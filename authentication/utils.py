@@ -3,6 +3,8 @@ from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import get_user_model
 from Clientes.models import Cliente
 from Roles_Permisos.models import Permiso
+from Roles_Permisos.privilegios import obtener_version_rol
+from Roles_Permisos.bitmap import codificar_privilegios
 
 User = get_user_model()
 
@@ -37,13 +39,22 @@ def get_tokens_for_user(user_instance):
     # Añadimos nuestros datos personalizados al payload del token
     access_token['user_type'] = user_type
     access_token['rol'] = rol_nombre
-    access_token['privileges'] = privileges_codenames
+    # Los privilegios viajan como mapa de bits en base64url (ver Roles_Permisos/bitmap.py);
+    # el frontend los expande con /api/roles-permisos/permisos/bits/.
+    access_token['privileges_bitmap'] = codificar_privilegios(privileges_codenames)
     access_token['full_name'] = full_name 
     access_token['nombre'] = user_instance.first_name if hasattr(user_instance, 'first_name') else user_instance.nombre
     
     
     access_token['must_change_password'] = getattr(user_instance, 'must_change_password', False)
 
+    # Datos para autorizar solo con el token (ver ClaimsJWTAuthentication). La versión
+    # del rol permite detectar si el rol se editó después de emitir el token.
+    rol_id = getattr(user_instance, 'rol_id', None)
+    access_token['is_superuser'] = getattr(user_instance, 'is_superuser', False)
+    access_token['rol_id'] = rol_id
+    access_token['rol_version'] = obtener_version_rol(rol_id) if rol_id else None
+
     return {
         'refresh': str(refresh),
         'access': str(access_token),
@@ -2,7 +2,7 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, generics, permissions
-from django.core.mail import send_mail
+from Notificaciones.correo import encolar_correo
 from django.conf import settings
 from django.utils import timezone
 from django.contrib.auth import get_user_model
@@ -79,7 +79,7 @@ class ClienteRegistrationView(APIView):
                     f"Inicia sesión aquí: {settings.FRONTEND_URL}/login\n\n"
                     f"Saludos,\nEl equipo de ConstruSys"
                 )
-                send_mail(subject, message_body, settings.DEFAULT_FROM_EMAIL, [cliente.correo], fail_silently=True)
+                encolar_correo(subject, message_body, [cliente.correo])
             except Exception as e:
                 print(f"ERROR: No se pudo enviar correo de bienvenida (auto-registro) a {cliente.correo}. Causa: {str(e)}")
 
@@ -165,13 +165,13 @@ class UnifiedPasswordResetRequestView(APIView):
                     f"Atentamente,\nEl equipo de ConstruSys"
                 )
                 
-                send_mail(
+                # Si no sale en la primera mitad de la vida del enlace no se envía: llegaría
+                # cuando ya casi no sirve y el usuario puede pedir otro.
+                encolar_correo(
                     subject,
                     message,
-                    settings.DEFAULT_FROM_EMAIL,
-                    
                     [user_or_cliente.email if isinstance(user_or_cliente, User) else user_or_cliente.correo],
-                    fail_silently=False
+                    vigencia=timedelta(seconds=settings.PASSWORD_RESET_TIMEOUT_SECONDS) / 2,
                 )
             except Exception as e:
                 print(f"Error en UnifiedPasswordResetRequestView al enviar correo: {str(e)}")
@@ -204,8 +204,8 @@ class UnifiedPasswordResetConfirmView(APIView):
         except (PasswordResetToken.DoesNotExist, DjangoValidationError): # DjangoValidationError para UUID mal formados
             return Response({"error": "El enlace de restablecimiento es inválido o ha expirado."}, status=status.HTTP_400_BAD_REQUEST)
 
-        # 3. Verificar si el token ha expirado (1 hora)
-        if token_instance.created_at < timezone.now() - timedelta(hours=1):
+        # 3. Verificar si el token ha expirado (PASSWORD_RESET_TIMEOUT_SECONDS, 1 hora)
+        if token_instance.created_at < timezone.now() - timedelta(seconds=settings.PASSWORD_RESET_TIMEOUT_SECONDS):
             token_instance.delete() # Limpiamos el token expirado
             return Response({"error": "El enlace de restablecimiento es inválido o ha expirado."}, status=status.HTTP_400_BAD_REQUEST)
 
@@ -0,0 +1,37 @@
+# backend_api/cache_compartida.py
+"""
+¿La caché la ven todos los procesos?
+
+Varias piezas guardan en la caché marcas que todos los workers tienen que ver (la
+versión del catálogo, por ejemplo). Con el backend por defecto (LocMemCache) cada
+proceso de gunicorn o instancia serverless tiene su propia copia: lo que invalida
+uno no les llega a los demás. Esas piezas preguntan aquí y, si la caché es local,
+guardan sus datos solo CACHE_TIMEOUT_LOCAL segundos o van a la base.
+
+En producción conviene un backend compartido (CACHE_BACKEND apuntando a Redis).
+"""
+
+from django.conf import settings
+
+# Backends cuyo contenido es de un solo proceso.
+BACKENDS_LOCALES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def cache_compartida(alias='default'):
+    """True si el backend de la caché `alias` lo comparten todos los procesos (Redis, Memcached, base de datos)."""
+    return settings.CACHES.get(alias, {}).get('BACKEND', '') not in BACKENDS_LOCALES
+
+
+def timeout_local():
+    """Segundos que puede vivir un dato que otros procesos no van a poder invalidar."""
+    return getattr(settings, 'CACHE_TIMEOUT_LOCAL', 5)
+
+
+def timeout_segun_cache(timeout):
+    """El timeout pedido si la caché es compartida; si es local, como mucho timeout_local()."""
+    if cache_compartida():
+        return timeout
+    return timeout_local() if timeout is None else min(timeout, timeout_local())
@@ -0,0 +1,173 @@
+# backend_api/cache_pdf.py
+"""
+Caché de PDFs por contenido.
+
+Un comprobante de venta o de compra casi nunca cambia después de emitido, pero se
+regeneraba entero cada vez que alguien lo abría. Ahora cada PDF se guarda con una
+clave (tipo, id, versión), donde la versión es un hash de:
+
+- las filas que alimentan el documento (DocumentoPDF.filas_version: la venta, sus
+  detalles, su devolución y los ítems de la devolución, etc.),
+- la versión de la plantilla (VERSION_MOTOR y DocumentoPDF.version_plantilla).
+
+Si cualquiera de esas filas cambia, cambia la versión y el PDF viejo simplemente
+deja de usarse: no hace falta invalidar nada a mano. La versión es además el ETag,
+así que un navegador que ya tiene el archivo recibe un 304 sin que se lea ni se
+genere el PDF.
+
+Hay dos niveles: un directorio local (PDF_CACHE_DIR, el más rápido) y, si se
+activa PDF_CACHE_STORAGE (apagado por defecto), un almacenamiento compartido entre
+servidores. Las rutas son <tipo>/<id>/<version>.pdf; al guardar una versión nueva
+se borran las anteriores de ese documento.
+
+Los PDFs traen nombres, documentos y correos de los clientes, y las vistas solo los
+entregan con HasPrivilege. Por eso el segundo nivel no es default_storage (el bucket
+de las imágenes, público y con URLs sin firma) sino un almacenamiento propio y
+privado: PDF_CACHE_STORAGE_CONFIG, por defecto S3 con ACL 'private' y URLs firmadas.
+"""
+
+import functools
+import hashlib
+import logging
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from django.utils.module_loading import import_string
+
+from .pdf import VERSION_MOTOR
+
+logger = logging.getLogger(__name__)
+
+CARPETA_STORAGE = 'pdfs'
+DIRECTORIO_LOCAL = getattr(settings, 'PDF_CACHE_DIR', None) or os.path.join(tempfile.gettempdir(), 'construsys-pdfs')
+USAR_STORAGE = getattr(settings, 'PDF_CACHE_STORAGE', False)
+CONFIG_STORAGE = {
+    'BACKEND': 'storages.backends.s3boto3.S3Boto3Storage',
+    'OPTIONS': {
+        'default_acl': 'private',
+        'querystring_auth': True,
+        'object_parameters': {'CacheControl': 'private, no-store'},
+    },
+}
+
+
+def _valores_fila(fila):
+    if not hasattr(fila, '_meta'):
+        # Valores sueltos (solo los campos que se imprimen de una fila relacionada).
+        return fila
+    return (fila._meta.label, fila.pk, tuple(getattr(fila, campo.attname) for campo in fila._meta.concrete_fields))
+
+
+def version_documento(documento, obj):
+    """Hash de las filas del documento y de la versión de su plantilla."""
+    partes = [VERSION_MOTOR, documento.tipo, documento.version_plantilla, *documento.partes_version(obj)]
+    partes += [_valores_fila(fila) for fila in documento.filas_version(obj) if fila is not None]
+    return hashlib.sha256(repr(partes).encode('utf-8')).hexdigest()[:24]
+
+
+@functools.cache
+def almacenamiento():
+    """El almacenamiento privado de los PDFs (PDF_CACHE_STORAGE_CONFIG, con la forma de una entrada de STORAGES)."""
+    config = getattr(settings, 'PDF_CACHE_STORAGE_CONFIG', None) or CONFIG_STORAGE
+    return import_string(config['BACKEND'])(**config.get('OPTIONS', {}))
+
+
+def _ruta_relativa(documento, obj, version):
+    return f'{documento.tipo}/{obj.pk}/{version}.pdf'
+
+
+def _leer_local(ruta):
+    try:
+        with open(os.path.join(DIRECTORIO_LOCAL, ruta), 'rb') as archivo:
+            return archivo.read()
+    except OSError:
+        return None
+
+
+def _guardar_local(ruta, contenido):
+    destino = os.path.join(DIRECTORIO_LOCAL, ruta)
+    carpeta = os.path.dirname(destino)
+    try:
+        os.makedirs(carpeta, exist_ok=True)
+        for viejo in os.listdir(carpeta):
+            if viejo != os.path.basename(destino):
+                os.remove(os.path.join(carpeta, viejo))
+        # Se escribe a un temporal y se renombra: otro proceso nunca lee un PDF a medias.
+        descriptor, temporal = tempfile.mkstemp(dir=carpeta, suffix='.tmp')
+        with os.fdopen(descriptor, 'wb') as archivo:
+            archivo.write(contenido)
+        os.replace(temporal, destino)
+    except OSError as e:
+        logger.warning(f"No se pudo guardar el PDF {ruta} en la caché local: {e}")
+
+
+def _leer_storage(ruta):
+    nombre = f'{CARPETA_STORAGE}/{ruta}'
+    try:
+        storage = almacenamiento()
+        if not storage.exists(nombre):
+            return None
+        with storage.open(nombre, 'rb') as archivo:
+            return archivo.read()
+    except Exception as e:
+        logger.warning(f"No se pudo leer el PDF {nombre} del almacenamiento: {e}")
+        return None
+
+
+def _guardar_storage(ruta, contenido):
+    nombre = f'{CARPETA_STORAGE}/{ruta}'
+    carpeta = os.path.dirname(nombre)
+    try:
+        storage = almacenamiento()
+        _, archivos = storage.listdir(carpeta) if storage.exists(carpeta) else ([], [])
+        for viejo in archivos:
+            if f'{carpeta}/{viejo}' != nombre:
+                storage.delete(f'{carpeta}/{viejo}')
+        if not storage.exists(nombre):
+            storage.save(nombre, ContentFile(contenido))
+    except Exception as e:
+        # El almacenamiento es solo un nivel de caché: si falla, el PDF igual se entrega.
+        logger.warning(f"No se pudo guardar el PDF {nombre} en el almacenamiento: {e}")
+
+
+def obtener_pdf(documento, obj, version=None):
+    """Bytes del PDF: de la caché local, del almacenamiento o recién generado (y guardado en ambos)."""
+    version = version or version_documento(documento, obj)
+    ruta = _ruta_relativa(documento, obj, version)
+
+    contenido = _leer_local(ruta)
+    if contenido is not None:
+        return contenido
+    if USAR_STORAGE:
+        contenido = _leer_storage(ruta)
+        if contenido is not None:
+            _guardar_local(ruta, contenido)
+            return contenido
+
+    contenido = documento.render(obj)
+    _guardar_local(ruta, contenido)
+    if USAR_STORAGE:
+        _guardar_storage(ruta, contenido)
+    return contenido
+
+
+def respuesta_pdf(request, documento, obj):
+    """
+    Respuesta con el PDF del documento y su ETag. Si el navegador ya tiene esta
+    versión (If-None-Match) devuelve 304 sin leer ni generar el archivo.
+    """
+    version = version_documento(documento, obj)
+    etag = quote_etag(version)
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(obtener_pdf(documento, obj, version), content_type='application/pdf')
+        response['Content-Disposition'] = documento.content_disposition(obj)
+    response['ETag'] = etag
+    # Son documentos de un cliente: solo el navegador los guarda, y debe revalidar.
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
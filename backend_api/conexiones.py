@@ -0,0 +1,64 @@
+# backend_api/conexiones.py
+"""
+Estadísticas de las conexiones a la base de datos del proceso actual.
+
+Cada worker de gunicorn tiene sus propias conexiones (y su propio pool, si está
+activo), así que los números son por proceso: sirven para ver si las conexiones se
+están reutilizando (conexiones_abiertas debería crecer mucho más lento que las
+peticiones) y cómo está de ocupado el pool.
+"""
+
+import os
+import threading
+import time
+from collections import Counter
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+_lock = threading.Lock()
+_abiertas = Counter()
+_inicio = time.time()
+
+
+def _conexion_creada(sender, connection, **kwargs):
+    with _lock:
+        _abiertas[connection.alias] += 1
+
+
+connection_created.connect(_conexion_creada, dispatch_uid='backend_api.conexiones')
+
+
+def _estadisticas_pool(conexion):
+    # DatabaseWrapper.pool solo existe en el backend de PostgreSQL con psycopg 3 y OPTIONS['pool'].
+    pool = getattr(conexion, 'pool', None) if conexion.settings_dict.get('OPTIONS', {}).get('pool') else None
+    if pool is None:
+        return None
+    return {
+        'min_size': pool.min_size,
+        'max_size': pool.max_size,
+        'timeout': pool.timeout,
+        **pool.get_stats(),
+    }
+
+
+def estadisticas_conexiones():
+    datos = {'pid': os.getpid(), 'segundos_activo': int(time.time() - _inicio), 'bases': {}}
+    for alias in connections:
+        conexion = connections[alias]
+        config = conexion.settings_dict
+        datos['bases'][alias] = {
+            'motor': conexion.vendor,
+            'conn_max_age': config.get('CONN_MAX_AGE'),
+            'conn_health_checks': config.get('CONN_HEALTH_CHECKS'),
+            'cursores_servidor_desactivados': config.get('DISABLE_SERVER_SIDE_CURSORS', False),
+            'conexiones_abiertas': _abiertas[alias],
+            # Estado de la conexión del hilo que atiende esta petición.
+            'conexion_actual_abierta': conexion.connection is not None,
+            'segundos_hasta_cierre': (
+                max(round(conexion.close_at - time.monotonic(), 1), 0)
+                if conexion.connection is not None and conexion.close_at is not None else None
+            ),
+            'pool': _estadisticas_pool(conexion),
+        }
+    return datos
@@ -0,0 +1,58 @@
+# backend_api/mixins.py
+
+
+class RastreoEstadoMixin:
+    """
+    Recuerda el valor que tenían algunos campos al cargar la instancia desde la base
+    de datos, para saber en save() desde qué estado se viene sin volver a consultar
+    la fila. Se usa como primera base del modelo:
+
+        class Pedido(RastreoEstadoMixin, models.Model):
+            campos_rastreados = ('estado',)
+
+    Después de guardar hay que llamar a sincronizar_valores_originales() para que el
+    siguiente save() compare contra lo que quedó guardado.
+    """
+    campos_rastreados = ('estado',)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instancia = super().from_db(db, field_names, values)
+        instancia._valores_originales = {
+            campo: getattr(instancia, campo)
+            for campo in cls.campos_rastreados
+            if campo in instancia.__dict__
+        }
+        return instancia
+
+    def valor_original(self, campo):
+        """Valor del campo en la base de datos (None si la instancia es nueva)."""
+        if self._state.adding:
+            return None
+        originales = self.__dict__.setdefault('_valores_originales', {})
+        if campo not in originales:
+            # El campo no se cargó (.only()/.defer() o instancia armada a mano): se consulta una vez.
+            originales[campo] = type(self)._base_manager.filter(pk=self.pk).values_list(campo, flat=True).first()
+        return originales[campo]
+
+    @property
+    def estado_original(self):
+        return self.valor_original('estado')
+
+    def campo_modificado(self, campo):
+        return self._state.adding or getattr(self, campo) != self.valor_original(campo)
+
+    def sincronizar_valores_originales(self, campos=None):
+        """
+        Toma los valores actuales como los guardados. Con `campos` (por ejemplo el
+        update_fields de save) solo se actualizan esos.
+        """
+        originales = self.__dict__.setdefault('_valores_originales', {})
+        for campo in self.campos_rastreados:
+            if (campos is None or campo in campos) and campo in self.__dict__:
+                originales[campo] = getattr(self, campo)
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        campos = kwargs.get('fields') or (args[1] if len(args) > 1 else None)
+        self.sincronizar_valores_originales(campos)
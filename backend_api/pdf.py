@@ -0,0 +1,244 @@
+# backend_api/pdf.py
+"""
+Motor común para los PDF (comprobantes de venta y compra, estados de cuenta de
+crédito y cotizaciones).
+
+Antes cada vista llamaba a getSampleStyleSheet() y armaba sus ParagraphStyle en
+cada petición (y la cotización modificaba el estilo 'Title' compartido). Ahora:
+
+- ESTILOS es un registro que se arma una vez al importar el módulo y comparten
+  todas las peticiones (y todos los hilos). MappingProxyType solo impide agregar
+  o reemplazar entradas: los ParagraphStyle siguen siendo mutables, y cambiar uno
+  (estilo.fontSize = ...) cambia todos los PDF que se generen después en ese
+  proceso. Nunca se modifican: si un documento necesita una variante, se define
+  aquí con derivar(), o en el documento con derivar(ESTILOS[...], ...), que crea
+  un estilo nuevo que hereda del compartido.
+- Las tablas usan comandos de estilo guardados como tuplas (TABLA_*), que
+  Table copia al construirse.
+- DocumentoPDF es la plantilla: márgenes, encabezado con los datos de la empresa,
+  pie con número de página y render(). Cada tipo de documento es una subclase que
+  solo declara su contenido (ver Ventas/pdf.py, Compras/pdf.py, Creditos/pdf.py y
+  Cotizaciones/pdf_generator.py).
+
+El comando benchmark_pdf mide cuántos documentos por segundo se generan de cada tipo.
+"""
+
+import io
+from types import MappingProxyType
+
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Table
+
+
+EMPRESA_NOMBRE = "Depósito y Ferretería del Sur"
+EMPRESA_NIT = "NIT: 900.123.456-7"
+EMPRESA_CONTACTO = "Contacto: (4)3735252"
+
+# Fuentes base de PDF (no hace falta registrarlas en reportlab).
+FUENTE = 'Helvetica'
+FUENTE_NEGRITA = 'Helvetica-Bold'
+FUENTE_CURSIVA = 'Helvetica-Oblique'
+
+# Se sube cuando cambia algo del motor que afecta a todos los documentos (estilos,
+# encabezado, pie): invalida todos los PDFs guardados en backend_api/cache_pdf.py.
+VERSION_MOTOR = '1'
+
+# Tipos de documento que conocen el benchmark y la caché de PDFs.
+TIPOS_DOCUMENTO = {
+    'venta': 'Ventas.pdf.DocumentoVenta',
+    'compra': 'Compras.pdf.DocumentoCompra',
+    'credito': 'Creditos.pdf.DocumentoCredito',
+    'cotizacion': 'Cotizaciones.pdf_generator.DocumentoCotizacion',
+}
+
+
+def derivar(base, nombre, **cambios):
+    """Estilo nuevo que hereda de `base`; `base` no se toca."""
+    return ParagraphStyle(nombre, parent=base, **cambios)
+
+
+def _construir_estilos():
+    muestra = getSampleStyleSheet()
+    normal = muestra['Normal']
+    chico = derivar(normal, 'chico', fontSize=9, leading=11)
+    chico_negrita = derivar(chico, 'chico_negrita', fontName=FUENTE_NEGRITA)
+    estilos = {
+        'normal': normal,
+        'normal_derecha': derivar(normal, 'normal_derecha', alignment=TA_RIGHT),
+        'normal_centro': derivar(normal, 'normal_centro', alignment=TA_CENTER),
+        'negrita': derivar(normal, 'negrita', fontName=FUENTE_NEGRITA),
+        'chico': chico,
+        'chico_derecha': derivar(chico, 'chico_derecha', alignment=TA_RIGHT),
+        'chico_centro': derivar(chico, 'chico_centro', alignment=TA_CENTER),
+        'chico_negrita': chico_negrita,
+        'chico_negrita_derecha': derivar(chico_negrita, 'chico_negrita_derecha', alignment=TA_RIGHT),
+        'titulo': muestra['h1'],
+        'subtitulo': muestra['h2'],
+        'destacado': muestra['h3'],
+        'titulo_documento': derivar(
+            muestra['h1'], 'titulo_documento', alignment=TA_CENTER, fontSize=16,
+            spaceAfter=0.2 * inch, textColor=colors.HexColor('#333333'),
+        ),
+        'titulo_documento_derecha': derivar(
+            muestra['Title'], 'titulo_documento_derecha', fontSize=22, alignment=TA_RIGHT,
+            textColor=colors.HexColor('#2d3748'),
+        ),
+        'titulo_seccion': derivar(
+            muestra['h2'], 'titulo_seccion', alignment=TA_LEFT, fontSize=12, fontName=FUENTE_NEGRITA,
+            spaceBefore=0.15 * inch, spaceAfter=0.05 * inch, textColor=colors.HexColor('#2c5282'),
+        ),
+        'subtitulo_centro': derivar(muestra['h2'], 'subtitulo_centro', alignment=TA_CENTER, fontSize=12, spaceBefore=12, spaceAfter=8),
+        'empresa_derecha': derivar(normal, 'empresa_derecha', alignment=TA_RIGHT, leading=14),
+    }
+    return MappingProxyType(estilos)
+
+
+# Compartido y de solo lectura por convención: ver el docstring del módulo.
+ESTILOS = _construir_estilos()
+
+
+# --- Estilos de tabla (comandos de TableStyle) ---
+
+TABLA_ITEMS = (
+    ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.lightgrey),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+)
+TABLA_ITEMS_SECUNDARIA = (
+    ('BACKGROUND', (0, 0), (-1, 0), colors.whitesmoke),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.lightgrey),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+)
+TABLA_ENCABEZADO_OSCURO = (
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('FONTNAME', (0, 0), (-1, 0), FUENTE_NEGRITA),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+)
+TABLA_DATOS = (
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+)
+TABLA_TOTALES = (
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
+    ('TOPPADDING', (0, 0), (-1, -1), 4),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+)
+
+
+def tabla(filas, anchos, *estilos, **kwargs):
+    """Table con los comandos de estilo indicados (tuplas TABLA_* y/o comandos sueltos)."""
+    comandos = [comando for estilo in estilos for comando in estilo]
+    return Table(filas, colWidths=anchos, style=comandos, **kwargs)
+
+
+def p(texto, estilo='chico'):
+    return Paragraph(str(texto), ESTILOS[estilo])
+
+
+def moneda(valor, decimales=0):
+    return f"${valor:,.{decimales}f}"
+
+
+def datos_cliente(cliente):
+    """Lo que imprimen los documentos de un cliente (para la versión de la caché de PDFs)."""
+    if cliente is None:
+        return None
+    return (cliente.pk, cliente.nombre, cliente.apellido, cliente.tipo_documento, cliente.documento, cliente.correo)
+
+
+class DocumentoPDF:
+    """
+    Plantilla de un documento. Las subclases declaran `tipo`, `modelo` y los
+    márgenes, e implementan contenido(obj) (la lista de flowables) y
+    nombre_archivo(obj). Si necesitan datos a la derecha del encabezado,
+    sobrescriben lineas_encabezado(obj).
+    """
+    tipo = ''
+    modelo = None
+    tamano_pagina = letter
+    # (izquierdo, derecho, superior, inferior)
+    margenes = (0.75 * inch, 0.75 * inch, 1.2 * inch, 1.0 * inch)
+    encabezado = True
+    pie = True
+    disposicion = 'inline'
+    # Se sube al cambiar el diseño de este documento (invalida sus PDFs cacheados).
+    version_plantilla = '1'
+
+    def contenido(self, obj):
+        raise NotImplementedError
+
+    def lineas_encabezado(self, obj):
+        return ()
+
+    def filas_version(self, obj):
+        """
+        Filas cuyo contenido aparece en el PDF: si alguna cambia, cambia la versión
+        cacheada. De las filas que cambian por otros motivos (el cliente al iniciar
+        sesión, el producto con cada venta) se devuelven solo los valores impresos.
+        """
+        return [obj]
+
+    def partes_version(self, obj):
+        """Otros datos que cambian el PDF sin estar en las filas (por ejemplo, la fecha de emisión)."""
+        return ()
+
+    def nombre_archivo(self, obj):
+        return f'{self.tipo}_{obj.pk}.pdf'
+
+    def content_disposition(self, obj):
+        return f'{self.disposicion}; filename="{self.nombre_archivo(obj)}"'
+
+    def obtener(self, pk):
+        """Carga el objeto con lo que el documento necesita (lo usa el benchmark)."""
+        return self.modelo.objects.get(pk=pk)
+
+    def _dibujar_pagina(self, obj):
+        lineas_derecha = list(self.lineas_encabezado(obj)) if self.encabezado else []
+        generado = timezone.localtime().strftime('%d/%m/%Y %H:%M')
+
+        def dibujar(canv, doc):
+            ancho, alto = doc.pagesize
+            izquierda, derecha = doc.leftMargin, ancho - doc.rightMargin
+            canv.saveState()
+            if self.encabezado:
+                y = alto - 0.5 * inch
+                canv.setFont(FUENTE_NEGRITA, 12)
+                canv.drawString(izquierda, y, EMPRESA_NOMBRE)
+                canv.setFont(FUENTE, 9)
+                canv.drawString(izquierda, y - 0.2 * inch, EMPRESA_NIT)
+                for i, linea in enumerate(lineas_derecha[:2]):
+                    canv.drawRightString(derecha, y - i * 0.2 * inch, linea)
+                canv.setStrokeColor(colors.grey)
+                canv.line(izquierda, y - 0.35 * inch, derecha, y - 0.35 * inch)
+            if self.pie:
+                canv.setFont(FUENTE_CURSIVA, 8)
+                canv.drawCentredString(ancho / 2.0, 0.4 * inch, f"Página {doc.page} | Generado el {generado}")
+            canv.restoreState()
+        return dibujar
+
+    def render(self, obj):
+        """Devuelve los bytes del PDF."""
+        buffer = io.BytesIO()
+        izquierdo, derecho, superior, inferior = self.margenes
+        doc = SimpleDocTemplate(
+            buffer, pagesize=self.tamano_pagina,
+            leftMargin=izquierdo, rightMargin=derecho, topMargin=superior, bottomMargin=inferior,
+            title=self.nombre_archivo(obj), author=EMPRESA_NOMBRE,
+        )
+        dibujar = self._dibujar_pagina(obj)
+        doc.build(self.contenido(obj), onFirstPage=dibujar, onLaterPages=dibujar)
+        return buffer.getvalue()
+
+
+def obtener_documento(tipo):
+    """Instancia del documento registrado en TIPOS_DOCUMENTO (KeyError si no existe)."""
+    return import_string(TIPOS_DOCUMENTO[tipo])()
@@ -0,0 +1,151 @@
+# backend_api/perfilado.py
+"""
+Perfilado de consultas por petición.
+
+PresupuestoConsultasMiddleware cuenta las consultas SQL de cada petición (en todas
+las bases configuradas), su tiempo total y cuántas veces se repite cada consulta con
+la misma forma (la "huella": el SQL sin los valores). Lo devuelve en la cabecera
+Server-Timing, que el navegador muestra en la pestaña de red:
+
+    Server-Timing: db;dur=12.4;desc="18 consultas", render;dur=3.1, app;dur=41.0
+
+La cabecera deja ver cuánto trabaja cada vista, así que solo se envía con
+SERVER_TIMING activo (por defecto igual a DEBUG) o a usuarios staff.
+
+Las vistas pueden declarar cuántas consultas esperan hacer como máximo:
+
+    class VentasCompletadasPorClienteView(generics.ListAPIView):
+        presupuesto_consultas = 10
+
+o por método, si la vista también escribe: presupuesto_consultas = {'GET': 10}.
+
+Si una petición se pasa del presupuesto, en producción se registra un aviso con las
+consultas más repetidas; con PRESUPUESTO_CONSULTAS_ESTRICTO (activo al correr los
+tests) la petición falla con PresupuestoConsultasExcedido. Una misma consulta
+repetida más de CONSULTAS_REPETIDAS_MAXIMO veces casi siempre es un N+1 y también
+se avisa, tenga o no presupuesto la vista.
+"""
+
+import logging
+import re
+import time
+from collections import defaultdict
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+_LISTA_PARAMETROS = re.compile(r'\(\s*%s(?:\s*,\s*%s)*\s*\)')
+_NUMEROS = re.compile(r'\b\d+\b')
+
+
+class PresupuestoConsultasExcedido(Exception):
+    pass
+
+
+def huella_sql(sql):
+    """El SQL sin valores: dos consultas con la misma huella solo difieren en los parámetros."""
+    return _NUMEROS.sub('N', _LISTA_PARAMETROS.sub('(...)', sql))
+
+
+class RegistroConsultas:
+    """execute_wrapper que acumula cantidad y tiempo de las consultas, agrupadas por huella."""
+
+    def __init__(self):
+        self.cantidad = 0
+        self.duracion = 0.0
+        self.por_huella = defaultdict(lambda: [0, 0.0])
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duracion = time.perf_counter() - inicio
+            self.cantidad += 1
+            self.duracion += duracion
+            acumulado = self.por_huella[huella_sql(sql)]
+            acumulado[0] += 1
+            acumulado[1] += duracion
+
+    def mas_repetidas(self, limite=3):
+        """[(huella, veces, segundos)] de las consultas que se ejecutaron más de una vez."""
+        repetidas = [(huella, veces, segundos) for huella, (veces, segundos) in self.por_huella.items() if veces > 1]
+        return sorted(repetidas, key=lambda r: (-r[1], -r[2]))[:limite]
+
+
+class PresupuestoConsultasMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        registro = RegistroConsultas()
+        inicio = time.perf_counter()
+        with ExitStack() as pila:
+            for alias in connections:
+                pila.enter_context(connections[alias].execute_wrapper(registro))
+            response = self.get_response(request)
+        total = time.perf_counter() - inicio
+
+        if self._mostrar_tiempos(request):
+            render = getattr(request, '_perfilado_render', None)
+            metricas = [f'db;dur={registro.duracion * 1000:.1f};desc="{registro.cantidad} consultas"']
+            if render is not None:
+                metricas.append(f'render;dur={render * 1000:.1f}')
+            metricas.append(f'app;dur={total * 1000:.1f}')
+            response['Server-Timing'] = ', '.join(metricas)
+
+        self._revisar(request, registro)
+        return response
+
+    def _mostrar_tiempos(self, request):
+        if getattr(settings, 'SERVER_TIMING', False):
+            return True
+        # DRF deja en la petición de Django el usuario que autenticó la vista (JWT incluido).
+        return getattr(getattr(request, 'user', None), 'is_staff', False)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._vista_perfilada = getattr(view_func, 'view_class', None)
+
+    def process_template_response(self, request, response):
+        # Las Response de DRF se renderizan (se pasan a JSON) justo después de este hook.
+        inicio = time.perf_counter()
+
+        def fin_render(respuesta):
+            request._perfilado_render = time.perf_counter() - inicio
+        response.add_post_render_callback(fin_render)
+        return response
+
+    def _revisar(self, request, registro):
+        vista = getattr(request, '_vista_perfilada', None)
+        nombre_vista = vista.__name__ if vista is not None else request.path
+        presupuesto = getattr(vista, 'presupuesto_consultas', None)
+        if isinstance(presupuesto, dict):
+            presupuesto = presupuesto.get(request.method)
+        excedido = presupuesto is not None and registro.cantidad > presupuesto
+        repetidas = registro.mas_repetidas()
+        maximo_repetidas = getattr(settings, 'CONSULTAS_REPETIDAS_MAXIMO', 10)
+        posible_n_mas_1 = bool(repetidas) and repetidas[0][1] > maximo_repetidas
+        if not excedido and not posible_n_mas_1:
+            return
+
+        detalle = '\n'.join(f'  {veces}x ({segundos * 1000:.1f} ms) {huella[:300]}' for huella, veces, segundos in repetidas)
+        if excedido:
+            mensaje = (
+                f'{request.method} {request.path} ({nombre_vista}) hizo {registro.cantidad} consultas '
+                f'({registro.duracion * 1000:.1f} ms), el presupuesto es {presupuesto}.'
+            )
+        else:
+            mensaje = (
+                f'{request.method} {request.path} ({nombre_vista}) repite {repetidas[0][1]} veces la misma consulta '
+                f'(posible N+1).'
+            )
+        if detalle:
+            mensaje += f' Consultas más repetidas:\n{detalle}'
+
+        if excedido and getattr(settings, 'PRESUPUESTO_CONSULTAS_ESTRICTO', False):
+            raise PresupuestoConsultasExcedido(mensaje)
+        logger.warning(mensaje)
@@ -0,0 +1,153 @@
+# backend_api/replicas.py
+"""
+Lecturas en la réplica de la base de datos.
+
+Si está configurado el alias 'replica' (DB_REPLICA_HOST, ver settings.py), las
+vistas de solo lectura que lo piden explícitamente (LecturaReplicaMixin) o el código
+envuelto en `with en_replica():` leen de la réplica; todo lo demás, y todas las
+escrituras, van a la primaria. Sin réplica configurada no cambia nada.
+
+Lectura de lo propio: después de que un cliente escribe algo (un POST/PUT/PATCH/DELETE
+que terminó bien, por ejemplo crear un Pedido), sus lecturas van a la primaria
+durante REPLICA_VENTANA_LECTURA segundos, para que no vea datos atrasados por el
+retraso de replicación. La marca se guarda en dos lugares:
+
+- en la caché, con clave por usuario (o por IP para invitados). Solo vale para
+  todos los workers si la caché es compartida (Redis); con LocMemCache, el valor
+  por defecto, solo la ve el worker que atendió la escritura;
+- en una cookie firmada que vence con la ventana, que llega a cualquier worker si
+  el cliente envía cookies (mismo sitio, o fetch con credentials).
+
+Basta con que una de las dos esté presente para leer de la primaria.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.permissions import SAFE_METHODS
+
+ALIAS_REPLICA = 'replica'
+
+_leer_de_replica = ContextVar('leer_de_replica', default=False)
+
+
+def replica_configurada():
+    return ALIAS_REPLICA in settings.DATABASES
+
+
+def leyendo_de_replica():
+    """True si las lecturas del contexto actual van a la réplica."""
+    return _leer_de_replica.get() and replica_configurada() and not connections[DEFAULT_DB_ALIAS].in_atomic_block
+
+
+class RouterReplica:
+    def db_for_read(self, model, **hints):
+        if not _leer_de_replica.get() or not replica_configurada():
+            return None
+        # Dentro de una transacción se lee de la primaria: puede haber escrituras sin confirmar.
+        return ALIAS_REPLICA if leyendo_de_replica() else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        # Explícito: una instancia leída de la réplica se guarda igual en la primaria.
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Las dos bases tienen los mismos datos.
+        aliases = {DEFAULT_DB_ALIAS, ALIAS_REPLICA}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+
+@contextmanager
+def en_replica():
+    """
+    Las lecturas dentro del bloque van a la réplica (si existe). Sirve también
+    como decorador: @en_replica()
+    """
+    token = _leer_de_replica.set(True)
+    try:
+        yield
+    finally:
+        _leer_de_replica.reset(token)
+
+
+# --- Lectura de lo propio ---
+
+def _clave_cliente(request):
+    token = getattr(request, 'auth', None)
+    if token is not None and hasattr(token, 'get'):
+        return f"replica:escritura:{token.get('user_type')}:{token.get(settings.SIMPLE_JWT['USER_ID_CLAIM'])}"
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return f"replica:escritura:{user._meta.model_name}:{user.pk}"
+    # Invitados: por IP (la primera de X-Forwarded-For si venimos detrás de un proxy).
+    ip = request.META.get('HTTP_X_FORWARDED_FOR', '').split(',')[0].strip() or request.META.get('REMOTE_ADDR', '')
+    return f"replica:escritura:ip:{ip}"
+
+
+COOKIE_ESCRITURA = 'replica_escritura'
+SAL_COOKIE = 'backend_api.replicas'
+
+
+def _ventana():
+    return getattr(settings, 'REPLICA_VENTANA_LECTURA', 5)
+
+
+def marcar_escritura(request, response=None):
+    clave = _clave_cliente(request)
+    cache.set(clave, 1, _ventana())
+    if response is not None:
+        # SameSite=None para que el frontend en otro dominio la devuelva (exige HTTPS).
+        seguro = request.is_secure()
+        response.set_signed_cookie(
+            COOKIE_ESCRITURA, clave, salt=SAL_COOKIE, max_age=_ventana(),
+            secure=seguro, httponly=True, samesite='None' if seguro else 'Lax',
+        )
+
+
+def escribio_recientemente(request):
+    if cache.get(_clave_cliente(request)) is not None:
+        return True
+    # La firma lleva la hora: con max_age se descartan las cookies de fuera de la ventana.
+    return request.COOKIES.get(COOKIE_ESCRITURA) is not None and request.get_signed_cookie(
+        COOKIE_ESCRITURA, default=None, salt=SAL_COOKIE, max_age=_ventana(),
+    ) == _clave_cliente(request)
+
+
+class LecturaPropiaMiddleware:
+    """Marca a los clientes que acaban de escribir para que sus lecturas vayan a la primaria."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if request.method not in SAFE_METHODS and response.status_code < 400 and replica_configurada():
+            marcar_escritura(request, response)
+        return response
+
+
+class LecturaReplicaMixin:
+    """
+    Para vistas DRF de solo lectura (dashboards, reportes, PDFs, catálogo): los GET
+    leen de la réplica, salvo que el cliente haya escrito hace poco.
+
+        class ResumenGeneralDashboardView(LecturaReplicaMixin, APIView):
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        token = _leer_de_replica.set(False)
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            _leer_de_replica.reset(token)
+
+    def initial(self, request, *args, **kwargs):
+        # Se decide después de autenticar (hace falta saber quién es) y de revisar permisos (en la primaria).
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS and replica_configurada() and not escribio_recientemente(request):
+            _leer_de_replica.set(True)
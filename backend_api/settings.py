@@ -5,6 +5,7 @@ Django settings for backend_api project.
 """
 from dotenv import load_dotenv
 import os 
+import sys
 
 
 
@@ -78,6 +79,7 @@ INSTALLED_APPS = [
     'django.contrib.humanize',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'django_filters',
     'rest_framework',
     'rest_framework_simplejwt', 
@@ -99,6 +101,7 @@ INSTALLED_APPS = [
     'Configuracion.apps.ConfiguracionConfig',
     'Pedidos.apps.PedidosConfig',
     'Stock.apps.StockConfig',
+    'Notificaciones.apps.NotificacionesConfig',
 ]
 
 
@@ -132,15 +135,20 @@ SIMPLE_JWT = {
     'USER_ID_FIELD': 'id',
     'USER_ID_CLAIM': 'user_id',
 }
+# Permite que las vistas que usan ClaimsJWTAuthentication autoricen solo con los
+# claims del token (sin consultar usuario ni rol). Desactivado por defecto.
+JWT_AUTORIZACION_POR_CLAIMS = os.environ.get('JWT_AUTORIZACION_POR_CLAIMS', 'False').lower() == 'true'
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    'backend_api.perfilado.PresupuestoConsultasMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'backend_api.replicas.LecturaPropiaMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -180,8 +188,98 @@ DATABASES = {
         'PASSWORD': os.environ.get('DB_PASSWORD'),
         'HOST': os.environ.get('DB_HOST'),
         'PORT': os.environ.get('DB_PORT'),
+        # Conexiones persistentes: cada worker reutiliza su conexión entre peticiones
+        # en lugar de abrir TCP+TLS en cada una. Antes de reutilizarla se verifica que
+        # siga viva (CONN_HEALTH_CHECKS), así una conexión cortada no rompe la petición.
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', '60')),
+        'CONN_HEALTH_CHECKS': os.environ.get('DB_CONN_HEALTH_CHECKS', 'True').lower() == 'true',
+        'OPTIONS': {
+            'connect_timeout': int(os.environ.get('DB_CONNECT_TIMEOUT', '5')),
+        },
+    }
+}
+
+# Detrás de PgBouncer en modo "transaction" cada transacción puede ir a una conexión
+# distinta del servidor: los cursores del lado del servidor (los de .iterator()) no
+# sobreviven entre transacciones y hay que desactivarlos.
+DB_PGBOUNCER = os.environ.get('DB_PGBOUNCER', 'False').lower() == 'true'
+if DB_PGBOUNCER:
+    DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = True
+
+# Pool de conexiones de psycopg 3 dentro de cada proceso. Requiere instalar aparte
+# 'psycopg[binary,pool]' (no está en requirements.txt, ver README). No tiene sentido
+# junto con PgBouncer, que ya es el pool.
+DB_POOL = os.environ.get('DB_POOL', 'False').lower() == 'true'
+if DB_POOL and not DB_PGBOUNCER:
+    from importlib.util import find_spec
+    if find_spec('psycopg') and find_spec('psycopg_pool'):
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': int(os.environ.get('DB_POOL_MIN', '2')),
+            'max_size': int(os.environ.get('DB_POOL_MAX', '10')),
+            'timeout': float(os.environ.get('DB_POOL_TIMEOUT', '10')),
+        }
+        # Con pool, Django exige CONN_MAX_AGE = 0: la conexión vuelve al pool al terminar la petición.
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+    else:
+        print("⚠️  DB_POOL activado pero psycopg 3 / psycopg_pool no están instalados. Se usan conexiones persistentes.")
+
+# Réplica de solo lectura para dashboards, reportes y catálogo (ver backend_api/replicas.py).
+# Usa la misma configuración que la primaria salvo el host/puerto.
+DB_REPLICA_HOST = os.environ.get('DB_REPLICA_HOST')
+if DB_REPLICA_HOST:
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': DB_REPLICA_HOST,
+        'PORT': os.environ.get('DB_REPLICA_PORT', DATABASES['default']['PORT']),
+        'OPTIONS': dict(DATABASES['default']['OPTIONS']),
+        # En los tests la "réplica" es la misma base de prueba que la primaria.
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_ROUTERS = ['backend_api.replicas.RouterReplica']
+# Segundos que las lecturas de un cliente van a la primaria después de que escribe algo.
+REPLICA_VENTANA_LECTURA = int(os.environ.get('DB_REPLICA_VENTANA', '5'))
+
+# Caché compartida. Por defecto es en memoria del proceso; en producción se puede
+# apuntar a Redis con CACHE_BACKEND=django.core.cache.backends.redis.RedisCache
+# y CACHE_LOCATION=redis://host:6379/1
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'construsys'),
     }
 }
+# Con la caché en memoria del proceso, lo que se invalida en un worker no llega a los
+# demás: esos datos se guardan como mucho estos segundos (ver backend_api/cache_compartida.py).
+CACHE_TIMEOUT_LOCAL = int(os.environ.get('CACHE_TIMEOUT_LOCAL', '5'))
+
+# Horas que se mantiene la reserva de stock de un pedido cuyo pago está en verificación (ver Stock/reservas.py).
+RESERVA_STOCK_VERIFICACION_HORAS = int(os.environ.get('RESERVA_STOCK_VERIFICACION_HORAS', '72'))
+
+# Segundos que una respuesta del catálogo puede quedarse en caché.
+CATALOGO_CACHE_TIMEOUT = int(os.environ.get('CATALOGO_CACHE_TIMEOUT', 60 * 60))
+
+# Copia estática y comprimida del catálogo (ver Productos/snapshot.py y el comando publicar_catalogo).
+# 'storage' la sube al almacenamiento por defecto; 'static' la escribe en STATIC_ROOT.
+CATALOGO_SNAPSHOT_DESTINO = os.environ.get('CATALOGO_SNAPSHOT_DESTINO', 'storage')
+CATALOGO_SNAPSHOT_ESPERA = int(os.environ.get('CATALOGO_SNAPSHOT_ESPERA', '30'))
+CATALOGO_SNAPSHOT_ESPERA_MAXIMA = int(os.environ.get('CATALOGO_SNAPSHOT_ESPERA_MAXIMA', '300'))
+
+# Caché de PDFs por versión del documento (ver backend_api/cache_pdf.py): un directorio
+# local y, opcionalmente, un almacenamiento compartido como segundo nivel. Los PDFs
+# traen datos personales: ese almacenamiento es privado (ACL 'private', URLs firmadas),
+# nunca con ACL pública. En Supabase un bucket marcado como público expone todos sus
+# objetos sin importar la ACL: en ese caso PDF_CACHE_BUCKET debe ser un bucket privado.
+PDF_CACHE_DIR = os.environ.get('PDF_CACHE_DIR') or None
+PDF_CACHE_STORAGE = os.environ.get('PDF_CACHE_STORAGE', 'False').lower() == 'true'
+PDF_CACHE_STORAGE_CONFIG = {
+    'BACKEND': 'storages.backends.s3boto3.S3Boto3Storage',
+    'OPTIONS': {
+        'bucket_name': os.environ.get('PDF_CACHE_BUCKET', SUPABASE_BUCKET),
+        'default_acl': 'private',
+        'querystring_auth': True,
+        'object_parameters': {'CacheControl': 'private, no-store'},
+    },
+}
 
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_HOST = 'smtp.gmail.com'
@@ -191,6 +289,14 @@ EMAIL_HOST_USER = 'construsys2025@gmail.com'
 EMAIL_HOST_PASSWORD = 'puju drtr tsgx ifmw' 
 DEFAULT_FROM_EMAIL = 'construsys2025@gmail.com'
 
+# Bandeja de salida (ver Notificaciones/correo.py). Cada correo se intenta enviar al
+# confirmarse la transacción que lo encoló; los reintentos los hace el cron de
+# vercel.json (que llama a /api/notificaciones/procesar/ con CRON_SECRET) o, fuera
+# de Vercel, `manage.py procesar_correos --loop`.
+CORREO_ENVIO_INMEDIATO = os.environ.get('CORREO_ENVIO_INMEDIATO', 'True').lower() == 'true'
+CORREO_RETENCION_DIAS = int(os.environ.get('CORREO_RETENCION_DIAS', '7'))
+CRON_SECRET = os.environ.get('CRON_SECRET', '')
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',},
@@ -229,6 +335,19 @@ FRONTEND_URL = os.environ.get('FRONTEND_URL', 'http://localhost:5173')
 TASA_IVA = 19.0
 
 CORS_ALLOW_ALL_ORIGINS = True 
+# Server-Timing (ver backend_api/perfilado.py) dice cuántas consultas hace cada
+# vista y cuánto tardan: solo se envía con SERVER_TIMING (por defecto en DEBUG) o a
+# usuarios staff.
+SERVER_TIMING = os.environ.get('SERVER_TIMING', str(DEBUG)).lower() == 'true'
+# Para que el frontend pueda leer las cabeceras de validación del catálogo.
+CORS_EXPOSE_HEADERS = ['ETag', 'Last-Modified'] + (['Server-Timing'] if SERVER_TIMING else [])
+
+# Presupuesto de consultas por vista (ver backend_api/perfilado.py). Al correr los
+# tests una vista que se pasa de su presupuesto falla; en producción solo se avisa.
+TESTING = len(sys.argv) > 1 and sys.argv[1] == 'test'
+PRESUPUESTO_CONSULTAS_ESTRICTO = os.environ.get('PRESUPUESTO_CONSULTAS_ESTRICTO', str(TESTING)).lower() == 'true'
+# Veces que se puede repetir una misma consulta en una petición antes de avisar de un posible N+1.
+CONSULTAS_REPETIDAS_MAXIMO = int(os.environ.get('CONSULTAS_REPETIDAS_MAXIMO', '10'))
 
 
 
@@ -0,0 +1,184 @@
+from unittest import skipUnless
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import path
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.test import APIClient
+from rest_framework.views import APIView
+
+from Productos.models import Marca
+
+from .perfilado import PresupuestoConsultasExcedido
+from .replicas import (
+    ALIAS_REPLICA, COOKIE_ESCRITURA, LecturaReplicaMixin, RouterReplica, en_replica, replica_configurada,
+)
+
+
+class VistaLectura(LecturaReplicaMixin, APIView):
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        # QuerySet.db pregunta al router sin ejecutar la consulta.
+        return Response({'alias': Marca.objects.all().db})
+
+
+class VistaEscritura(APIView):
+    permission_classes = [AllowAny]
+
+    def post(self, request):
+        return Response(status=201)
+
+
+class VistaConPresupuesto(APIView):
+    permission_classes = [AllowAny]
+    presupuesto_consultas = {'GET': 1}
+
+    def get(self, request):
+        return Response({'marcas': Marca.objects.count() + Marca.objects.filter(activo=True).count()})
+
+
+urlpatterns = [
+    path('lectura/', VistaLectura.as_view()),
+    path('escritura/', VistaEscritura.as_view()),
+    path('presupuesto/', VistaConPresupuesto.as_view()),
+]
+
+
+@skipUnless(replica_configurada(), "Sin alias 'replica' (DB_REPLICA_HOST).")
+@override_settings(ROOT_URLCONF='backend_api.tests', REPLICA_VENTANA_LECTURA=60)
+class ReplicaTests(TestCase):
+    # Sin réplica la clase se salta, pero el runner igual prepara las bases que declara.
+    databases = {'default', ALIAS_REPLICA} if replica_configurada() else {'default'}
+
+    def setUp(self):
+        cache.clear()
+
+    def alias_de_lectura(self, **extra):
+        return self.client.get('/lectura/', **extra).json()['alias']
+
+    def test_router(self):
+        router = RouterReplica()
+        self.assertIsNone(router.db_for_read(Marca))
+        with en_replica():
+            # TestCase abre una transacción: dentro de un atomic se lee de la primaria.
+            self.assertEqual(router.db_for_read(Marca), 'default')
+        self.assertEqual(router.db_for_write(Marca), 'default')
+
+    def test_router_fuera_de_transaccion(self):
+        router = RouterReplica()
+        with self.desactivar_atomic():
+            self.assertIsNone(router.db_for_read(Marca))
+            with en_replica():
+                self.assertEqual(router.db_for_read(Marca), ALIAS_REPLICA)
+            self.assertEqual(router.db_for_write(Marca), 'default')
+
+    def test_mixin_lee_de_la_replica(self):
+        with self.desactivar_atomic():
+            self.assertEqual(self.alias_de_lectura(), ALIAS_REPLICA)
+            # Fuera de la vista se vuelve a la primaria.
+            self.assertEqual(Marca.objects.all().db, 'default')
+
+    def test_lectura_propia_por_cache(self):
+        with self.desactivar_atomic():
+            self.assertEqual(self.client.post('/escritura/').status_code, 201)
+            # Sin la cookie, basta la marca en la caché (por IP para invitados).
+            self.client.cookies.pop(COOKIE_ESCRITURA)
+            self.assertEqual(self.alias_de_lectura(), 'default')
+            # Otro cliente sigue leyendo de la réplica.
+            self.assertEqual(self.alias_de_lectura(REMOTE_ADDR='10.0.0.2'), ALIAS_REPLICA)
+
+    def test_lectura_propia_por_cookie(self):
+        with self.desactivar_atomic():
+            self.client.post('/escritura/')
+            self.assertIn(COOKIE_ESCRITURA, self.client.cookies)
+            # Otro worker con caché local no tiene la marca: la cookie firmada alcanza.
+            cache.clear()
+            self.assertEqual(self.alias_de_lectura(), 'default')
+
+    def test_cookie_alterada_o_ajena_no_cuenta(self):
+        with self.desactivar_atomic():
+            self.client.post('/escritura/')
+            cache.clear()
+            # La cookie es de 127.0.0.1: desde otra IP no vale.
+            self.assertEqual(self.alias_de_lectura(REMOTE_ADDR='10.0.0.2'), ALIAS_REPLICA)
+            self.client.cookies[COOKIE_ESCRITURA] = 'replica:escritura:ip:127.0.0.1'
+            self.assertEqual(self.alias_de_lectura(), ALIAS_REPLICA)
+
+    def test_escritura_fallida_no_marca(self):
+        with self.desactivar_atomic():
+            self.client.post('/lectura/')  # 405
+            self.assertNotIn(COOKIE_ESCRITURA, self.client.cookies)
+            self.assertEqual(self.alias_de_lectura(), ALIAS_REPLICA)
+
+    def desactivar_atomic(self):
+        """
+        TestCase corre todo dentro de una transacción y el router, con razón, lee de la
+        primaria dentro de un atomic. Para probar el enrutamiento se simula que no la hay.
+        """
+        return _SinBloqueAtomic()
+
+
+class _SinBloqueAtomic:
+
+    def __enter__(self):
+        self.conexion = transaction.get_connection()
+        self.en_bloque = self.conexion.in_atomic_block
+        self.conexion.in_atomic_block = False
+
+    def __exit__(self, *exc):
+        self.conexion.in_atomic_block = self.en_bloque
+
+
+@override_settings(ROOT_URLCONF='backend_api.tests', DATABASES={'default': settings.DATABASES['default']})
+class SinReplicaTests(SimpleTestCase):
+    """Sin el alias 'replica' configurado todo va a la primaria y no se marca nada."""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_router_y_mixin_no_hacen_nada(self):
+        self.assertFalse(replica_configurada())
+        with en_replica():
+            self.assertIsNone(RouterReplica().db_for_read(Marca))
+        self.assertEqual(self.client.get('/lectura/').json()['alias'], 'default')
+
+    def test_escritura_no_deja_cookie(self):
+        self.assertEqual(self.client.post('/escritura/').status_code, 201)
+        self.assertNotIn(COOKIE_ESCRITURA, self.client.cookies)
+
+
+@override_settings(ROOT_URLCONF='backend_api.tests')
+class PresupuestoConsultasTests(TestCase):
+
+    @override_settings(PRESUPUESTO_CONSULTAS_ESTRICTO=True)
+    def test_estricto_falla_al_exceder(self):
+        with self.assertRaisesMessage(PresupuestoConsultasExcedido, 'hizo 2 consultas'):
+            self.client.get('/presupuesto/')
+
+    @override_settings(PRESUPUESTO_CONSULTAS_ESTRICTO=False)
+    def test_sin_modo_estricto_solo_avisa(self):
+        with self.assertLogs('backend_api.perfilado', 'WARNING') as avisos:
+            response = self.client.get('/presupuesto/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('el presupuesto es 1', avisos.output[0])
+
+
+@override_settings(ROOT_URLCONF='backend_api.tests', SERVER_TIMING=False)
+class ServerTimingTests(TestCase):
+
+    def test_no_se_envia_a_cualquiera(self):
+        self.assertNotIn('Server-Timing', self.client.get('/lectura/'))
+
+    def test_se_envia_a_staff(self):
+        client = APIClient()
+        client.force_authenticate(get_user_model().objects.create_superuser('admin@example.com', 'clave-segura'))
+        self.assertIn('db;dur=', client.get('/lectura/')['Server-Timing'])
+
+    @override_settings(SERVER_TIMING=True)
+    def test_se_envia_a_todos_con_server_timing(self):
+        self.assertIn('Server-Timing', self.client.get('/lectura/'))
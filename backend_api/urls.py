@@ -3,7 +3,7 @@
 from django.contrib import admin
 from django.urls import path, include
 
-from .views import ContactoView
+from .views import ContactoView, ConexionesMetricasView
 
 from django.conf import settings
 from django.conf.urls.static import static
@@ -34,6 +34,7 @@ urlpatterns = [
     path('api/devoluciones/', include('Devoluciones.urls')),
     
     path('api/creditos/', include('Creditos.urls')),
+    path('api/notificaciones/', include('Notificaciones.urls')),
     
 
     # --- Rutas de Perfil ---
@@ -43,6 +44,7 @@ urlpatterns = [
 
 
     path('api/contacto/', ContactoView.as_view(), name='contacto'),
+    path('api/metricas/conexiones/', ConexionesMetricasView.as_view(), name='metricas-conexiones'),
 
 
 
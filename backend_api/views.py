@@ -3,13 +3,17 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.permissions import AllowAny
-from django.core.mail import send_mail
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from django.conf import settings
 
+from Notificaciones.correo import encolar_correo
+from Roles_Permisos.permissions import HasPrivilege
+from .conexiones import estadisticas_conexiones
+
 class ContactoView(APIView):
     """
-    Recibe los datos de un formulario de contacto y los envía por correo.
+    Recibe los datos de un formulario de contacto y los deja en la bandeja de salida
+    para enviarlos por correo.
     """
     permission_classes = [AllowAny] # Permite que cualquiera use este formulario
 
@@ -39,12 +43,11 @@ class ContactoView(APIView):
         )
         
         try:
-            send_mail(
+            encolar_correo(
                 asunto_empresa,
                 cuerpo_mensaje,
-                settings.EMAIL_HOST_USER,  # El correo configurado en settings.py
                 [settings.EMAIL_HOST_USER], # El correo de la empresa se envía a sí mismo
-                fail_silently=False,
+                remitente=settings.EMAIL_HOST_USER,  # El correo configurado en settings.py
             )
             return Response({"detail": "Mensaje enviado con éxito."}, status=status.HTTP_200_OK)
         except Exception as e:
@@ -55,3 +58,15 @@ class ContactoView(APIView):
             )
         
 
+
+class ConexionesMetricasView(APIView):
+    """
+    Estadísticas de las conexiones a la base de datos del worker que atiende la
+    petición: configuración (CONN_MAX_AGE, health checks, PgBouncer), cuántas
+    conexiones abrió el proceso y, si hay pool de psycopg, su tamaño y uso.
+    """
+    permission_classes = [IsAuthenticated, HasPrivilege]
+    required_privilege = 'sistema_ver_metricas'
+
+    def get(self, request, *args, **kwargs):
+        return Response(estadisticas_conexiones())
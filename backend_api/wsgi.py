@@ -15,5 +15,8 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend_api.settings')
 
 application = get_wsgi_application()
 
+# Cuenta las conexiones que abre cada worker desde el arranque (ver /api/metricas/conexiones/).
+import backend_api.conexiones  # noqa: E402,F401
+
 
 app = application
\ No newline at end of file